@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 """Flask API wrapper for synthetic review generation"""
 
+import json
 import os
+import queue
 import sys
-from flask import Flask, request, jsonify, send_file, render_template
+import time
+from pathlib import Path
+from flask import Flask, Response, g, request, jsonify, send_file, render_template, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import yaml
 
 sys.path.append('src')
 
+import metrics
 from generator import ReviewGenerator
+from jobs import JobManager
+from quality.corpus import CorpusBudgetExceeded, CorpusNotFound, CorpusStore
 from reports import generate_quality_report, generate_comparison_report
 
 load_dotenv()
@@ -20,6 +27,8 @@ CORS(app)
 
 # Global generator instance
 generator = None
+job_manager = None
+corpus_store = None
 
 
 def init_generator():
@@ -29,6 +38,115 @@ def init_generator():
         generator = ReviewGenerator(verbose=False)
 
 
+def init_corpora():
+    """Create the corpus session store on first use"""
+    global corpus_store
+    if corpus_store is None:
+        init_generator()
+        corpus_store = CorpusStore(generator.config)
+
+
+def review_files(directory, prefix):
+    """Stored review files (JSON arrays or JSONL streams) named prefix*"""
+    directory = Path(directory)
+    return [
+        f for pattern in (f"{prefix}*.json", f"{prefix}*.jsonl")
+        for f in directory.glob(pattern)
+    ]
+
+
+def corpus_not_found(corpus_id):
+    return jsonify({
+        "success": False,
+        "error": f"Unknown or evicted corpus: {corpus_id}"
+    }), 404
+
+
+def make_job_generator(run_id):
+    """Generator for one batch job. Jobs share the API generator's score
+    cache and realism batcher, and are not checkpointed: nothing can resume
+    them, so a cancelled job would leave its checkpoint behind."""
+    return ReviewGenerator(
+        verbose=False, run_id=run_id, shared_quality=generator.quality, checkpoints=False
+    )
+
+
+def init_jobs():
+    """Start the batch job pool on first use"""
+    global job_manager
+    if job_manager is None:
+        init_generator()
+        settings = generator.config.get('jobs', {})
+        job_manager = JobManager(
+            make_job_generator,
+            max_workers=settings.get('max_workers', 2),
+            max_finished=settings.get('max_finished', 100)
+        )
+
+
+def live_generators():
+    """The API's generator plus those of running jobs"""
+    generators = [generator] if generator is not None else []
+    if job_manager is not None:
+        generators += job_manager.generators()
+    return generators
+
+
+def generator_gauges():
+    """Scrape-time gauges read from the stats of every live generator"""
+    generators = live_generators()
+    if not generators:
+        return []
+    
+    gauges = []
+    # Score caches and the provider registry may be shared between generators
+    caches = {id(gen.quality.score_cache): gen.quality.score_cache for gen in generators}
+    stats = [cache.stats() for cache in caches.values() if cache]
+    if stats:
+        counts = {
+            result: sum(s[key] for s in stats)
+            for result, key in (("memory_hit", "memory_hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))
+        }
+        lookups = sum(counts.values())
+        hit_rate = round((lookups - counts["miss"]) / lookups, 4) if lookups else 0.0
+        gauges.append((
+            "score_cache_lookups", "Score cache lookups by result",
+            {(result,): count for result, count in counts.items()},
+            ["result"],
+        ))
+        gauges.append(("score_cache_hit_ratio", "Score cache hit rate", {(): hit_rate}, []))
+    
+    windows = {}
+    for registry in {id(gen.api.registry): gen.api.registry for gen in generators}.values():
+        windows.update(registry.stats()["concurrency"] or {})
+    gauges.append((
+        "provider_concurrency_window", "Adaptive concurrency window per provider",
+        {(p,): w["window"] for p, w in windows.items()}, ["provider"],
+    ))
+    gauges.append((
+        "provider_requests_in_flight", "Provider requests in flight",
+        {(p,): w["in_flight"] for p, w in windows.items()}, ["provider"],
+    ))
+    return gauges
+
+
+metrics.REGISTRY.add_collector(generator_gauges)
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.HTTP_REQUESTS.labels(request.method, endpoint, response.status_code).inc()
+    if "request_start" in g:
+        metrics.HTTP_SECONDS.labels(endpoint).observe(time.perf_counter() - g.request_start)
+    return response
+
+
 @app.route('/')
 def index():
     """Serve the web UI"""
@@ -45,6 +163,23 @@ def health():
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Counters and histograms in Prometheus text format"""
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route('/api/providers/stats', methods=['GET'])
+def provider_stats():
+    """Connection pool and rate limiter statistics"""
+    init_generator()
+    
+    return jsonify({
+        "success": True,
+        "stats": generator.api.stats()
+    })
+
+
 @app.route('/api/generate/single', methods=['POST'])
 def generate_single():
     """Generate a single review"""
@@ -70,32 +205,32 @@ def generate_single():
 
 @app.route('/api/generate/batch', methods=['POST'])
 def generate_batch():
-    """Generate multiple reviews with quality checks"""
-    init_generator()
+    """Start a batch generation job; poll /api/jobs/<id> for progress"""
+    init_jobs()
     
     try:
         data = request.get_json() or {}
         count = data.get('count', 10)
+        concurrency = data.get('concurrency')
         
-        if count > 100:
+        if not isinstance(count, int) or count < 1:
+            return jsonify({
+                "success": False,
+                "error": "count must be a positive integer"
+            }), 400
+        if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
             return jsonify({
                 "success": False,
-                "error": "Maximum 100 reviews per batch request"
+                "error": "concurrency must be a positive integer"
             }), 400
         
-        result = generator.generate_all(count=count)
+        job = job_manager.submit(count, concurrency)
         
         return jsonify({
             "success": True,
-            "result": {
-                "success_count": result['success_count'],
-                "skipped_count": result['skipped_count'],
-                "clean_path": result['clean_path'],
-                "with_models_path": result['with_models_path'],
-                "csv_log": result['csv_log'],
-                "timestamp": result['timestamp']
-            }
-        })
+            "job": job.to_dict(),
+            "status_url": f"/api/jobs/{job.id}"
+        }), 202
     
     except Exception as e:
         return jsonify({
@@ -104,15 +239,156 @@ def generate_batch():
         }), 500
 
 
+def sse(event, data, event_id=None):
+    """One server-sent event"""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/generate/stream', methods=['GET'])
+def generate_stream():
+    """Generate reviews and stream each decided attempt as server-sent events
+    
+    Events: job (id, on every connect), accepted (review + timings),
+    rejected (failed metric + timings), done (final job status). A slow
+    client fills the event buffer and pauses generation.
+    
+    Event ids are "<job id>:<n>". A reconnecting EventSource sends the last
+    one as Last-Event-ID (or a client passes ?job_id=) and is attached to
+    the same job, with the events it missed replayed, instead of starting
+    a new one. A job whose stream stays disconnected for
+    jobs.stream_reconnect_sec is cancelled. A disconnect is only seen when
+    a write fails, so an idle stream sends a keepalive comment every
+    jobs.stream_keepalive_sec.
+    """
+    init_jobs()
+    
+    settings = generator.config.get('jobs', {})
+    buffer_size = settings.get('stream_buffer', 100)
+    keepalive = settings.get('stream_keepalive_sec', 2)
+    grace = settings.get('stream_reconnect_sec', 10)
+    
+    job_id = request.args.get('job_id')
+    after = 0
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id:
+        job_id, _, n = last_event_id.partition(':')
+        after = int(n) if n.isdigit() else 0
+    
+    if job_id:
+        job = job_manager.get(job_id)
+        if job is None or job.events is None:
+            return jsonify({
+                "success": False,
+                "error": f"No streaming job {job_id}"
+            }), 404
+        after = min(after, job.last_event_id)
+    else:
+        count = request.args.get('count', 10, type=int)
+        concurrency = request.args.get('concurrency', type=int)
+        if count is None or count < 1:
+            return jsonify({
+                "success": False,
+                "error": "count must be a positive integer"
+            }), 400
+        if concurrency is not None and concurrency < 1:
+            return jsonify({
+                "success": False,
+                "error": "concurrency must be a positive integer"
+            }), 400
+        job = job_manager.submit(count, concurrency, max_events=buffer_size)
+    
+    token = job.attach()
+    
+    def events():
+        last = after
+        try:
+            yield sse("job", job.to_dict(), f"{job.id}:{last}")
+            while job.stream == token:
+                try:
+                    last, event, data = job.next_event(last, timeout=keepalive)
+                except queue.Empty:
+                    if job.finished:
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse(event, data, f"{job.id}:{last}")
+                if event == "done":
+                    return
+        finally:
+            # Client went away (or the stream ended): stop generating
+            # unless it reconnects in time
+            job_manager.detach(job, token, grace)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """All known batch jobs, newest first"""
+    init_jobs()
+    
+    jobs = sorted(job_manager.list(), key=lambda job: job.submitted_at, reverse=True)
+    return jsonify({
+        "success": True,
+        "jobs": [job.to_dict() for job in jobs]
+    })
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Progress (accepted, rejected, throughput, ETA) and result of a job"""
+    init_jobs()
+    
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "job": job.to_dict()
+    })
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a job; reviews already accepted are kept"""
+    init_jobs()
+    
+    job = job_manager.cancel(job_id)
+    if not job:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "job": job.to_dict()
+    })
+
+
 @app.route('/api/quality-check', methods=['POST'])
 def quality_check():
-    """Check quality of a provided review"""
+    """Check quality of a provided review
+    
+    Compares against `existing_reviews` from the request, or against a
+    server-side corpus given by `corpus_id` (optionally appending the review
+    when it passes, with `add_if_passed`).
+    """
     init_generator()
     
     try:
         data = request.get_json()
         review = data.get('review')
-        existing_reviews = data.get('existing_reviews', [])
+        corpus_id = data.get('corpus_id')
         
         if not review:
             return jsonify({
@@ -120,13 +396,31 @@ def quality_check():
                 "error": "Review object is required"
             }), 400
         
-        result = generator.quality.check_all(review, existing_reviews)
+        if corpus_id:
+            init_corpora()
+            corpus = corpus_store.get(corpus_id)
+            result = generator.quality.check_corpus(review, corpus)
+            if result["passed"] and data.get('add_if_passed', False):
+                corpus_store.add(corpus_id, [review])
+        else:
+            existing_reviews = data.get('existing_reviews', [])
+            result = generator.quality.check_all(review, existing_reviews)
         
         return jsonify({
             "success": True,
             "quality_check": result
         })
     
+    except CorpusNotFound:
+        return corpus_not_found(corpus_id)
+    
+    except CorpusBudgetExceeded as e:
+        # add_if_passed: the review is malformed or over the corpus budget
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
     except Exception as e:
         return jsonify({
             "success": False,
@@ -134,12 +428,149 @@ def quality_check():
         }), 500
 
 
+@app.route('/api/quality-check/batch', methods=['POST'])
+def quality_check_batch():
+    """Check many reviews in one request
+    
+    Reviews are compared against `existing_reviews`, or the corpus given by
+    `corpus_id`, and against each other (near-duplicates within the batch
+    fail as "batch_duplicate", semantic ones as "batch_semantic"). Each
+    verdict has the full score vector; set `realism` to false to skip the
+    LLM realism check.
+    """
+    init_generator()
+    
+    try:
+        data = request.get_json() or {}
+        reviews = data.get('reviews')
+        corpus_id = data.get('corpus_id')
+        max_batch = generator.config.get('quality_checks', {}).get('max_batch', 5000)
+        
+        if not isinstance(reviews, list) or not reviews:
+            return jsonify({
+                "success": False,
+                "error": "A non-empty reviews list is required"
+            }), 400
+        
+        if len(reviews) > max_batch:
+            return jsonify({
+                "success": False,
+                "error": f"At most {max_batch} reviews per batch"
+            }), 400
+        
+        if corpus_id:
+            init_corpora()
+            corpus = corpus_store.get(corpus_id)
+        else:
+            corpus = data.get('existing_reviews', [])
+        
+        results = generator.quality.check_batch(reviews, corpus, realism=data.get('realism', True))
+        
+        return jsonify({
+            "success": True,
+            "passed": sum(1 for r in results if r["passed"]),
+            "failed": sum(1 for r in results if not r["passed"]),
+            "results": results
+        })
+    
+    except CorpusNotFound:
+        return corpus_not_found(corpus_id)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/corpora', methods=['POST'])
+def create_corpus():
+    """Create a server-side corpus, optionally seeded with reviews"""
+    init_corpora()
+    
+    try:
+        data = request.get_json() or {}
+        corpus = corpus_store.create(data.get('reviews', []), data.get('id'))
+        
+        return jsonify({
+            "success": True,
+            "corpus": corpus.to_dict()
+        }), 201
+    
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+
+@app.route('/api/corpora', methods=['GET'])
+def list_corpora():
+    """Live corpora and store usage"""
+    init_corpora()
+    
+    return jsonify({
+        "success": True,
+        "corpora": [corpus.to_dict() for corpus in corpus_store.list()],
+        "stats": corpus_store.stats()
+    })
+
+
+@app.route('/api/corpora/<corpus_id>', methods=['GET'])
+def get_corpus(corpus_id):
+    init_corpora()
+    
+    try:
+        return jsonify({
+            "success": True,
+            "corpus": corpus_store.get(corpus_id).to_dict()
+        })
+    
+    except CorpusNotFound:
+        return corpus_not_found(corpus_id)
+
+
+@app.route('/api/corpora/<corpus_id>/reviews', methods=['POST'])
+def add_corpus_reviews(corpus_id):
+    """Append reviews to a corpus; its indexes are extended, not rebuilt"""
+    init_corpora()
+    
+    try:
+        data = request.get_json() or {}
+        corpus = corpus_store.add(corpus_id, data.get('reviews', []))
+        
+        return jsonify({
+            "success": True,
+            "corpus": corpus.to_dict()
+        })
+    
+    except CorpusNotFound:
+        return corpus_not_found(corpus_id)
+    
+    except CorpusBudgetExceeded as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+
+@app.route('/api/corpora/<corpus_id>', methods=['DELETE'])
+def delete_corpus(corpus_id):
+    init_corpora()
+    
+    try:
+        corpus_store.delete(corpus_id)
+        return jsonify({"success": True})
+    
+    except CorpusNotFound:
+        return corpus_not_found(corpus_id)
+
+
 @app.route('/api/reports/quality', methods=['POST'])
 def create_quality_report():
     """Generate quality report from latest generation"""
     try:
         import glob
-        from pathlib import Path
         
         # Find latest CSV log
         logs_dir = Path("data/synthetic/logs")
@@ -154,14 +585,15 @@ def create_quality_report():
         # Get most recent CSV
         latest_csv = max(csv_files, key=lambda p: p.stat().st_mtime)
         
-        # Find corresponding synthetic reviews
+        # Find corresponding synthetic reviews (JSON, or JSONL output)
         timestamp = latest_csv.stem.replace("generation_log_", "")
         synthetic_path = f"data/synthetic/reviews/reviews_clean_{timestamp}.json"
+        if not os.path.exists(synthetic_path):
+            synthetic_path += "l"
         
         if not os.path.exists(synthetic_path):
             # Try to find any recent synthetic file
-            reviews_dir = Path("data/synthetic/reviews")
-            synthetic_files = list(reviews_dir.glob("reviews_clean_*.json"))
+            synthetic_files = review_files("data/synthetic/reviews", "reviews_clean_")
             if synthetic_files:
                 synthetic_path = str(max(synthetic_files, key=lambda p: p.stat().st_mtime))
             else:
@@ -198,11 +630,8 @@ def create_quality_report():
 def create_comparison_report():
     """Generate comparison report using latest synthetic and real reviews"""
     try:
-        from pathlib import Path
-        
         # Find latest synthetic reviews
-        reviews_dir = Path("data/synthetic/reviews")
-        synthetic_files = list(reviews_dir.glob("reviews_clean_*.json"))
+        synthetic_files = review_files("data/synthetic/reviews", "reviews_clean_")
         
         if not synthetic_files:
             return jsonify({
@@ -247,8 +676,6 @@ def create_comparison_report():
 def list_files():
     """List all generated files"""
     try:
-        from pathlib import Path
-        
         files = {
             "csv_logs": [],
             "synthetic_reviews": [],
@@ -279,7 +706,7 @@ def list_files():
                     "size": f.stat().st_size,
                     "modified": f.stat().st_mtime
                 }
-                for f in sorted(reviews_dir.glob("reviews_clean_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+                for f in sorted(review_files(reviews_dir, "reviews_clean_"), key=lambda p: p.stat().st_mtime, reverse=True)
             ]
         
         # Synthetic with models
@@ -292,7 +719,7 @@ def list_files():
                     "size": f.stat().st_size,
                     "modified": f.stat().st_mtime
                 }
-                for f in sorted(models_dir.glob("reviews_with_models_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+                for f in sorted(review_files(models_dir, "reviews_with_models_"), key=lambda p: p.stat().st_mtime, reverse=True)
             ]
         
         # Reports
@@ -390,9 +817,17 @@ if __name__ == '__main__':
     print(f"📍 API: http://localhost:{port}/api")
     print(f"\n📚 API Endpoints:")
     print(f"   GET  /health                   - Health check")
+    print(f"   GET  /metrics                  - Prometheus metrics")
+    print(f"   GET  /api/providers/stats      - Pool and rate limiter stats")
     print(f"   POST /api/generate/single      - Generate one review")
-    print(f"   POST /api/generate/batch       - Generate multiple reviews")
+    print(f"   POST /api/generate/batch       - Start a batch generation job")
+    print(f"   GET  /api/generate/stream      - Stream reviews as server-sent events")
+    print(f"   GET  /api/jobs/<id>            - Job progress and result")
+    print(f"   POST /api/jobs/<id>/cancel     - Cancel a job")
     print(f"   POST /api/quality-check        - Check review quality")
+    print(f"   POST /api/quality-check/batch  - Check many reviews at once")
+    print(f"   POST /api/corpora              - Create a corpus session for quality checks")
+    print(f"   POST /api/corpora/<id>/reviews - Append reviews to a corpus")
     print(f"   POST /api/reports/quality      - Generate quality report")
     print(f"   POST /api/reports/comparison   - Generate comparison report")
     print(f"   GET  /api/config               - Get configuration")
@@ -1,32 +1,94 @@
+import time
 
-import os
-from openai import OpenAI
-from anthropic import Anthropic
+import metrics
+from hedging import Hedger
+from providers import RateLimited, get_registry
+from replay import get_replay
+
+DEFAULT_TEMPERATURE = {"openai": 0.8, "anthropic": 0.7}
+
+# What each hosted provider is actually asked for; a `models:` entry picks
+# the provider, its rate limiter and the model label on the review
+REQUEST_SETTINGS = {
+    "openai": ("gpt-4o-mini", 0.8),
+    "anthropic": ("claude-sonnet-4-20250514", 0.7),
+}
 
 
 class APIClient:
     
-    def __init__(self):
-        self.openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-    
-    def generate(self, provider, model, prompt):
-        if provider == "openai":
-            response = self.openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.8,
-                max_tokens=300,
-                response_format={"type": "json_object"}
-            )
-            return response.choices[0].message.content
+    def __init__(self, config=None):
+        config = config or {}
+        self.registry = get_registry(config)
+        self.replay = get_replay(config)
+        self.seed = config.get("generation", {}).get("seed")
+    
+        hedging = config.get("hedging", {})
+        self.hedger = None
+        if hedging.get("enabled", False):
+            self.hedger = Hedger(hedging, config.get("models", []), self.generate)
+    
+    def generate(self, provider, model, prompt, temperature=None):
+        if temperature is None:
+            temperature = DEFAULT_TEMPERATURE.get(provider, 0.8)
+    
+        return self.replay.call(
+            provider, model, prompt, temperature, self.seed,
+            lambda: self._request(provider, model, prompt, temperature),
+        )
+    
+    def _request(self, provider, model, prompt, temperature):
+        """Live provider call, counted and timed for /metrics"""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            text = self._call(provider, model, prompt, temperature)
+            outcome = "ok"
+            return text
+        except RateLimited:
+            outcome = "rate_limited"
+            raise
+        finally:
+            metrics.PROVIDER_REQUESTS.labels(provider, outcome).inc()
+            metrics.PROVIDER_SECONDS.labels(provider, model).observe(time.perf_counter() - start)
+    
+    def _call(self, provider, model, prompt, temperature):
+        request_model, request_temperature = REQUEST_SETTINGS.get(provider, (model, temperature))
         
+        if provider in ("openai", "local"):
+            extra = {"seed": self.seed} if self.seed is not None else {}
+            with self.registry.limit(provider, model):
+                response = self.registry.client(provider).chat.completions.create(
+                    model=request_model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=request_temperature,
+                    max_tokens=300,
+                    response_format={"type": "json_object"},
+                    **extra
+                )
+            return response.choices[0].message.content
+    
         elif provider == "anthropic":
-            response = self.anthropic.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=400,
-                temperature=0.7,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.registry.limit(provider, model):
+                response = self.registry.client("anthropic").messages.create(
+                    model=request_model,
+                    max_tokens=400,
+                    temperature=request_temperature,
+                    messages=[{"role": "user", "content": prompt}]
+                )
             return response.content[0].text
-    
\ No newline at end of file
+    
+        raise ValueError(f"Unknown provider: {provider}")
+    
+    def generate_hedged(self, model, prompt):
+        """Generate with a `models:` entry; returns (text, model that answered)"""
+        if self.hedger:
+            return self.hedger.generate(model, prompt)
+        return self.generate(model["provider"], model["model"], prompt, model.get("temperature")), model
+    
+    def stats(self):
+        """Connection pool, rate limiter, hedging and replay statistics"""
+        stats = self.registry.stats()
+        stats["hedging"] = self.hedger.stats() if self.hedger else None
+        stats["replay"] = self.replay.stats()
+        return stats
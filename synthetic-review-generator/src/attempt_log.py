@@ -0,0 +1,184 @@
+"""Buffered writer for the per-attempt generation log"""
+
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from logger import get_logger
+
+# Column dtypes for the numpy sidecar; columns not listed are stored as float64
+SIDECAR_DTYPES = {
+    "timestamp": "datetime64[us]",
+    "review_index": np.int32,
+    "attempt": np.int16,
+    "model": np.str_,
+    "title": np.str_,
+    "rating": np.float32,
+    "word_count": np.int32,
+    "passed": np.bool_,
+    "failed_metric": np.str_,
+    "generation_time_sec": np.float32,
+}
+
+_STOP = object()
+
+
+def write_sidecar_chunk(f, columns, rows):
+    """Append one batch as column arrays: names first, then one array per column"""
+    np.save(f, np.array(columns))
+    for i, name in enumerate(columns):
+        dtype = SIDECAR_DTYPES.get(name, np.float64)
+        values = [row[i] for row in rows]
+        if dtype is np.str_:
+            values = ["" if v is None else str(v) for v in values]
+        elif dtype in (np.float32, np.float64):
+            values = [np.nan if v is None or v == "" else v for v in values]
+        np.save(f, np.array(values, dtype=dtype))
+
+
+def read_sidecar(path):
+    """Columns of a sidecar log as numpy arrays"""
+    parts = {}
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        while f.tell() < size:
+            for name in np.load(f):
+                parts.setdefault(str(name), []).append(np.load(f))
+    return {name: np.concatenate(chunks) for name, chunks in parts.items()}
+
+
+def iter_attempt_rows(path):
+    """Yield attempt rows as string dicts (like csv.DictReader) from a CSV
+    log or its .npy sidecar"""
+    if not path.endswith(".npy"):
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+        return
+
+    columns = read_sidecar(path)
+    names = list(columns)
+    for values in zip(*(columns[name] for name in names)):
+        yield {name: str(value) for name, value in zip(names, values)}
+
+
+class AttemptLogWriter:
+    """Queue attempt rows and write them from a background thread.
+
+    Rows are written in batches when `batch_size` rows are queued or
+    `flush_interval` seconds have passed, to the CSV log and optionally a
+    columnar numpy sidecar. The writer drains on close(), which also runs at
+    interpreter exit. With background=False rows are written immediately by
+    the caller (the old behaviour).
+
+    A failed write is reported once; later rows are dropped (counted in
+    `dropped`) so generation keeps going, and close() raises the error.
+    Rows written after close() are written immediately.
+    """
+
+    def __init__(self, csv_path, columns, sidecar_path=None, batch_size=500,
+                 flush_interval=1.0, background=True):
+        self.csv_path = csv_path
+        self.sidecar_path = sidecar_path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self.rows_written = 0
+        self.dropped = 0
+        self.error = None
+        self._raised = False
+        self.closed = False
+        self.lock = threading.Lock()
+        # Orders write()'s enqueue against close()'s stop marker
+        self._queue_lock = threading.Lock()
+
+        self.queue = queue.Queue()
+        self.thread = None
+        if background:
+            self.thread = threading.Thread(target=self._run, name="attempt-log", daemon=True)
+            self.thread.start()
+        atexit.register(self.close)
+
+    def _write_batch(self, rows):
+        if not rows:
+            return
+        with open(self.csv_path, "a", newline="") as f:
+            csv.writer(f).writerows(rows)
+        if self.sidecar_path:
+            with open(self.sidecar_path, "ab") as f:
+                write_sidecar_chunk(f, self.columns, rows)
+        self.rows_written += len(rows)
+
+    def _write(self, rows):
+        """Write a batch, or drop it once a write has failed"""
+        if not rows:
+            return
+        if self.error is None:
+            try:
+                self._write_batch(rows)
+                return
+            except Exception as e:
+                self.error = e
+                get_logger().error(
+                    f"Attempt log: writing {self.csv_path} failed ({e}); dropping further rows"
+                )
+        self.dropped += len(rows)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _STOP and not isinstance(item, threading.Event):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            with self.lock:
+                self._write(batch)
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def write(self, row):
+        if self.background and self.error is None:
+            with self._queue_lock:
+                if not self.closed:
+                    self.queue.put(row)
+                    return
+        with self.lock:
+            self._write([row])
+
+    def flush(self):
+        """Block until every queued row is on disk"""
+        if self.thread and self.thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait()
+
+    def close(self):
+        """Drain the queue; raises the write error, if any, once"""
+        with self._queue_lock:
+            self.closed = True
+            if self.thread and self.thread.is_alive():
+                self.queue.put(_STOP)
+        if self.thread:
+            self.thread.join()
+        atexit.unregister(self.close)
+        if self.error is not None and not self._raised:
+            self._raised = True
+            raise self.error
@@ -2,11 +2,11 @@ import random
 import json
 import os
 import yaml
-from openai import OpenAI
-from anthropic import Anthropic
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from providers import get_registry
+
 load_dotenv()
 
 
@@ -17,9 +17,8 @@ class ReviewGenerator:
         with open('config/config.yaml', 'r') as f:
             self.config = yaml.safe_load(f)
         
-        # Setup APIs
-        self.openai = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.anthropic = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        # Setup APIs (shared, pooled clients)
+        self.registry = get_registry(self.config)
     
     def generate_one(self):
         """Generate one review"""
@@ -39,20 +38,22 @@ JSON format: {{"title": "...", "pros": "...", "cons": "..."}}"""
         
         try:
             if provider == "openai":
-                text = self.openai.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.8,
-                    response_format={"type": "json_object"}
-                ).choices[0].message.content
+                with self.registry.limit(provider, model['model']):
+                    text = self.registry.client("openai").chat.completions.create(
+                        model="gpt-4o-mini",
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.8,
+                        response_format={"type": "json_object"}
+                    ).choices[0].message.content
             
             elif provider == "anthropic":
-                text = self.anthropic.messages.create(
-                    model="claude-sonnet-4-20250514",
-                    max_tokens=500,
-                    temperature=0.7,
-                    messages=[{"role": "user", "content": prompt}]
-                ).content[0].text
+                with self.registry.limit(provider, model['model']):
+                    text = self.registry.client("anthropic").messages.create(
+                        model="claude-sonnet-4-20250514",
+                        max_tokens=500,
+                        temperature=0.7,
+                        messages=[{"role": "user", "content": prompt}]
+                    ).content[0].text
             
             else:
                 raise ValueError(f"Unknown provider: {provider}")
@@ -0,0 +1,193 @@
+"""Scaling benchmark for the quality pipeline"""
+
+import json
+import os
+import platform
+import random
+import re
+import resource
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from quality.checker import FIXED_ORDER, QualityChecker
+from quality.local_realism import load_positive_texts
+
+_PARTS = re.compile(r"^(.*?)\. Pros: (.*?) Cons: (.*)$", re.S)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+def _fragments(raw_dir, synthetic_dir):
+    """Titles, pros sentences and cons sentences from stored reviews"""
+    titles, pros, cons = [], [], []
+    for text in load_positive_texts(raw_dir, synthetic_dir):
+        match = _PARTS.match(text)
+        if not match:
+            continue
+        titles.append(match.group(1))
+        pros += [s for s in _SENTENCE.split(match.group(2)) if s.strip()]
+        cons += [s for s in _SENTENCE.split(match.group(3)) if s.strip()]
+    return titles, pros, cons
+
+
+def build_corpus(size, fragments, keywords, seed=0):
+    """`size` review dicts recombined from real/synthetic review fragments"""
+    titles, pros, cons = fragments
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        title = rng.choice(titles)
+        p = " ".join(rng.sample(pros, rng.randint(2, 4)))
+        c = " ".join(rng.sample(cons, rng.randint(1, 2)))
+        corpus.append({
+            "rating": rng.choice([1.0, 2.0, 3.0, 3.5, 4.0, 4.5, 5.0]),
+            "review_text": f"{title}. Pros: {p} Cons: {c}",
+            "persona_keywords": rng.choice(keywords),
+        })
+    return corpus
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(durations):
+    d = np.asarray(durations)
+    return {
+        "p50_ms": round(float(np.percentile(d, 50)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(d, 99)) * 1000, 4),
+        "mean_ms": round(float(d.mean()) * 1000, 4),
+        "throughput_per_sec": round(len(d) / float(d.sum()), 1) if d.sum() else None,
+    }
+
+
+def _stub_realism(checker):
+    checker.realism.check = lambda text: {"passed": True, "score": 8.0}
+
+
+def bench_size(config, corpus, candidates):
+    """Time each metric's check against a fixed corpus"""
+    checker = QualityChecker(config)
+    _stub_realism(checker)
+
+    # First checks index the whole corpus
+    start = time.perf_counter()
+    warmup = checker.analyze(candidates[0])
+    checker.diversity.check(warmup, corpus)
+    diversity_build = time.perf_counter() - start
+    start = time.perf_counter()
+    checker.semantic.check(warmup, corpus)
+    semantic_build = time.perf_counter() - start
+
+    timings = {"analysis": []}
+    timings.update({name: [] for name in FIXED_ORDER})
+    check_all = []
+    for review in candidates:
+        start = time.perf_counter()
+        analysis = checker.analyze(review).warm()  # computed once, shared by metrics
+        timings["analysis"].append(time.perf_counter() - start)
+
+        for name in FIXED_ORDER:
+            start = time.perf_counter()
+            checker._run_metric(name, review, analysis, corpus)
+            timings[name].append(time.perf_counter() - start)
+
+    for review in candidates:
+        fresh = dict(review)  # new object, so analysis is not reused
+        start = time.perf_counter()
+        checker.check_all(fresh, corpus)
+        check_all.append(time.perf_counter() - start)
+
+    return {
+        "corpus_size": len(corpus),
+        "candidates": len(candidates),
+        "index_build_sec": {
+            "diversity": round(diversity_build, 3),
+            "semantic": round(semantic_build, 3),
+        },
+        "metrics": {name: summarize(t) for name, t in timings.items()},
+        "check_all": summarize(check_all),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(config, sizes=None, candidates=200, raw_dir="data/raw",
+                  synthetic_dir="data/synthetic", seed=0, log=print):
+    """Benchmark every corpus size; sizes run smallest first so peak RSS
+    grows with them"""
+    sizes = sorted(sizes or DEFAULT_SIZES)
+    config = {**config, "score_cache": {"enabled": False}}
+    fragments = _fragments(raw_dir, synthetic_dir)
+    keywords = [p.get("keywords", []) for p in config["personas"]]
+    probes = build_corpus(candidates, fragments, keywords, seed=seed + 1)
+
+    results = {}
+    for size in sizes:
+        corpus = build_corpus(size, fragments, keywords, seed=seed)
+        results[str(size)] = bench_size(config, corpus, probes)
+        log(
+            f"{size:>7} reviews: check_all p50 {results[str(size)]['check_all']['p50_ms']:.2f} ms, "
+            f"p99 {results[str(size)]['check_all']['p99_ms']:.2f} ms, "
+            f"peak RSS {results[str(size)]['peak_rss_mb']} MB"
+        )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "candidates": candidates,
+            "seed": seed,
+            "realism": "stubbed",
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.2, min_delta_ms=0.05):
+    """Latency regressions vs a baseline run: slower by more than `tolerance`
+    (relative) and by more than `min_delta_ms`, which keeps timer jitter on
+    microsecond-scale metrics from being flagged"""
+    regressions = []
+    for size, result in current["results"].items():
+        base = baseline["results"].get(size)
+        if not base:
+            continue
+
+        stages = {**result["metrics"], "check_all": result["check_all"]}
+        base_stages = {**base["metrics"], "check_all": base["check_all"]}
+        for stage, stats in stages.items():
+            if stage not in base_stages:
+                continue
+            for field in ("p50_ms", "p99_ms"):
+                old, new = base_stages[stage][field], stats[field]
+                if old and new > old * (1 + tolerance) and new - old > min_delta_ms:
+                    regressions.append({
+                        "corpus_size": int(size),
+                        "stage": stage,
+                        "field": field,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(new / old - 1, 3),
+                    })
+    return regressions
+
+
+def save_results(results, path=None):
+    if path is None:
+        os.makedirs("data/benchmarks", exist_ok=True)
+        path = f"data/benchmarks/benchmark_{results['meta']['timestamp']}.json"
+    else:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
@@ -0,0 +1,53 @@
+"""Checkpoints for resuming interrupted generation runs"""
+
+import os
+import pickle
+
+
+class Checkpointer:
+    """Snapshot of one run at <checkpoint_dir>/<run_id>/checkpoint.pkl.
+
+    The state holds the per-index results and accepted corpus, the
+    similarity indexes, RNG state and the byte offsets of the CSV log and
+    JSONL outputs at the time of the snapshot. Writes go to a temp file and
+    are renamed into place, so a crash mid-save keeps the previous snapshot.
+    """
+
+    def __init__(self, checkpoint_dir, run_id):
+        self.run_id = run_id
+        self.dir = os.path.join(checkpoint_dir, run_id)
+        self.path = os.path.join(self.dir, "checkpoint.pkl")
+        self.saves = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def save(self, blob):
+        """Persist an already-pickled state"""
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.saves += 1
+
+    def load(self):
+        if not self.exists():
+            raise FileNotFoundError(f"No checkpoint for run {self.run_id} at {self.path}")
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def clear(self):
+        """Remove the checkpoint once the run has finished"""
+        if self.exists():
+            os.remove(self.path)
+        if os.path.isdir(self.dir) and not os.listdir(self.dir):
+            os.rmdir(self.dir)
+
+
+def truncate(path, offset):
+    """Cut a file back to a checkpointed size (drops rows written after it)"""
+    with open(path, "r+b") as f:
+        f.truncate(offset)
@@ -2,8 +2,10 @@
 """Unified CLI for synthetic review generation"""
 
 import argparse
+import json
 import os
 import sys
+import yaml
 from dotenv import load_dotenv
 
 sys.path.append('src')
@@ -11,31 +13,65 @@ sys.path.append('src')
 from generator import ReviewGenerator
 from reports import generate_quality_report, generate_comparison_report
 from logger import get_logger
+from quality.local_realism import train_local_realism
+from local_provider import create_app as create_fake_provider
+from benchmark import DEFAULT_SIZES, compare, run_benchmark, save_results
+from replay import get_replay
+from rescore import rescore
 
 
-def check_env():
+def check_env(providers=("openai", "anthropic")):
     load_dotenv()
     
-    if not os.getenv("OPENAI_API_KEY"):
+    if "openai" in providers and not os.getenv("OPENAI_API_KEY"):
         print("ERROR: OPENAI_API_KEY not found in .env")
         sys.exit(1)
-    if not os.getenv("ANTHROPIC_API_KEY"):
+    if "anthropic" in providers and not os.getenv("ANTHROPIC_API_KEY"):
         print("ERROR: ANTHROPIC_API_KEY not found in .env")
         sys.exit(1)
 
 
+def required_providers(config):
+    """Providers a generation run will call"""
+    providers = {m["provider"] for m in config["models"] if m.get("weight", 0) > 0}
+    realism = config.get("realism", {})
+    if realism.get("backend", "llm") == "llm":
+        providers.add(realism.get("provider", "openai"))
+    return providers
+
+
 def cmd_generate(args):
     """Generate reviews"""
-    check_env()
-    
     logger = get_logger(verbose=args.verbose)
-    gen = ReviewGenerator(args.config, verbose=args.verbose)
-    result = gen.generate_all(count=args.count)
+    gen = ReviewGenerator(args.config, verbose=args.verbose, resume=args.resume)
+    if args.resume:
+        logger.info(f"Resuming run {args.resume}")
+    
+    # Replayed runs never reach the providers
+    if not gen.api.replay.offline:
+        check_env(required_providers(gen.config))
+    
+    try:
+        result = gen.generate_all(count=args.count, concurrency=args.concurrency)
+    finally:
+        gen.close()
     
     logger.info(f"\nGeneration complete!")
     logger.info(f"Clean reviews: {result['clean_path']}")
     logger.info(f"With models: {result['with_models_path']}")
     logger.info(f"CSV log: {result['csv_log']}")
+    logger.debug(f"Metric order: {' > '.join(result['quality_stats']['order'])}")
+    drift = result['quality_stats']['semantic_drift']
+    if drift['samples']:
+        logger.debug(
+            f"Semantic index drift vs refit: max {drift['max_abs_diff']:.3f}, "
+            f"{drift['threshold_flips']} threshold flips in {drift['samples']} samples"
+        )
+    for provider, window in (result['provider_stats'].get('concurrency') or {}).items():
+        logger.debug(
+            f"{provider}: window {window['window']}, "
+            f"{window['rate_limits']} rate limits, {window['successes']} ok"
+        )
     
     # Auto-generate reports
     if args.with_reports:
@@ -87,6 +123,77 @@ def cmd_compare(args):
         print(f"\n{text}")
 
 
+def cmd_train_realism(args):
+    """Train the offline realism scorer"""
+    info = train_local_realism(args.output, args.raw_dir, args.synthetic_dir, seed=args.seed)
+    print(f"Local realism model saved: {info['model_path']}")
+    print(f"Trained on {info['positives']} real/accepted and {info['negatives']} known-bad reviews")
+
+
+def cmd_fake_provider(args):
+    """Serve the local fake provider over HTTP (OpenAI chat-completions shape)"""
+    with open(args.config) as f:
+        settings = yaml.safe_load(f).get("providers", {}).get("local", {})
+    print(f"Fake provider: http://{args.host}:{args.port}/v1 (set providers.openai.base_url)")
+    create_fake_provider(settings).run(host=args.host, port=args.port, threaded=True)
+
+
+def cmd_benchmark(args):
+    """Benchmark quality checks against growing corpora"""
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    sizes = [int(s) for s in args.sizes.split(',')]
+    
+    results = run_benchmark(config, sizes, args.candidates, seed=args.seed)
+    path = save_results(results, args.output)
+    print(f"Benchmark results: {path}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+            return
+        
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%} vs {args.baseline}:")
+        for r in regressions:
+            print(
+                f"  {r['corpus_size']:>7} {r['stage']:<10} {r['field']}: "
+                f"{r['baseline']:.3f} -> {r['current']:.3f} ms ({r['change']:+.0%})"
+            )
+        sys.exit(1)
+
+
+def cmd_rescore(args):
+    """Re-check a stored dataset against the current quality config"""
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    
+    # Cache misses are scored live unless replayed
+    realism = config.get("realism", {})
+    if (args.realism == "score" and realism.get("backend", "llm") == "llm"
+            and not get_replay(config).offline):
+        check_env({realism.get("provider", "openai")})
+    
+    result = rescore(
+        args.input, config,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        realism=args.realism,
+        attempts_path=args.log,
+    )
+    
+    print(f"\n{result['accepted']} of {result['reviews']} reviews pass "
+          f"({result['newly_rejected']} newly rejected, {result['newly_accepted']} newly accepted)")
+    for metric, count in result['rejections'].items():
+        print(f"  {metric}: {count}")
+    print(f"Filtered dataset: {result['with_models_path']}")
+    print(f"Clean reviews: {result['clean_path']}")
+    print(f"Verdicts: {result['verdicts_path']}")
+    print(f"Report: {result['report_path']}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Synthetic Review Generator',
@@ -96,7 +203,13 @@ Examples:
   python src/cli.py generate --count 400
   python src/cli.py generate --count 100 --with-reports --real-reviews data/raw/real_reviews.json
   python src/cli.py generate --count 10 --quiet
+  python src/cli.py generate --count 400 --concurrency 8
+  python src/cli.py generate --resume 20260113_230413
   python src/cli.py quality-report --csv data/synthetic/logs/generation_log_*.csv
+  python src/cli.py train-realism --output models/realism_local.joblib
+  python src/cli.py fake-provider --port 8900
+  python src/cli.py benchmark --sizes 100,1000,10000 --baseline data/benchmarks/baseline.json
+  python src/cli.py rescore --input data/synthetic/reviews_models/reviews_with_models_*.json --realism cached
   python src/cli.py compare --real data/raw/real_reviews.json --synthetic data/synthetic/reviews/reviews_clean_*.json
         """
     )
@@ -112,6 +225,8 @@ Examples:
     gen_parser.add_argument('--quiet', action='store_true', help='Minimal output')
     gen_parser.add_argument('--verbose', action='store_true', default=True, help='Verbose output (default)')
     gen_parser.add_argument('--charts', action='store_true', help='Generate visualization charts')
+    gen_parser.add_argument('--concurrency', type=int, help='Review slots in flight (default: config generation.concurrency)')
+    gen_parser.add_argument('--resume', metavar='RUN_ID', help='Continue a checkpointed run (its timestamp); --count is taken from the checkpoint')
 
     gen_parser.set_defaults(func=cmd_generate)
     
@@ -134,6 +249,46 @@ Examples:
     compare_parser.add_argument('--charts', action='store_true', help='Include charts')
     compare_parser.set_defaults(func=cmd_compare)
     
+    # TRAIN-REALISM
+    train_parser = subparsers.add_parser('train-realism', help='Train the offline realism scorer')
+    train_parser.add_argument('--output', default='models/realism_local.joblib', help='Model artifact path')
+    train_parser.add_argument('--raw-dir', default='data/raw', help='Real reviews directory')
+    train_parser.add_argument('--synthetic-dir', default='data/synthetic', help='Accepted synthetic reviews directory')
+    train_parser.add_argument('--seed', type=int, default=0, help='Seed for known-bad examples')
+    train_parser.set_defaults(func=cmd_train_realism)
+    
+    # FAKE-PROVIDER
+    fake_parser = subparsers.add_parser('fake-provider', help='Serve the offline fake LLM provider over HTTP')
+    fake_parser.add_argument('--config', default='config/config.yaml', help='Config file (providers.local settings)')
+    fake_parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    fake_parser.add_argument('--port', type=int, default=8900, help='Port')
+    fake_parser.set_defaults(func=cmd_fake_provider)
+    
+    # BENCHMARK
+    bench_parser = subparsers.add_parser('benchmark', help='Benchmark quality checks vs corpus size')
+    bench_parser.add_argument('--config', default='config/config.yaml', help='Config file')
+    bench_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Comma-separated corpus sizes')
+    bench_parser.add_argument('--candidates', type=int, default=200, help='Reviews checked per corpus size')
+    bench_parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    bench_parser.add_argument('--output', help='Results JSON (default: data/benchmarks/benchmark_<timestamp>.json)')
+    bench_parser.add_argument('--baseline', help='Baseline results JSON to compare against')
+    bench_parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown before flagging')
+    bench_parser.add_argument('--min-delta-ms', type=float, default=0.05, help='Ignore slowdowns smaller than this')
+    bench_parser.set_defaults(func=cmd_benchmark)
+    
+    # RESCORE
+    rescore_parser = subparsers.add_parser('rescore', help='Re-run quality checks over a stored dataset')
+    rescore_parser.add_argument('--input', required=True, help='reviews_with_models JSON or JSONL')
+    rescore_parser.add_argument('--config', default='config/config.yaml', help='Config file (thresholds to apply)')
+    rescore_parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    rescore_parser.add_argument('--chunk-size', type=int, default=200, help='Reviews per worker task')
+    rescore_parser.add_argument('--realism', choices=['score', 'cached', 'skip'], default='cached',
+                                help='cached: cached scores only (misses pass); '
+                                     'score: cached scores, then live requests for misses; skip: no realism check')
+    rescore_parser.add_argument('--log', help='Attempt log of the original run, for its verdicts '
+                                              '(default: the generation log next to the input)')
+    rescore_parser.set_defaults(func=cmd_rescore)
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -0,0 +1,112 @@
+"""Adaptive (AIMD) limit on in-flight provider requests"""
+
+import threading
+import time
+
+
+class ProviderWindow:
+    """Congestion window and counters for one provider"""
+
+    def __init__(self, initial):
+        self.window = float(initial)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.latency = None
+        self.successes = 0
+        self.rate_limits = 0
+        self.errors = 0
+
+    def to_dict(self):
+        return {
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "latency_ewma_sec": round(self.latency, 3) if self.latency is not None else None,
+            "successes": self.successes,
+            "rate_limits": self.rate_limits,
+            "errors": self.errors,
+            "blocked_for_sec": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+        }
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency per provider.
+
+    Each success under the latency target grows the window by
+    `additive_increase / window` (about +1 per window of requests);
+    a 429 / overload multiplies it by `multiplicative_decrease` and
+    blocks new requests until Retry-After has passed.
+    """
+
+    def __init__(self, settings=None):
+        self.smoothing = 0.2
+        self.providers = {}
+        self.cond = threading.Condition()
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        """Apply new settings, keeping each provider's window and in-flight count"""
+        settings = settings or {}
+        with self.cond:
+            self.initial_window = settings.get("initial_window", 4)
+            self.min_window = settings.get("min_window", 1)
+            self.max_window = settings.get("max_window", 32)
+            self.additive_increase = settings.get("additive_increase", 1)
+            self.multiplicative_decrease = settings.get("multiplicative_decrease", 0.5)
+            self.latency_target = settings.get("latency_target_sec", 15)
+            for state in self.providers.values():
+                state.window = min(self.max_window, max(self.min_window, state.window))
+            self.cond.notify_all()
+
+    def _state(self, provider):
+        if provider not in self.providers:
+            self.providers[provider] = ProviderWindow(self.initial_window)
+        return self.providers[provider]
+
+    def acquire(self, provider):
+        """Block until the provider's window has room"""
+        with self.cond:
+            state = self._state(provider)
+            while True:
+                wait = state.blocked_until - time.monotonic()
+                if wait <= 0 and state.in_flight < max(1, int(state.window)):
+                    state.in_flight += 1
+                    return
+                self.cond.wait(timeout=wait if wait > 0 else None)
+
+    def on_success(self, provider, latency):
+        with self.cond:
+            state = self._state(provider)
+            state.in_flight -= 1
+            state.successes += 1
+            if state.latency is None:
+                state.latency = latency
+            else:
+                state.latency += self.smoothing * (latency - state.latency)
+
+            if state.latency <= self.latency_target:
+                state.window = min(
+                    self.max_window,
+                    state.window + self.additive_increase / state.window,
+                )
+            self.cond.notify_all()
+
+    def on_rate_limit(self, provider, retry_after=None):
+        with self.cond:
+            state = self._state(provider)
+            state.in_flight -= 1
+            state.rate_limits += 1
+            state.window = max(self.min_window, state.window * self.multiplicative_decrease)
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+            self.cond.notify_all()
+
+    def on_error(self, provider):
+        with self.cond:
+            state = self._state(provider)
+            state.in_flight -= 1
+            state.errors += 1
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {provider: state.to_dict() for provider, state in self.providers.items()}
@@ -3,13 +3,168 @@
 import os
 import json
 import csv
+import textwrap
+import time
 from datetime import datetime
 
+from attempt_log import AttemptLogWriter
+from checkpoint import truncate
+from timing import STAGE_COLUMNS
+
+
+LOG_COLUMNS = [
+    "timestamp", "review_index", "attempt", "model",
+    "title", "rating", "word_count", "passed",
+    "failed_metric", "generation_time_sec"
+] + STAGE_COLUMNS
+
+CLEAN_FIELDS = ["rating", "review_text", "title", "pros", "cons"]
+
+# Titles are cut to this length in the attempt log
+LOG_TITLE_CHARS = 50
+
+
+def clean_review(review):
+    """Review without generation metadata (model, persona)"""
+    return {field: review[field] for field in CLEAN_FIELDS}
+
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """Decode the elements of a JSON array one at a time, reading in chunks"""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    started = False
+    
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("Expected a JSON array")
+            started, pos = True, pos + 1
+            continue
+        if buffer[pos] == "]":
+            return
+        
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            end = None
+        # An element touching the end of the buffer may be cut short
+        if end is None or (end == len(buffer) and not eof):
+            if eof:
+                raise ValueError("Invalid JSON array")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        
+        yield item
+        pos = end
+
+
+def iter_reviews(path):
+    """Yield reviews from a JSON array or a JSONL file (both streamed)"""
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line cut short by a crash mid-write
+                    continue
+        else:
+            yield from _iter_json_array(f)
+
+
+def load_reviews(path):
+    """Reviews from a JSON array or a JSONL file"""
+    return list(iter_reviews(path))
+
+
+def jsonl_to_json(jsonl_path, json_path):
+    """Rewrite a JSONL file as an indented JSON array, one review at a time"""
+    count = 0
+    with open(json_path, "w") as out:
+        out.write("[")
+        for review in iter_reviews(jsonl_path):
+            out.write(",\n" if count else "\n")
+            out.write(textwrap.indent(json.dumps(review, indent=2), "  "))
+            count += 1
+        out.write("\n]" if count else "]")
+    return json_path
+
+
+class ReviewStream:
+    """Append accepted reviews to JSONL files, flushing in batches.
+
+    Rows are buffered and written every `flush_every` reviews or when
+    `flush_interval` seconds have passed, optionally fsync'ed, so a crash
+    loses at most one batch.
+    """
+    
+    def __init__(self, with_models_path, clean_path, flush_every=20, flush_interval=5.0, fsync=True, mode="w"):
+        self.with_models_path = with_models_path
+        self.clean_path = clean_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.count = 0
+        self.closed = False
+        
+        self._files = [open(with_models_path, mode), open(clean_path, mode)]
+        self._buffer = []
+        self._last_flush = time.monotonic()
+    
+    def append(self, review):
+        self._buffer.append(review)
+        self.count += 1
+        if (len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            with_models, clean = self._files
+            with_models.write("".join(json.dumps(r) + "\n" for r in self._buffer))
+            clean.write("".join(json.dumps(clean_review(r)) + "\n" for r in self._buffer))
+            self._buffer = []
+        
+        for f in self._files:
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._last_flush = time.monotonic()
+    
+    def offsets(self):
+        """Flush and return the byte size of both files (for checkpoints)"""
+        self.flush()
+        return [f.tell() for f in self._files]
+    
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        for f in self._files:
+            f.close()
+        self.closed = True
+
 
 class FileManager:
     """Handle file I/O and CSV logging"""
     
-    def __init__(self, timestamp=None):
+    def __init__(self, timestamp=None, resume=False, log_settings=None):
         self.timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Setup directories
@@ -25,34 +180,118 @@ class FileManager:
         self.csv_file = os.path.join(
             self.logs_dir, f"generation_log_{self.timestamp}.csv"
         )
-        self._init_csv()
+        log_settings = log_settings or {}
+        self.sidecar_file = None
+        if log_settings.get("sidecar") == "npy":
+            self.sidecar_file = os.path.join(
+                self.logs_dir, f"generation_log_{self.timestamp}.npy"
+            )
+        
+        # A resumed run keeps appending to its existing log
+        if not resume:
+            self._init_csv()
+        
+        self.log_writer = AttemptLogWriter(
+            self.csv_file,
+            LOG_COLUMNS,
+            sidecar_path=self.sidecar_file,
+            batch_size=log_settings.get("batch_size", 500),
+            flush_interval=log_settings.get("flush_interval_sec", 1.0),
+            background=log_settings.get("buffered", True),
+        )
     
     def _init_csv(self):
         """Initialize CSV log with headers"""
         with open(self.csv_file, "w", newline="") as f:
             writer = csv.writer(f)
-            writer.writerow([
-                "timestamp", "review_index", "attempt", "model",
-                "title", "rating", "word_count", "passed",
-                "failed_metric", "generation_time_sec"
-            ])
-    
-    def log_attempt(self, review_index, attempt, review, passed, failed_metric, gen_time):
-        """Log a generation attempt to CSV"""
-        with open(self.csv_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().isoformat(),
-                review_index,
-                attempt,
-                review.get("model", "error"),
-                review.get("title", "ERROR")[:50],
-                review.get("rating", 0),
-                len(review.get("review_text", "").split()),
-                passed,
-                failed_metric,
-                gen_time
-            ])
+            writer.writerow(LOG_COLUMNS)
+        if self.sidecar_file:
+            open(self.sidecar_file, "wb").close()
+    
+    def log_attempt(self, review_index, attempt, review, passed, failed_metric, gen_time, word_count=None, stage_times=None):
+        """Queue a generation attempt for the CSV log
+        
+        stage_times holds the per-stage durations (timing.Spans.row()).
+        """
+        if word_count is None:
+            word_count = len(review.get("review_text", "").split())
+        if stage_times is None:
+            stage_times = [""] * len(STAGE_COLUMNS)
+        
+        self.log_writer.write([
+            datetime.now().isoformat(),
+            review_index,
+            attempt,
+            review.get("model", "error"),
+            review.get("title", "ERROR")[:LOG_TITLE_CHARS],
+            review.get("rating", 0),
+            word_count,
+            passed,
+            failed_metric,
+            gen_time,
+            *stage_times
+        ])
+    
+    def flush_log(self):
+        """Write out every queued attempt"""
+        self.log_writer.flush()
+    
+    def close_log(self):
+        """Drain the attempt queue and stop the writer thread (raises if a
+        log write failed)"""
+        self.log_writer.close()
+    
+    def log_offsets(self):
+        """Flush and return the byte size of the log files (for checkpoints)"""
+        self.flush_log()
+        return [
+            os.path.getsize(path) if path else None
+            for path in (self.csv_file, self.sidecar_file)
+        ]
+    
+    def truncate_log(self, offsets):
+        """Cut the log files back to checkpointed offsets"""
+        for path, offset in zip((self.csv_file, self.sidecar_file), offsets):
+            if path and offset is not None and os.path.exists(path):
+                truncate(path, offset)
+    
+    def open_stream(self, flush_every=20, flush_interval=5.0, fsync=True, offsets=None):
+        """Start streaming accepted reviews to JSONL files
+        
+        offsets (from a checkpoint) cuts existing files back and appends.
+        """
+        paths = [
+            f"{self.models_dir}/reviews_with_models_{self.timestamp}.jsonl",
+            f"{self.reviews_dir}/reviews_clean_{self.timestamp}.jsonl",
+        ]
+        if offsets:
+            for path, offset in zip(paths, offsets):
+                truncate(path, offset)
+        
+        return ReviewStream(
+            *paths, flush_every, flush_interval, fsync, mode="a" if offsets else "w"
+        )
+    
+    def close_stream(self, stream, finalize=False):
+        """Close a review stream; finalize also writes the JSON arrays"""
+        stream.close()
+        paths = {
+            'clean_path': stream.clean_path,
+            'with_models_path': stream.with_models_path,
+            'csv_log': self.csv_file
+        }
+        
+        if finalize:
+            paths['with_models_path'] = jsonl_to_json(
+                stream.with_models_path,
+                f"{self.models_dir}/reviews_with_models_{self.timestamp}.json"
+            )
+            paths['clean_path'] = jsonl_to_json(
+                stream.clean_path,
+                f"{self.reviews_dir}/reviews_clean_{self.timestamp}.json"
+            )
+        
+        return paths
     
     def save_reviews(self, final_reviews, clean_reviews):
         """Save generated reviews to JSON files"""
@@ -1,78 +1,131 @@
 """Core review generation logic"""
 
+import asyncio
+import pickle
 import random
 import json
+import threading
 import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 
 import sys
 sys.path.append('src')
 
+import metrics
 from api_client import APIClient
 from prompt_builder import PromptBuilder
-from file_manager import FileManager
+from file_manager import FileManager, clean_review
+from checkpoint import Checkpointer
+from timing import Spans
+from providers import RateLimited
 from quality.checker import QualityChecker
 from tqdm import tqdm
 
+# Result of a slot dropped by cancellation
+CANCELLED = object()
+
+
+def tee_attempts(log_attempt, on_attempt=None):
+    """log_attempt that also hands each row to on_attempt right away"""
+    if on_attempt is None:
+        return log_attempt
+    
+    def both(*row):
+        on_attempt(*row)
+        log_attempt(*row)
+    return both
+
 
 class ReviewGenerator:
     """Main review generator with quality checks"""
     
-    def __init__(self, config_path="config/config.yaml", verbose=True):
+    def __init__(self, config_path="config/config.yaml", verbose=True, resume=None, run_id=None,
+                 shared_quality=None, checkpoints=True):
         self.verbose = verbose
+        self.resume = resume  # run id of a checkpointed run to continue
+        # checkpoints=False overrides checkpointing.enabled (runs nobody can resume)
+        self.checkpoints = checkpoints
+        # Own RNG, so concurrent generators (API jobs) don't reseed each other
+        self.random = random.Random()
+        # Backoff jitter has its own RNG too, so rate limits don't shift a seeded run
+        self.jitter = random.Random()
         
         # Load config
         with open(config_path, "r") as f:
             self.config = yaml.safe_load(f)
         
         # Initialize components
-        self.api = APIClient()
+        self.api = APIClient(self.config)
         self.prompt_builder = PromptBuilder()
-        self.file_manager = FileManager()
-        self.quality = QualityChecker(self.config)
+        self.file_manager = FileManager(
+            timestamp=resume or run_id,
+            resume=bool(resume),
+            log_settings=self.config.get('attempt_log')
+        )
+        # shared_quality (another generator's checker) shares the score
+        # cache and realism batcher; similarity indexes stay per generator
+        self.quality = QualityChecker(self.config, shared=shared_quality)
+        self._accept_lock = threading.Lock()
+    
+    def close(self):
+        """Stop the attempt log writer, realism batcher and score cache
+        (raises if an attempt log write failed)"""
+        try:
+            self.quality.close()
+        finally:
+            self.file_manager.close_log()
     
     def _select_random_config(self):
         """Select random persona, rating, and model"""
-        persona = random.choices(
+        persona = self.random.choices(
             self.config["personas"],
             weights=[p["weight"] for p in self.config["personas"]]
         )[0]
         
-        rating = random.choices(
+        rating = self.random.choices(
             list(self.config["rating_distribution"].keys()),
             weights=list(self.config["rating_distribution"].values())
         )[0]
         
-        model = random.choices(
+        model = self.random.choices(
             self.config["models"],
             weights=[m["weight"] for m in self.config["models"]]
         )[0]
         
         return persona, rating, model
     
-    def generate_one_raw(self, force_bad=False):
-        """Generate one raw review"""
+    def generate_one_raw(self, force_bad=False, spans=None):
+        """Generate one raw review
+        
+        spans (timing.Spans) records prompt build, provider call and parse
+        times.
+        """
+        spans = spans or Spans()
         persona, rating, model = self._select_random_config()
         
         # Build prompt
-        if force_bad:
-            prompt = self.prompt_builder.build_bad_prompt()
-        else:
-            prompt = self.prompt_builder.build_good_prompt(persona, rating)
+        with spans.span("prompt_build"):
+            if force_bad:
+                prompt = self.prompt_builder.build_bad_prompt(self.random)
+            else:
+                prompt = self.prompt_builder.build_good_prompt(persona, rating)
         
-        # Call API
-        text = self.api.generate(model["provider"], model["model"], prompt)
+        # Call API (a hedged call may be answered by a backup model)
+        with spans.span("provider_call"):
+            text, model = self.api.generate_hedged(model, prompt)
         
         # Parse response
-        text = text.strip().replace("```json", "").replace("```", "")
-        data = json.loads(text)
-        
-        # Build review object
-        review_text = (
-            f"{data.get('title', '')}. "
-            f"Pros: {data.get('pros', '')} "
-            f"Cons: {data.get('cons', '')}"
-        ).strip()
+        with spans.span("parse"):
+            text = text.strip().replace("```json", "").replace("```", "")
+            data = json.loads(text)
+            
+            # Build review object
+            review_text = (
+                f"{data.get('title', '')}. "
+                f"Pros: {data.get('pros', '')} "
+                f"Cons: {data.get('cons', '')}"
+            ).strip()
         
         return {
             "rating": float(rating),
@@ -85,64 +138,432 @@ class ReviewGenerator:
             "persona_keywords": persona.get("keywords", [])
         }
     
-    def generate_one_with_quality(self, existing_reviews, review_index):
-        """Generate one review with quality checks"""
+    def _backoff(self, error, retries):
+        """Wait before retrying a rate-limited request: the provider's
+        Retry-After when it sent one, else jittered exponential backoff"""
+        if error.retry_after:
+            delay = error.retry_after
+        else:
+            cfg = self.config.get('concurrency_control', {})
+            delay = min(cfg.get('backoff_max_sec', 30), cfg.get('backoff_base_sec', 0.5) * 2 ** retries)
+            delay *= self.jitter.uniform(0.5, 1.0)
+        time.sleep(delay)
+    
+    def _check_quality(self, review, existing_reviews, spans, max_rate_limited):
+        """check_all, retrying only the checks while a metric (realism) is
+        rate limited so the generated review is kept; None if it stays limited"""
+        for retries in range(max_rate_limited + 1):
+            try:
+                return self.quality.check_all(review, existing_reviews, spans)
+            except RateLimited as e:
+                if retries < max_rate_limited:
+                    self._backoff(e, retries)
+        return None
+    
+    def generate_one_with_quality(self, existing_reviews, review_index, log_attempt=None, commit=False):
+        """Generate one review with quality checks
+        
+        With commit=True the review is re-checked against reviews accepted
+        concurrently and appended to existing_reviews under a lock.
+        Rate-limited requests are retried without using up an attempt.
+        """
+        log_attempt = log_attempt or self.file_manager.log_attempt
         max_retries = self.config['quality_thresholds']['max_regeneration_attempts']
-        force_bad_first = (random.random() < 0.10)
+        max_rate_limited = self.config.get('concurrency_control', {}).get('max_rate_limit_retries', 10)
+        force_bad_first = (self.random.random() < 0.10)
+        rate_limited = 0
+        attempt = 1
         
-        for attempt in range(1, max_retries + 1):
+        while attempt <= max_retries:
             start = time.time()
+            spans = Spans()
             
             try:
-                review = self.generate_one_raw(force_bad=(force_bad_first and attempt == 1))
+                review = self.generate_one_raw(force_bad=(force_bad_first and attempt == 1), spans=spans)
                 gen_time = round(time.time() - start, 2)
                 
                 # Quality check
-                result = self.quality.check_all(review, existing_reviews)
+                seen = len(existing_reviews)
+                result = self._check_quality(review, existing_reviews, spans, max_rate_limited)
+                if result is None:
+                    result = {"passed": False, "failed_metric": "rate_limited"}
+                
+                if commit and result["passed"]:
+                    with self._accept_lock:
+                        # Other slots may have accepted reviews during the check
+                        if len(existing_reviews) > seen:
+                            result = self.quality.check_similarity(review, existing_reviews, spans)
+                        if result["passed"]:
+                            existing_reviews.append(review)
+                
                 passed = result["passed"]
                 failed_metric = result.get("failed_metric", "")
+                word_count = self.quality.analyze(review).word_count
                 
                 # Log attempt
-                self.file_manager.log_attempt(
-                    review_index, attempt, review, passed, failed_metric, gen_time
+                log_attempt(
+                    review_index, attempt, review, passed, failed_metric, gen_time, word_count,
+                    spans.row()
                 )
+                if failed_metric == "rate_limited":
+                    metrics.record_attempt("rate_limited", None, spans.durations)
+                else:
+                    metrics.record_attempt(
+                        "accepted" if passed else "rejected", failed_metric, spans.durations
+                    )
                 
                 if passed:
                     return review
             
+            except RateLimited as e:
+                rate_limited += 1
+                if rate_limited <= max_rate_limited:
+                    self._backoff(e, rate_limited - 1)
+                    continue
+                log_attempt(
+                    review_index, attempt, {"model": "error", "title": "ERROR"},
+                    False, "rate_limited", 0, None, spans.row()
+                )
+                metrics.record_attempt("rate_limited", None, spans.durations)
+                rate_limited = 0
+            
             except Exception as e:
-                self.file_manager.log_attempt(
+                log_attempt(
                     review_index, attempt, {"model": "error", "title": "ERROR"}, 
-                    False, "exception", 0
+                    False, "exception", 0, None, spans.row()
                 )
+                metrics.record_attempt("error", None, spans.durations)
+            
+            attempt += 1
         
         return None
     
-    def generate_all(self, count=400):
-        """Generate full dataset"""
-        final_reviews = []
-        clean_reviews = []
+    async def _generate_slot(self, accepted, review_index, pool, slots, log_attempt, cancel=None):
+        """Run one review slot in the worker pool"""
+        loop = asyncio.get_running_loop()
+        
+        async with slots:
+            if cancel is not None and cancel.is_set():
+                return review_index, CANCELLED
+            with metrics.IN_FLIGHT.track_inprogress():
+                review = await loop.run_in_executor(
+                    pool, self.generate_one_with_quality, accepted, review_index, log_attempt, True
+                )
+        
+        return review_index, review
+    
+    async def generate_all_async(self, count=400, concurrency=8, on_accept=None,
+                                 results=None, accepted=None, log=None, on_result=None, cancel=None,
+                                 on_attempt=None, accepts=None):
+        """Generate full dataset with several review slots in flight
+        
+        on_accept is called with each accepted review in review_index order
+        (through accepts, an OrderedAccepts, when given), on_result with
+        (review_index, review or None) for every slot as soon as it finishes.
+        Indices already in results (a resumed run) are skipped. Once the
+        cancel event is set, slots that have not started are dropped.
+        on_attempt gets every attempt row as soon as it is decided.
+        """
+        accepted = [] if accepted is None else accepted
+        results = {} if results is None else results
+        log = log or OrderedAttemptLog(self.file_manager.log_attempt)
+        accepts = accepts or OrderedAccepts(on_accept, results)
+        slots = asyncio.Semaphore(concurrency)
+        todo = [i for i in range(count) if i not in results]
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            tasks = [
+                asyncio.ensure_future(
+                    self._generate_slot(
+                        accepted, i, pool, slots, tee_attempts(log.writer(i), on_attempt), cancel
+                    )
+                )
+                for i in todo
+            ]
+            
+            with tqdm(total=len(todo), desc="Generating", disable=not self.verbose) as bar:
+                for task in asyncio.as_completed(tasks):
+                    review_index, review = await task
+                    bar.update(1)
+                    if review is CANCELLED:
+                        continue
+                    results[review_index] = review
+                    log.finish(review_index)
+                    accepts.release()
+                    if on_result:
+                        on_result(review_index, review)
+        
+        # Outputs follow review_index order, not completion order
+        return [results[i] for i in range(count) if results.get(i)]
+    
+    def _checkpointer(self):
+        """Checkpointer for this run, or None when checkpointing is off"""
+        if not self.checkpoints:
+            return None
+        if not (self.config.get('checkpointing', {}).get('enabled', False) or self.resume):
+            return None
+        checkpoint_dir = self.config.get('output', {}).get('checkpoint_dir', 'data/synthetic/checkpoints')
+        return Checkpointer(checkpoint_dir, self.file_manager.timestamp)
+    
+    def _save_checkpoint(self, checkpointer, count, results, accepted, log, stream, accepts=None):
+        """Snapshot completed indices, the corpus, indexes, RNG and log position"""
+        stream_offsets = stream.offsets() if stream else None
+        log_offsets = self.file_manager.log_offsets()
+        
+        # No slot can commit, so neither the corpus nor the indexes
+        # following it can grow, while the state is pickled
+        with self._accept_lock:
+            # Slots still in flight may already have committed a review;
+            # they will be regenerated on resume, so leave them out
+            done = {id(r) for r in results.values() if r}
+            snapshot = [r for r in accepted if id(r) in done]
+            
+            indexes = {}
+            if len(snapshot) == len(accepted):
+                for name in ("diversity", "semantic"):
+                    index = getattr(self.quality, name).snapshot(accepted)
+                    if index:
+                        indexes[name] = index
+            
+            blob = pickle.dumps({
+                "run_id": self.file_manager.timestamp,
+                "count": count,
+                "results": dict(results),
+                "accepted": snapshot,
+                "indexes": indexes,
+                "rng_state": self.random.getstate(),
+                "log_offsets": log_offsets,
+                "stream_offsets": stream_offsets,
+                "attempt_log": log.snapshot() if log else None,
+                "accept_order": accepts.snapshot() if accepts else None,
+            })
+        
+        checkpointer.save(blob)
+    
+    def _restore(self, state):
+        """Reload a checkpoint's indexes, RNG state and log position"""
+        self.random.setstate(state["rng_state"])
+        for name, index in state["indexes"].items():
+            getattr(self.quality, name).restore(index, state["accepted"])
+        self.file_manager.truncate_log(state["log_offsets"])
+    
+    def generate_all(self, count=400, concurrency=None, on_result=None, cancel=None, on_attempt=None):
+        """Generate full dataset
+        
+        With checkpointing enabled the run is snapshotted every `interval`
+        accepted reviews (and when interrupted). A generator created with
+        resume=<run id> continues from the last snapshot; the review count
+        then comes from the checkpoint.
+        
+        on_result(review_index, review or None) reports each finished review
+        slot and on_attempt(*row) every attempt row (log_attempt arguments,
+        including stage timings) as soon as it is decided. Setting the cancel
+        event (threading.Event) stops the run after the slots in flight;
+        what was accepted so far is saved and the checkpoint kept, so the
+        run can be resumed.
+        """
+        concurrency = concurrency or self.config.get('generation', {}).get('concurrency', 1)
+        interval = self.config.get('checkpointing', {}).get('interval', 50)
+        checkpointer = self._checkpointer()
+        
+        state = checkpointer.load() if self.resume else None
+        if state:
+            count = state["count"]
+            results, accepted = state["results"], state["accepted"]
+            self._restore(state)
+        else:
+            results, accepted = {}, []
+            seed = self.config.get('generation', {}).get('seed')
+            if seed is not None:
+                self.random.seed(seed)
+        
+        log = None
+        if concurrency > 1:
+            log = OrderedAttemptLog(self.file_manager.log_attempt)
+            if state and state["attempt_log"]:
+                log.restore(state["attempt_log"])
+        
+        # Stream accepted reviews to JSONL as they pass
+        output = self.config.get('output', {})
+        stream = None
+        if output.get('format', 'json') == 'jsonl':
+            stream = self.file_manager.open_stream(
+                output.get('flush_every', 20),
+                output.get('flush_interval_sec', 5.0),
+                output.get('fsync', True),
+                offsets=state["stream_offsets"] if state else None
+            )
         
-        # Generate reviews
-        for i in tqdm(range(count), desc="Generating", disable=not self.verbose):
-            review = self.generate_one_with_quality(final_reviews, review_index=i)
+        accepted_count = len(accepted)
+        
+        def on_accept(review):
+            nonlocal accepted_count
+            accepted_count += 1
+            if stream:
+                stream.append(review)
+            if checkpointer and accepted_count % interval == 0:
+                self._save_checkpoint(checkpointer, count, results, accepted, log, stream, accepts)
+        
+        # Streamed reviews follow review_index order, like the attempt log
+        accepts = OrderedAccepts(on_accept, results)
+        if state and state.get("accept_order"):
+            accepts.restore(state["accept_order"])
+        
+        try:
+            if concurrency > 1:
+                asyncio.run(self.generate_all_async(
+                    count, concurrency, None, results, accepted, log, on_result, cancel,
+                    on_attempt, accepts
+                ))
+            else:
+                # Generate reviews
+                log_attempt = tee_attempts(self.file_manager.log_attempt, on_attempt)
+                todo = [i for i in range(count) if i not in results]
+                for i in tqdm(todo, desc="Generating", disable=not self.verbose):
+                    if cancel is not None and cancel.is_set():
+                        break
+                    with metrics.IN_FLIGHT.track_inprogress():
+                        review = self.generate_one_with_quality(accepted, i, log_attempt)
+                    results[i] = review
+                    
+                    if review:
+                        accepted.append(review)
+                    accepts.release()
+                    if on_result:
+                        on_result(i, review)
             
-            if review:
-                final_reviews.append(review)
-                clean_reviews.append({
-                    "rating": review["rating"],
-                    "review_text": review["review_text"],
-                    "title": review["title"],
-                    "pros": review["pros"],
-                    "cons": review["cons"]
-                })
+            cancelled = len(results) < count
+            if cancelled and checkpointer:
+                self._save_checkpoint(checkpointer, count, results, accepted, log, stream, accepts)
+            if cancelled:
+                # Slots after a gap left by dropped ones are still buffered
+                accepts.drain()
+                if log:
+                    log.drain()
+        
+        except BaseException:
+            # Keep whatever finished since the last interval
+            if checkpointer:
+                self._save_checkpoint(checkpointer, count, results, accepted, log, stream, accepts)
+            raise
+        
+        finally:
+            if stream:
+                stream.close()
+            self.file_manager.flush_log()
+        
+        if checkpointer and not cancelled:
+            checkpointer.clear()
+        final_reviews = [results[i] for i in range(count) if results.get(i)]
         
         # Save results
-        paths = self.file_manager.save_reviews(final_reviews, clean_reviews)
+        if stream:
+            paths = self.file_manager.close_stream(stream, finalize=output.get('finalize_json', False))
+        else:
+            clean_reviews = [clean_review(review) for review in final_reviews]
+            paths = self.file_manager.save_reviews(final_reviews, clean_reviews)
         
         return {
             **paths,
             'timestamp': self.file_manager.timestamp,
-            'success_count': len(clean_reviews),
-            'skipped_count': count - len(clean_reviews)
-        }
\ No newline at end of file
+            'success_count': len(final_reviews),
+            'skipped_count': len(results) - len(final_reviews),
+            'cancelled': cancelled,
+            'quality_stats': self.quality.stats(),
+            'provider_stats': self.api.stats()
+        }
+
+
+class OrderedAccepts:
+    """Hand accepted reviews to on_accept in review_index order
+    
+    Finished slots are read from results; a review is released once every
+    slot before it has finished. drain() also releases slots behind gaps
+    left by dropped slots, which are then skipped if they finish later.
+    """
+    
+    def __init__(self, on_accept, results):
+        self.on_accept = on_accept
+        self.results = results
+        self.next_index = 0
+        self.released = set(results)  # a resumed run has streamed these
+    
+    def _emit(self, review_index):
+        review = self.results[review_index]
+        self.released.add(review_index)
+        if review and self.on_accept:
+            self.on_accept(review)
+    
+    def release(self):
+        """Release every contiguous finished slot"""
+        while self.next_index in self.results:
+            if self.next_index not in self.released:
+                self._emit(self.next_index)
+            self.released.discard(self.next_index)
+            self.next_index += 1
+    
+    def drain(self):
+        """Release every finished slot, skipping gaps"""
+        self.release()
+        for review_index in sorted(self.results):
+            if review_index > self.next_index and review_index not in self.released:
+                self._emit(review_index)
+    
+    def snapshot(self):
+        """Release position (for checkpoints)"""
+        return {"next_index": self.next_index, "released": set(self.released)}
+    
+    def restore(self, snapshot):
+        self.next_index = snapshot["next_index"]
+        self.released = set(snapshot["released"])
+
+
+class OrderedAttemptLog:
+    """Buffer attempt rows per review and write them in review_index order"""
+    
+    def __init__(self, log_attempt):
+        self.log_attempt = log_attempt
+        self.pending = {}
+        self.finished = set()
+        self.next_index = 0
+        self.lock = threading.Lock()
+    
+    def writer(self, review_index):
+        """Return a log_attempt callable bound to one review slot"""
+        def log_attempt(*row):
+            with self.lock:
+                self.pending.setdefault(review_index, []).append(row)
+        return log_attempt
+    
+    def finish(self, review_index):
+        """Mark a slot done and flush every contiguous finished slot"""
+        with self.lock:
+            self.finished.add(review_index)
+            while self.next_index in self.finished:
+                for row in self.pending.pop(self.next_index, []):
+                    self.log_attempt(*row)
+                self.finished.discard(self.next_index)
+                self.next_index += 1
+    
+    def drain(self):
+        """Write every buffered row of finished slots, skipping gaps"""
+        with self.lock:
+            for review_index in sorted(self.finished):
+                for row in self.pending.pop(review_index, []):
+                    self.log_attempt(*row)
+            self.finished.clear()
+    
+    def snapshot(self):
+        """Rows of finished slots not yet written (for checkpoints)"""
+        with self.lock:
+            return {
+                "next_index": self.next_index,
+                "finished": set(self.finished),
+                "pending": {i: list(self.pending.get(i, [])) for i in self.finished},
+            }
+    
+    def restore(self, snapshot):
+        with self.lock:
+            self.next_index = snapshot["next_index"]
+            self.finished = set(snapshot["finished"])
+            self.pending = {i: list(rows) for i, rows in snapshot["pending"].items()}
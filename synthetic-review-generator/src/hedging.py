@@ -0,0 +1,181 @@
+"""Hedged generation requests: back up slow calls with another model"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+
+def model_key(model):
+    return f"{model['provider']}/{model['model']}"
+
+
+class LatencyWindow:
+    """Recent successful call latencies for one model"""
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, latency):
+        with self.lock:
+            self.samples.append(latency)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, p):
+        with self.lock:
+            if not self.samples:
+                return None
+            return float(np.percentile(self.samples, p))
+
+
+class HedgeStats:
+    """Hedge counters for calls whose primary was one model"""
+
+    def __init__(self):
+        self.calls = 0
+        self.hedged = 0
+        self.backup_wins = 0
+        self.latency_saved = 0.0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            "backup_wins": self.backup_wins,
+            "latency_saved_sec": round(self.latency_saved, 2),
+        }
+
+
+class Hedger:
+    """Send a backup request to another configured model when the primary
+    has not answered by the `percentile` of that model's recent latency.
+
+    The first successful response wins. The loser is cancelled if it has
+    not started; a call already on the wire cannot be interrupted through
+    the sync SDKs, so its result is discarded (its finish time is still used
+    to measure the latency saved).
+    """
+
+    def __init__(self, settings, models, call):
+        self.models = models
+        self.call = call
+        self.percentile = settings.get("percentile", 95)
+        self.min_samples = settings.get("min_samples", 20)
+        self.window_size = settings.get("window", 200)
+        self.pool = ThreadPoolExecutor(
+            max_workers=settings.get("max_workers", 32), thread_name_prefix="hedge"
+        )
+        self.lock = threading.Lock()
+        self.windows = {}
+        self.hedge_stats = {}
+        # Own RNG, so picking backups never shifts a seeded generation run
+        self.random = random.Random()
+
+    def _window(self, key):
+        with self.lock:
+            if key not in self.windows:
+                self.windows[key] = LatencyWindow(self.window_size)
+            return self.windows[key]
+
+    def _stats(self, key):
+        with self.lock:
+            if key not in self.hedge_stats:
+                self.hedge_stats[key] = HedgeStats()
+            return self.hedge_stats[key]
+
+    def threshold(self, model):
+        """Hedge delay for a model, or None until it has enough samples"""
+        window = self._window(model_key(model))
+        if len(window) < self.min_samples:
+            return None
+        return window.percentile(self.percentile)
+
+    def _backup_for(self, primary):
+        """Another configured model, preferring a different provider"""
+        others = [m for m in self.models if model_key(m) != model_key(primary)]
+        if not others:
+            return None
+        other_providers = [m for m in others if m["provider"] != primary["provider"]]
+        candidates = other_providers or others
+        return self.random.choices(candidates, weights=[m.get("weight", 1) for m in candidates])[0]
+
+    def _timed_call(self, model, prompt):
+        start = time.monotonic()
+        text = self.call(model["provider"], model["model"], prompt, model.get("temperature"))
+        latency = time.monotonic() - start
+        self._window(model_key(model)).add(latency)
+        return text, latency
+
+    def generate(self, primary, prompt):
+        """(text, model) from whichever of primary / backup answers first"""
+        key = model_key(primary)
+        stats = self._stats(key)
+        with self.lock:
+            stats.calls += 1
+
+        delay = self.threshold(primary)
+        backup = self._backup_for(primary)
+        if delay is None or backup is None:
+            return self._timed_call(primary, prompt)[0], primary
+
+        start = time.monotonic()
+        first = self.pool.submit(self._timed_call, primary, prompt)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()[0], primary
+
+        with self.lock:
+            stats.hedged += 1
+        second = self.pool.submit(self._timed_call, backup, prompt)
+        owners = {first: primary, second: backup}
+        pending = {first, second}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+
+                winner_elapsed = time.monotonic() - start
+                for loser in pending:
+                    # Saved time only counts when the backup beat the primary
+                    if not loser.cancel() and future is second:
+                        loser.add_done_callback(
+                            lambda f, w=winner_elapsed: self._record_saved(key, f, start, w)
+                        )
+                if future is second:
+                    with self.lock:
+                        stats.backup_wins += 1
+                return future.result()[0], owners[future]
+
+        raise error
+
+    def _record_saved(self, key, loser, start, winner_elapsed):
+        if loser.cancelled() or loser.exception() is not None:
+            return
+        saved = time.monotonic() - start - winner_elapsed
+        with self.lock:
+            self.hedge_stats[key].latency_saved += max(0.0, saved)
+
+    def stats(self):
+        with self.lock:
+            keys = set(self.hedge_stats) | set(self.windows)
+            stats = {key: self.hedge_stats.get(key, HedgeStats()).to_dict() for key in keys}
+            windows = dict(self.windows)
+
+        for key, window in windows.items():
+            ready = len(window) >= self.min_samples
+            stats[key]["samples"] = len(window)
+            stats[key]["threshold_sec"] = (
+                round(window.percentile(self.percentile), 3) if ready else None
+            )
+        return stats
@@ -0,0 +1,242 @@
+"""Background generation jobs for the HTTP API"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from timing import STAGES
+
+RESULT_FIELDS = [
+    "success_count", "skipped_count", "clean_path", "with_models_path",
+    "csv_log", "timestamp", "cancelled",
+]
+
+
+class Job:
+    """One batch run: status, progress counters and the final result"""
+
+    def __init__(self, count, concurrency=None, max_events=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.count = count
+        self.concurrency = concurrency
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.accepted = 0
+        self.rejected = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.generator = None  # set while running
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        # Per-attempt events for streaming clients; None when nobody listens
+        self.events = queue.Queue(maxsize=max_events) if max_events else None
+        # Events already taken for a stream, numbered, so a client that
+        # reconnects (Last-Event-ID) gets the ones it missed replayed
+        self.sent = deque(maxlen=max_events or 0)
+        self.last_event_id = 0
+        self.stream = 0  # token of the stream attached last
+
+    @property
+    def run_id(self):
+        """Output timestamp of this job's files (unique even within one second)"""
+        return f"{datetime.fromtimestamp(self.submitted_at).strftime('%Y%m%d_%H%M%S')}_{self.id[:6]}"
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "cancelled", "failed")
+
+    def on_result(self, review_index, review):
+        with self.lock:
+            if review:
+                self.accepted += 1
+            else:
+                self.rejected += 1
+
+    def emit(self, event, data):
+        """Queue an event for the stream; blocks while the buffer is full
+        (backpressure on generation) until the job is cancelled"""
+        if self.events is None:
+            return
+        while not self.cancel_event.is_set():
+            try:
+                self.events.put((event, data), timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def next_event(self, after, timeout):
+        """(id, event, data) of the first event numbered above `after`,
+        replayed from the sent ones or else taken from the queue. Raises
+        queue.Empty after `timeout` seconds without one."""
+        with self.lock:
+            for item in self.sent:
+                if item[0] > after:
+                    return item
+        event, data = self.events.get(timeout=timeout)
+        with self.lock:
+            self.last_event_id += 1
+            self.sent.append((self.last_event_id, event, data))
+            # A stream replaced meanwhile may have taken an earlier one
+            return next(item for item in self.sent if item[0] > after)
+
+    def attach(self):
+        """Token of a new stream; any stream attached before it stops"""
+        with self.lock:
+            self.stream += 1
+            return self.stream
+
+    def on_attempt(self, review_index, attempt, review, passed, failed_metric, gen_time,
+                   word_count=None, stage_times=None):
+        data = {
+            "review_index": review_index,
+            "attempt": attempt,
+            "model": review.get("model"),
+            "generation_time_sec": gen_time,
+            "stage_times": {
+                stage: value for stage, value in zip(STAGES, stage_times or []) if value != ""
+            },
+        }
+        if passed:
+            self.emit("accepted", {**data, "review": review})
+        else:
+            self.emit("rejected", {**data, "failed_metric": failed_metric})
+
+    def to_dict(self):
+        with self.lock:
+            done = self.accepted + self.rejected
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            rate = done / elapsed if elapsed > 0 else 0.0
+            eta = None
+            if self.status == "running" and rate > 0:
+                eta = round((self.count - done) / rate, 1)
+
+            return {
+                "id": self.id,
+                "status": self.status,
+                "count": self.count,
+                "completed": done,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "progress": round(done / self.count, 4) if self.count else 1.0,
+                "elapsed_sec": round(elapsed, 2),
+                "reviews_per_sec": round(rate, 3),
+                "eta_sec": eta,
+                "submitted_at": datetime.fromtimestamp(self.submitted_at).isoformat(),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobManager:
+    """Run generation jobs on a bounded worker pool.
+
+    Each job gets its own generator (built by `make_generator(run_id)`), so
+    concurrent jobs never share output files or similarity indexes; it is
+    closed when the job ends. Only the
+    most recent `max_finished` finished jobs are kept for polling.
+    """
+
+    def __init__(self, make_generator, max_workers=2, max_finished=100):
+        self.make_generator = make_generator
+        self.max_finished = max_finished
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, count, concurrency=None, max_events=None):
+        """Queue a job; max_events > 0 enables its event stream with that buffer size"""
+        job = Job(count, concurrency, max_events)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        self.pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def generators(self):
+        """Generators of the jobs running right now"""
+        with self.lock:
+            return [job.generator for job in self.jobs.values() if job.generator is not None]
+
+    def cancel(self, job_id):
+        """Stop a job; running jobs finish their in-flight reviews and keep
+        what was accepted. Returns the job, or None if unknown."""
+        job = self.get(job_id)
+        if job:
+            job.cancel_event.set()
+            with job.lock:
+                if job.status == "queued":
+                    job.status = "cancelled"
+                    job.finished_at = time.time()
+        return job
+
+    def detach(self, job, token, grace):
+        """A stream left: cancel its job unless the job finished or another
+        stream attaches within `grace` seconds"""
+        def expire():
+            if job.stream == token and not job.finished:
+                self.cancel(job.id)
+
+        if job.stream != token:
+            return
+        if grace:
+            timer = threading.Timer(grace, expire)
+            timer.daemon = True
+            timer.start()
+        else:
+            expire()
+
+    def _prune(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda j: j.submitted_at)[:-self.max_finished or None]:
+            del self.jobs[job.id]
+
+    def _run(self, job):
+        with job.lock:
+            if job.status == "cancelled":
+                return
+            job.status = "running"
+            job.started_at = time.time()
+
+        try:
+            generator = job.generator = self.make_generator(job.run_id)
+            try:
+                result = generator.generate_all(
+                    count=job.count,
+                    concurrency=job.concurrency,
+                    on_result=job.on_result,
+                    cancel=job.cancel_event,
+                    on_attempt=job.on_attempt if job.events else None,
+                )
+            finally:
+                generator.close()
+            status = "cancelled" if result["cancelled"] else "completed"
+            job.result = {field: result[field] for field in RESULT_FIELDS}
+        except Exception as e:
+            status = "failed"
+            job.error = str(e)
+
+        with job.lock:
+            job.status = status
+            job.finished_at = time.time()
+        job.generator = None
+        if job.events:
+            # Delivered even after a cancel, unless the client stopped reading
+            try:
+                job.events.put(("done", job.to_dict()), timeout=5)
+            except queue.Full:
+                pass
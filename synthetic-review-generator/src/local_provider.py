@@ -0,0 +1,193 @@
+"""Offline fake LLM provider with configurable latency and failure profiles.
+
+Speaks the OpenAI chat-completions shape, either in-process (the `local`
+provider) or over HTTP (`python src/cli.py fake-provider`, then point
+`providers.openai.base_url` at it).
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+import httpx
+import openai
+from openai.types.chat import ChatCompletion
+
+TITLE_TEMPLATES = [
+    "Solid {kw} for growing teams",
+    "{kw} that mostly just works",
+    "Good platform, rough edges around {kw}",
+    "Reliable choice for {kw}",
+    "Powerful but heavy {kw}",
+    "Mixed feelings about {kw}",
+]
+PERSONA_SENTENCES = [
+    "As a {persona}, I use the {kw} features every day.",
+    "For my work as a {persona}, {kw} is what matters most.",
+    "Our {persona} workflow leans heavily on {kw}.",
+]
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_RATING = re.compile(r"Rating:\s*([\d.]+)")
+_PERSONA = re.compile(r"Persona:\s*(.+)")
+_KEYWORDS = re.compile(r"Keywords:\s*(.+)")
+_BATCH = re.compile(r"each of these (\d+)")
+
+DEFAULT_LOCAL_SETTINGS = {
+    "latency": {"distribution": "lognormal", "median_ms": 800, "sigma": 0.5},
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after_sec": 1,
+    "malformed_json_rate": 0.0,
+    "real_reviews_path": "data/raw/real_reviews.json",
+    "seed": None,
+}
+
+
+def _sentences(text):
+    return [s.strip() for s in _SENTENCE.split(text or "") if len(s.split()) >= 4]
+
+
+class LocalReviewModel:
+    """Composes review JSON from templates and real-review fragments"""
+
+    def __init__(self, real_reviews, rng):
+        self.rng = rng
+        self.pros = {}
+        self.cons = {}
+        for review in real_reviews:
+            rating = round(float(review["rating"]))
+            self.pros.setdefault(rating, []).extend(_sentences(review["pros"]))
+            self.cons.setdefault(rating, []).extend(_sentences(review["cons"]))
+
+    def _pick(self, pool, rating, k):
+        # Nearest rating bucket that has fragments
+        for offset in (0, 1, -1, 2, -2, 3, -3, 4, -4):
+            sentences = pool.get(rating + offset)
+            if sentences:
+                return self.rng.sample(sentences, min(k, len(sentences)))
+        return []
+
+    def review(self, prompt):
+        rating = round(float(_RATING.search(prompt).group(1))) if _RATING.search(prompt) else 4
+        persona = _PERSONA.search(prompt).group(1).strip() if _PERSONA.search(prompt) else "developer"
+        keywords = _KEYWORDS.search(prompt).group(1).split(",") if _KEYWORDS.search(prompt) else []
+        keywords = [k.strip() for k in keywords if k.strip()] or ["CI/CD"]
+        kw = self.rng.choice(keywords)
+
+        pros = self._pick(self.pros, rating, self.rng.randint(2, 3))
+        pros.insert(self.rng.randint(0, len(pros)), self.rng.choice(PERSONA_SENTENCES).format(persona=persona, kw=kw))
+        title = self.rng.choice(TITLE_TEMPLATES).format(kw=kw)
+        return {
+            "title": title[:1].upper() + title[1:],
+            "pros": " ".join(pros),
+            "cons": " ".join(self._pick(self.cons, rating, self.rng.randint(1, 2))),
+        }
+
+    def realism_scores(self, n):
+        return [round(self.rng.uniform(6.5, 9.5), 1) for _ in range(n)]
+
+
+class LocalChatModel:
+    """In-process stand-in for an OpenAI client (`client.chat.completions.create`)"""
+
+    def __init__(self, settings=None):
+        self.settings = {**DEFAULT_LOCAL_SETTINGS, **(settings or {})}
+        self.rng = random.Random(self.settings["seed"])
+        self.lock = threading.Lock()
+
+        with open(self.settings["real_reviews_path"]) as f:
+            self.reviews = LocalReviewModel(json.load(f), self.rng)
+
+        # Mirror the SDK attribute path
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = type("Completions", (), {})()
+        self.chat.completions.create = self.create
+
+    def _latency(self):
+        cfg = self.settings["latency"]
+        kind = cfg.get("distribution", "lognormal")
+        if kind == "fixed":
+            ms = cfg.get("median_ms", 0)
+        elif kind == "uniform":
+            ms = self.rng.uniform(cfg.get("min_ms", 0), cfg.get("max_ms", 0))
+        else:
+            ms = self.rng.lognormvariate(0, cfg.get("sigma", 0.5)) * cfg.get("median_ms", 800)
+        return ms / 1000
+
+    def _fail(self, status, message, headers=None):
+        request = httpx.Request("POST", "http://local/v1/chat/completions")
+        response = httpx.Response(status, headers=headers or {}, request=request)
+        error = openai.RateLimitError if status == 429 else openai.InternalServerError
+        raise error(message, response=response, body=None)
+
+    def content(self, prompt):
+        """Response text for a prompt, after simulated latency and failures"""
+        with self.lock:
+            latency = self._latency()
+            roll = self.rng.random()
+            malformed = self.rng.random() < self.settings["malformed_json_rate"]
+
+            batch = _BATCH.search(prompt)
+            if batch:
+                text = json.dumps({"scores": self.reviews.realism_scores(int(batch.group(1)))})
+            elif prompt.startswith("Rate how realistic"):
+                text = str(self.reviews.realism_scores(1)[0])
+            else:
+                text = json.dumps(self.reviews.review(prompt))
+
+        time.sleep(latency)
+
+        if roll < self.settings["rate_limit_rate"]:
+            self._fail(429, "Rate limit reached (local)", {"retry-after": str(self.settings["retry_after_sec"])})
+        if roll < self.settings["rate_limit_rate"] + self.settings["error_rate"]:
+            self._fail(500, "Internal error (local)")
+        if malformed:
+            text = text[: len(text) // 2]
+        return text
+
+    def completion(self, model, content):
+        """OpenAI-shaped chat completion payload"""
+        return {
+            "id": f"chatcmpl-local-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": 0,
+                "completion_tokens": len(content.split()),
+                "total_tokens": len(content.split()),
+            },
+        }
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        return ChatCompletion.model_validate(self.completion(model, self.content(prompt)))
+
+
+def create_app(settings=None):
+    """Flask app serving POST /v1/chat/completions from a LocalChatModel"""
+    from flask import Flask, jsonify, request
+
+    app = Flask(__name__)
+    model = LocalChatModel(settings)
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        body = request.get_json(force=True)
+        try:
+            content = model.content(body["messages"][-1]["content"])
+        except openai.APIStatusError as e:
+            headers = {"Retry-After": e.response.headers["retry-after"]} if e.status_code == 429 else {}
+            return jsonify({"error": {"message": e.message, "type": "local_error"}}), e.status_code, headers
+        return jsonify(model.completion(body.get("model", "local"), content))
+
+    return app
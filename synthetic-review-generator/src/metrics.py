@@ -0,0 +1,245 @@
+"""In-process counters and histograms, rendered in Prometheus text format"""
+
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Latency buckets in seconds (Prometheus client defaults, extended for LLM calls)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        """Child for one label combination (created on first use)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._child())
+        return child
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, child in sorted(self._children.items()):
+            lines += child.samples(self.name, self.labelnames, key)
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, name, labelnames, key):
+        return [f"{name}{_labels(labelnames, key)} {_number(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def samples(self, name, labelnames, key):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], counts):
+            cumulative += count
+            le = [("le", _number(bound) if bound == float("inf") else repr(bound))]
+            lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labelnames, key)} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+
+class Registry:
+    """Metrics plus collectors that compute gauges at scrape time"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """collect() returns [(name, documentation, {label tuple: value}, labelnames)]
+        gauges; called on every scrape, so hot paths pay nothing for them"""
+        with self.lock:
+            self.collectors.append(collect)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self.lock:
+            metrics, collectors = list(self.metrics), list(self.collectors)
+
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        for collect in collectors:
+            for name, documentation, values, labelnames in collect():
+                lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+                lines += [
+                    f"{name}{_labels(labelnames, key)} {_number(value)}"
+                    for key, value in sorted(values.items())
+                ]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Generation (ReviewGenerator)
+ATTEMPTS = REGISTRY.counter(
+    "review_attempts_total", "Generation attempts by outcome", ["result"]
+)
+REJECTIONS = REGISTRY.counter(
+    "review_rejections_total", "Rejected attempts by failed metric", ["metric"]
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "review_generations_in_flight", "Review slots currently generating"
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "review_stage_duration_seconds", "Duration of each pipeline stage per attempt", ["stage"]
+)
+
+# Quality checks (QualityChecker)
+METRIC_CHECKS = REGISTRY.counter(
+    "quality_checks_total", "Quality metric evaluations by result", ["metric", "result"]
+)
+
+# Provider calls (APIClient)
+PROVIDER_REQUESTS = REGISTRY.counter(
+    "provider_requests_total", "Live provider requests by outcome", ["provider", "outcome"]
+)
+PROVIDER_SECONDS = REGISTRY.histogram(
+    "provider_request_duration_seconds", "Live provider request latency", ["provider", "model"]
+)
+
+# HTTP (app.py)
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by endpoint and status", ["method", "endpoint", "status"]
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["endpoint"]
+)
+
+
+def record_attempt(outcome, failed_metric=None, durations=None):
+    """Count one generation attempt and observe its stage durations"""
+    ATTEMPTS.labels(outcome).inc()
+    if failed_metric:
+        REJECTIONS.labels(failed_metric).inc()
+    for stage, elapsed in (durations or {}).items():
+        STAGE_SECONDS.labels(stage).observe(elapsed)
@@ -24,9 +24,9 @@ Output: {{"title": "5-8 words", "pros": "30-70 words", "cons": "20-50 words"}}
 Be specific, use examples."""
     
     @staticmethod
-    def build_bad_prompt():
+    def build_bad_prompt(rng=random):
         """Build a deliberately bad prompt to test quality checks"""
-        bad_type = random.choice(['too_short', 'generic', 'wrong_sentiment'])
+        bad_type = rng.choice(['too_short', 'generic', 'wrong_sentiment'])
         
         if bad_type == 'too_short':
             return 'Write a GitLab review in ONE sentence. Less than 10 words.\nOutput JSON: {"title": "...", "pros": "...", "cons": "..."}'
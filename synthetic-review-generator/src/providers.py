@@ -0,0 +1,249 @@
+"""Process-wide provider clients with pooled connections and rate limiting"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+from openai import OpenAI
+from anthropic import Anthropic
+
+from concurrency import AIMDController
+from local_provider import LocalChatModel
+
+# Status codes that mean "slow down" rather than "this request is bad"
+OVERLOAD_STATUS = (429, 503, 529)
+
+
+class RateLimited(Exception):
+    """Provider pushed back (429 / overload); retry without counting an attempt"""
+
+    def __init__(self, provider, retry_after=None):
+        super().__init__(f"{provider} rate limited (retry after {retry_after}s)")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def _overload_info(error):
+    """(is_overload, retry_after_seconds) for an SDK exception"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status not in OVERLOAD_STATUS and type(error).__name__ != "RateLimitError":
+        return False, None
+
+    headers = getattr(getattr(error, "response", None), "headers", {}) or {}
+    try:
+        retry_after = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        retry_after = None
+    return True, retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate          # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        start = time.monotonic()
+        waited = False
+
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.acquired += 1
+                    self.throttled += int(waited)
+                    self.wait_time += time.monotonic() - start
+                    return
+                delay = (tokens - self.tokens) / self.rate
+
+            waited = True
+            time.sleep(delay)
+
+    def stats(self):
+        with self.lock:
+            self._refill()
+            return {
+                "rate_per_sec": self.rate,
+                "capacity": self.capacity,
+                "available": round(self.tokens, 2),
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "wait_time_sec": round(self.wait_time, 3),
+            }
+
+
+DEFAULT_PROVIDER_SETTINGS = {
+    "max_connections": 20,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 60,
+    "timeout": 60,
+    "requests_per_minute": 500,
+    "burst": 20,
+}
+
+
+class ClientRegistry:
+    """One SDK client per provider, sharing a tuned httpx pool, plus a
+    token bucket per (provider, model) that every caller goes through"""
+
+    def __init__(self, settings=None, control=None):
+        self.settings = settings or {}
+        self.controller = AIMDController(control) if control and control.get("enabled") else None
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.http_clients = {}
+        self.limiters = {}
+
+    def configure(self, settings, control=None):
+        """Apply the config `providers:` and `concurrency_control:` sections
+        (pool settings affect clients not yet built)"""
+        with self.lock:
+            self.settings = settings or {}
+            if control is None:
+                return
+            if not control.get("enabled"):
+                self.controller = None
+            elif self.controller is None:
+                self.controller = AIMDController(control)
+            else:
+                # Requests in flight still hold slots in the current windows
+                self.controller.configure(control)
+
+    def _provider_settings(self, provider):
+        return {**DEFAULT_PROVIDER_SETTINGS, **self.settings.get(provider, {})}
+
+    def _build(self, provider):
+        cfg = self._provider_settings(provider)
+        if provider == "local":
+            return LocalChatModel(self.settings.get("local")), None
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=cfg["max_connections"],
+                max_keepalive_connections=cfg["max_keepalive_connections"],
+                keepalive_expiry=cfg["keepalive_expiry"],
+            ),
+            timeout=cfg["timeout"],
+        )
+
+        if provider == "openai":
+            client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=cfg.get("base_url"),  # e.g. the local HTTP stand-in
+                http_client=http_client,
+            )
+        elif provider == "anthropic":
+            client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), http_client=http_client)
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+
+        return client, http_client
+
+    def client(self, provider):
+        """Shared SDK client for a provider"""
+        with self.lock:
+            if provider not in self.clients:
+                self.clients[provider], self.http_clients[provider] = self._build(provider)
+            return self.clients[provider]
+
+    def limiter(self, provider, model):
+        """Shared token bucket for a provider/model pair"""
+        key = f"{provider}/{model}"
+        with self.lock:
+            if key not in self.limiters:
+                cfg = self._provider_settings(provider)
+                rpm = cfg.get("models", {}).get(model, {}).get(
+                    "requests_per_minute", cfg["requests_per_minute"]
+                )
+                self.limiters[key] = TokenBucket(rpm / 60, cfg["burst"])
+            return self.limiters[key]
+
+    @contextmanager
+    def limit(self, provider, model):
+        """Wait for a rate-limit token (and an AIMD slot) around a request.
+
+        Overload responses are re-raised as RateLimited.
+        """
+        self.limiter(provider, model).acquire()
+        controller = self.controller
+        if controller is None:
+            try:
+                yield
+            except Exception as e:
+                overloaded, retry_after = _overload_info(e)
+                if overloaded:
+                    raise RateLimited(provider, retry_after) from e
+                raise
+            return
+
+        controller.acquire(provider)
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            overloaded, retry_after = _overload_info(e)
+            if overloaded:
+                controller.on_rate_limit(provider, retry_after)
+                raise RateLimited(provider, retry_after) from e
+            controller.on_error(provider)
+            raise
+        controller.on_success(provider, time.monotonic() - start)
+
+    def _pool_stats(self, http_client):
+        # httpcore exposes its connection list on the transport's pool
+        pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+        }
+
+    def stats(self):
+        with self.lock:
+            pools = {
+                provider: {
+                    **self._pool_stats(http_client),
+                    "max_connections": self._provider_settings(provider)["max_connections"],
+                }
+                for provider, http_client in self.http_clients.items()
+                if http_client is not None
+            }
+            limiters = dict(self.limiters)
+        return {
+            "pools": pools,
+            "limiters": {key: limiter.stats() for key, limiter in limiters.items()},
+            "concurrency": self.controller.stats() if self.controller else None,
+        }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(config=None):
+    """Process-wide client registry; `config` applies its `providers:` section"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        if config is not None:
+            _registry.configure(config.get("providers", {}), config.get("concurrency_control", {}))
+        return _registry
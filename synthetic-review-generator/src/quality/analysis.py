@@ -0,0 +1,114 @@
+"""Per-review text analysis shared by all quality metrics"""
+
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from textblob import TextBlob
+
+_TFIDF_ANALYZER = TfidfVectorizer().build_analyzer()
+
+
+class ReviewAnalysis:
+    """Tokens, lowercase text, word count and sentiment of one review.
+
+    Cheap fields are computed up front; sentiment and TF-IDF terms are
+    computed on first access and then reused.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower()
+        self.tokens = self.lower.split()
+        self.token_set = set(self.tokens)
+        self.word_count = len(self.tokens)
+
+    @cached_property
+    def sentiment(self):
+        return TextBlob(self.text).sentiment.polarity
+
+    @cached_property
+    def terms(self):
+        """Tokens as seen by the TF-IDF vectorizer"""
+        return _TFIDF_ANALYZER(self.text)
+
+    def warm(self):
+        """Compute the lazy fields now (sentiment, TF-IDF terms)"""
+        self.sentiment
+        self.terms
+        return self
+
+
+class AnalysisCache:
+    """Analyses keyed by review object: a bounded LRU for candidates, plus
+    pinned records for reviews held in a similarity index.
+
+    A checked review that is later accepted is pinned with its cached
+    analysis instead of being re-analyzed, and stays pinned (outside the
+    LRU bound) until every index holding it lets go.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._pinned = {}  # id(review) -> [review, analysis, pin count]
+        self._lock = threading.Lock()
+
+    def _lookup(self, review):
+        key = id(review)
+        pinned = self._pinned.get(key)
+        if pinned is not None and pinned[0] is review and pinned[1].text == review["review_text"]:
+            return pinned[1]
+        analysis = self._entries.get(key)
+        if analysis is not None and analysis.text == review["review_text"]:
+            self._entries.move_to_end(key)
+            return analysis
+        return None
+
+    def get(self, review):
+        with self._lock:
+            analysis = self._lookup(review)
+        if analysis is not None:
+            return analysis
+
+        analysis = ReviewAnalysis(review["review_text"])
+
+        with self._lock:
+            self._entries[id(review)] = analysis
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return analysis
+
+    def pin(self, review):
+        """Analysis of a review entering an index, kept until unpinned"""
+        key = id(review)
+        with self._lock:
+            pinned = self._pinned.get(key)
+            if pinned is not None and pinned[0] is review:
+                pinned[2] += 1
+                return pinned[1]
+            analysis = self._lookup(review)
+
+        if analysis is None:
+            analysis = ReviewAnalysis(review["review_text"])
+        with self._lock:
+            self._entries.pop(key, None)
+            # Holding the review keeps its id from being reused
+            self._pinned[key] = [review, analysis, 1]
+        return analysis
+
+    def unpin(self, reviews):
+        """Release reviews dropped from an index"""
+        with self._lock:
+            for review in reviews:
+                pinned = self._pinned.get(id(review))
+                if pinned is None or pinned[0] is not review:
+                    continue
+                pinned[2] -= 1
+                if not pinned[2]:
+                    del self._pinned[id(review)]
+
+    def stats(self):
+        with self._lock:
+            return {"cached": len(self._entries), "pinned": len(self._pinned)}
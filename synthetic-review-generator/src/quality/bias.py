@@ -1,8 +1,17 @@
-from textblob import TextBlob
+from .sentiment import SentimentEngine
+
+SENTIMENT_VERSION = 1
+SENTIMENT_MODELS = {
+    "textblob": "textblob",
+    "vectorized": "pattern-vectorized",
+}
 
 
 class BiasMetric:
-    def __init__(self, config):
+    def __init__(self, config, score_cache=None):
+        self.score_cache = score_cache
+        self.engine_name = config.get("bias", {}).get("engine", "textblob")
+        self._engine = None
         self.tolerance = config["quality_thresholds"]["sentiment_tolerance"]
         self.ranges = {
             5.0: (0.3, 1.0),
@@ -16,11 +25,56 @@ class BiasMetric:
             1.0: (-1.0, -0.2),
         }
 
-    def check(self, rating, text):
-        sentiment = TextBlob(text).sentiment.polarity
+    @property
+    def engine(self):
+        """Vectorized sentiment engine, built on first use"""
+        if self._engine is None:
+            self._engine = SentimentEngine()
+        return self._engine
+
+    def _sentiment(self, analysis):
+        if self.engine_name == "vectorized":
+            return float(self.engine.polarity_batch([analysis.text])[0])
+        return analysis.sentiment
+
+    def _passed(self, rating, sentiment):
         low, high = self.ranges.get(rating, (-0.3, 0.5))
+        return (low - self.tolerance) <= sentiment <= (high + self.tolerance)
+
+    def check(self, rating, analysis):
+        if self.score_cache:
+            sentiment = self.score_cache.get_or_compute(
+                "sentiment", SENTIMENT_VERSION, SENTIMENT_MODELS[self.engine_name], analysis.text,
+                lambda: self._sentiment(analysis),
+            )
+        else:
+            sentiment = self._sentiment(analysis)
 
         return {
-            "passed": (low - self.tolerance) <= sentiment <= (high + self.tolerance),
+            "passed": self._passed(rating, sentiment),
             "score": sentiment,
         }
+
+    def check_batch(self, ratings, texts):
+        """Check many reviews with one vectorized sentiment pass"""
+        model = SENTIMENT_MODELS["vectorized"]
+        sentiments = [None] * len(texts)
+
+        if self.score_cache:
+            sentiments = [
+                self.score_cache.get("sentiment", SENTIMENT_VERSION, model, text)
+                for text in texts
+            ]
+
+        missing = [i for i, s in enumerate(sentiments) if s is None]
+        if missing:
+            scores = self.engine.polarity_batch([texts[i] for i in missing])
+            for i, score in zip(missing, scores):
+                sentiments[i] = float(score)
+                if self.score_cache:
+                    self.score_cache.put("sentiment", SENTIMENT_VERSION, model, texts[i], sentiments[i])
+
+        return [
+            {"passed": self._passed(rating, sentiment), "score": sentiment}
+            for rating, sentiment in zip(ratings, sentiments)
+        ]
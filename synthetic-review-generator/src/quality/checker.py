@@ -1,38 +1,380 @@
+import threading
+import time
+
+import numpy as np
+
+import metrics
+
+from .analysis import AnalysisCache
+from .corpus import Corpus
 from .length import LengthMetric
 from .diversity import DiversityMetric, SemanticMetric
 from .bias import BiasMetric
 from .realism import RealismMetric
 from .persona import PersonaMetric
+from .minhash import MinHashLSHIndex
+from .score_cache import ScoreCache
+from .semantic_index import IncrementalTfidfIndex
+from .utils import jaccard_similarity
+
+FIXED_ORDER = ["length", "diversity", "semantic", "bias", "realism", "persona"]
+# Metrics that only look at the review itself, not at other reviews
+INDEPENDENT = ["length", "bias", "realism", "persona"]
+
+
+class MetricStats:
+    """Runtime cost and failure rate of one metric"""
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.calls = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.avg_cost = 0.0
+
+    def record(self, elapsed, passed):
+        self.calls += 1
+        self.failures += 0 if passed else 1
+        self.total_time += elapsed
+        if self.calls == 1:
+            self.avg_cost = elapsed
+        else:
+            self.avg_cost += self.smoothing * (elapsed - self.avg_cost)
+
+    @property
+    def failure_rate(self):
+        # Laplace-smoothed so untried metrics still get a finite rank
+        return (self.failures + 1) / (self.calls + 2)
+
+    @property
+    def rank(self):
+        """Expected cost per rejection; lower runs earlier"""
+        return self.avg_cost / self.failure_rate
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "failure_rate": round(self.failure_rate, 4),
+            "avg_cost_sec": round(self.avg_cost, 6),
+            "total_time_sec": round(self.total_time, 3),
+        }
 
 
 class QualityChecker:
-    def __init__(self, config):
-        self.length = LengthMetric(config)
-        self.diversity = DiversityMetric(config)
-        self.semantic = SemanticMetric(config)
-        self.bias = BiasMetric(config)
-        self.realism = RealismMetric(config)
-        self.persona = PersonaMetric(config)
-
-    def check_all(self, review, existing_reviews):
-        checks = []
-
-        checks.append(("length", self.length.check(review["review_text"])))
-        checks.append(("diversity", self.diversity.check(review["review_text"], existing_reviews)))
-        checks.append(("semantic", self.semantic.check(review["review_text"], existing_reviews)))
-        checks.append(("bias", self.bias.check(review["rating"], review["review_text"])))
-        checks.append(("realism", self.realism.check(review["review_text"])))
-        checks.append(("persona", self.persona.check(review["review_text"], review.get("persona_keywords", []))))
-
-        for name, result in checks:
+    """Runs the quality metrics for one corpus.
+
+    A checker built with shared=<another checker> reuses its score cache
+    and review-only metrics (realism batcher, sentiment engine) but keeps
+    its own analyses, similarity indexes and metric stats.
+    """
+
+    def __init__(self, config, shared=None):
+        self.shared = shared
+        if shared is not None:
+            self.score_cache = shared.score_cache
+            self.length = shared.length
+            self.bias = shared.bias
+            self.realism = shared.realism
+            self.persona = shared.persona
+        else:
+            cache_cfg = config.get("score_cache", {})
+            self.score_cache = None
+            if cache_cfg.get("enabled", False):
+                self.score_cache = ScoreCache(
+                    cache_cfg.get("path", "data/cache/scores.sqlite"),
+                    cache_cfg.get("memory_items", 10000),
+                    cache_cfg.get("commit_every", 100),
+                    read_only=cache_cfg.get("read_only", False),
+                )
+            self.length = LengthMetric(config)
+            self.bias = BiasMetric(config, score_cache=self.score_cache)
+            self.realism = RealismMetric(config, score_cache=self.score_cache)
+            self.persona = PersonaMetric(config)
+
+        self.analyses = AnalysisCache()
+        self.diversity = DiversityMetric(config, self.analyses)
+        self.semantic = SemanticMetric(config, self.analyses)
+
+        self.ordering = config.get("quality_checks", {}).get("ordering", "adaptive")
+        self.metric_stats = {name: MetricStats() for name in FIXED_ORDER}
+        self._stats_lock = threading.Lock()
+
+    def close(self):
+        """Stop the realism batcher and write out the score cache; a checker
+        sharing them leaves that to the one that built them"""
+        if self.shared is not None:
+            return
+        self.realism.close()
+        if self.score_cache:
+            self.score_cache.close()
+
+    def analyze(self, review):
+        """Shared analysis record for a review (cached per review object)"""
+        return self.analyses.get(review)
+
+    def _run_metric(self, name, review, analysis, existing_reviews, corpus=None):
+        # A corpus session brings its own similarity indexes
+        indexes = corpus or self
+        if name == "length":
+            return self.length.check(analysis)
+        if name == "diversity":
+            return indexes.diversity.check(analysis, existing_reviews)
+        if name == "semantic":
+            return indexes.semantic.check(analysis, existing_reviews)
+        if name == "bias":
+            return self.bias.check(review["rating"], analysis)
+        if name == "realism":
+            return self.realism.check(review["review_text"])
+        if name == "persona":
+            return self.persona.check(analysis, review.get("persona_keywords", []))
+        raise ValueError(f"Unknown metric: {name}")
+
+    def order(self):
+        """Current metric order (fixed, or by expected cost per rejection)"""
+        if self.ordering == "fixed":
+            return list(FIXED_ORDER)
+        with self._stats_lock:
+            return sorted(FIXED_ORDER, key=lambda name: self.metric_stats[name].rank)
+
+    def stats(self):
+        with self._stats_lock:
+            metrics = {name: s.to_dict() for name, s in self.metric_stats.items()}
+        return {
+            "ordering": self.ordering,
+            "order": self.order(),
+            "metrics": metrics,
+            "score_cache": self.score_cache.stats() if self.score_cache else None,
+            "semantic_drift": self.semantic.drift_report(),
+        }
+
+    def _run_checks(self, names, review, existing_reviews, spans=None, corpus=None):
+        """Run metrics in order, stopping at the first failure
+
+        spans (timing.Spans) collects each metric's duration for the attempt
+        log. lower_bound_scores names the metrics whose score is only a lower
+        bound.
+        """
+        analysis = self.analyze(review)
+        scores = {}
+        lower_bounds = []
+
+        for name in names:
+            start = time.perf_counter()
+            result = self._run_metric(name, review, analysis, existing_reviews, corpus)
+            elapsed = time.perf_counter() - start
+            if spans is not None:
+                spans.add(f"metric_{name}", elapsed)
+
+            with self._stats_lock:
+                self.metric_stats[name].record(elapsed, result["passed"])
+            metrics.METRIC_CHECKS.labels(name, "pass" if result["passed"] else "fail").inc()
+
             if not result["passed"]:
                 return {
                     "passed": False,
                     "failed_metric": name,
                     "score": result["score"],
                 }
+            scores[name] = result["score"]
+            if result.get("score_is_lower_bound"):
+                lower_bounds.append(name)
 
         return {
             "passed": True,
-            "scores": {name: r["score"] for name, r in checks},
-        }
\ No newline at end of file
+            "scores": scores,
+            "lower_bound_scores": lower_bounds,
+        }
+
+    def check_all(self, review, existing_reviews, spans=None):
+        return self._run_checks(self.order(), review, existing_reviews, spans)
+
+    def check_corpus(self, review, corpus):
+        """Check a review against a server-side corpus (quality.corpus.Corpus)"""
+        return self._run_checks(self.order(), review, corpus.reviews, corpus=corpus)
+
+    def check_similarity(self, review, existing_reviews, spans=None):
+        """Re-run only the corpus-dependent checks (diversity, semantic)"""
+        return self._run_checks(["diversity", "semantic"], review, existing_reviews, spans)
+
+    def _score_independent(self, reviews, analyses):
+        """Scores and pass flags of the metrics that only look at the review
+        itself (length, bias, persona), for a whole batch; the other metrics
+        start out as passed with no score"""
+        n = len(reviews)
+        scores = {name: [None] * n for name in FIXED_ORDER}
+        passed = {name: np.ones(n, dtype=bool) for name in FIXED_ORDER}
+
+        word_counts = np.array([a.word_count for a in analyses], dtype=np.int64)
+        passed["length"] = (word_counts >= self.length.min_words) & (word_counts <= self.length.max_words)
+        scores["length"] = word_counts.tolist()
+
+        ratings = [r["rating"] for r in reviews]
+        if self.bias.engine_name == "vectorized":
+            results = self.bias.check_batch(ratings, [a.text for a in analyses])
+        else:
+            results = [self.bias.check(rating, a) for rating, a in zip(ratings, analyses)]
+        scores["bias"] = [r["score"] for r in results]
+        passed["bias"] = np.array([r["passed"] for r in results], dtype=bool)
+
+        results = [
+            self.persona.check(a, r.get("persona_keywords", [])) for r, a in zip(reviews, analyses)
+        ]
+        scores["persona"] = [r["score"] for r in results]
+        passed["persona"] = np.array([r["passed"] for r in results], dtype=bool)
+        return scores, passed
+
+    def check_standalone(self, reviews, realism="score"):
+        """Check the metrics that need no other reviews (length, bias,
+        persona, realism) for a batch; one {"scores", "passed"} per review
+
+        Realism is only scored for reviews that passed the others. realism is
+        "score" (cached scores, then batched requests for the rest), "cached"
+        (cached scores only; misses stay unscored and pass) or "skip".
+        """
+        analyses = [self.analyze(r) for r in reviews]
+        scores, passed = self._score_independent(reviews, analyses)
+
+        if realism != "skip":
+            todo = np.flatnonzero(np.logical_and.reduce([passed[name] for name in FIXED_ORDER]))
+            results = self.realism.check_batch(
+                [reviews[i]["review_text"] for i in todo], score_missing=realism == "score"
+            )
+            for i, result in zip(todo, results):
+                scores["realism"][i] = result["score"]
+                passed["realism"][i] = result["passed"]
+
+        return [
+            {
+                "scores": {name: scores[name][i] for name in INDEPENDENT},
+                "passed": {name: bool(passed[name][i]) for name in INDEPENDENT},
+            }
+            for i in range(len(reviews))
+        ]
+
+    def check_batch(self, reviews, corpus=None, realism=True):
+        """Check many candidate reviews in one pass
+
+        Every cheap metric (length, diversity, semantic, bias, persona) is
+        evaluated for every review, so each result carries the full score
+        vector; realism is scored in batched requests, only for reviews that
+        passed the cheap metrics (realism=False skips it). `corpus` is a list
+        of existing reviews or a quality.corpus.Corpus.
+
+        Candidates are also compared with each other, which approximates
+        generating the batch one review at a time: a review whose Jaccard
+        similarity to an earlier accepted review of the same batch exceeds the
+        diversity threshold fails with "batch_duplicate", and one whose TF-IDF
+        cosine similarity exceeds the semantic threshold with "batch_semantic".
+        Batch TF-IDF vectors use the corpus index's feature space (or one fit
+        on the batch when there is no corpus), which is not refreshed as
+        members are accepted.
+        """
+        n = len(reviews)
+        indexes = corpus if isinstance(corpus, Corpus) else self
+        existing = corpus.reviews if isinstance(corpus, Corpus) else (corpus or [])
+        analyses = [self.analyze(r) for r in reviews]
+        terms = [a.terms for a in analyses]
+        scores, passed = self._score_independent(reviews, analyses)
+        queries = None
+
+        # One MinHash signature per review, shared by the corpus and batch lookups
+        batch_index = MinHashLSHIndex(self.diversity.max_jaccard, self.diversity.num_perm)
+        sigs = batch_index.signatures([a.token_set for a in analyses])
+
+        if existing:
+            with indexes.diversity._lock:
+                indexes.diversity._sync(existing)
+                results = [
+                    indexes.diversity.max_similarity(a.token_set, sig) for a, sig in zip(analyses, sigs)
+                ]
+            sims = [score for score, _ in results]
+            lower_bounds = [lower_bound for _, lower_bound in results]
+            scores["diversity"] = sims
+            passed["diversity"] = np.array(sims) <= indexes.diversity.max_jaccard
+            try:
+                with indexes.semantic._lock:
+                    indexes.semantic._sync(existing)
+                    sims = indexes.semantic.index.max_similarities(terms)
+                    queries = indexes.semantic.index.transform(terms)
+                scores["semantic"] = sims.tolist()
+                passed["semantic"] = sims <= indexes.semantic.max_similarity
+            except Exception:
+                # Fail open, like the single-review check
+                scores["semantic"] = [0.0] * n
+        else:
+            scores["diversity"] = scores["semantic"] = [0.0] * n
+            lower_bounds = [False] * n
+            try:
+                batch_tfidf = IncrementalTfidfIndex()
+                for t in terms:
+                    batch_tfidf.add(t)
+                batch_tfidf.refresh()
+                queries = batch_tfidf.transform(terms)
+            except Exception:
+                pass
+
+        cheap = np.logical_and.reduce([passed[name] for name in FIXED_ORDER])
+        if realism:
+            todo = np.flatnonzero(cheap)
+            results = self.realism.check_batch([reviews[i]["review_text"] for i in todo])
+            for i, result in zip(todo, results):
+                scores["realism"][i] = result["score"]
+                passed["realism"][i] = result["passed"]
+
+        # Within-batch near-duplicates, against earlier accepted candidates
+        members = []
+        batch_sims = [0.0] * n
+        batch_semantic = [0.0] * n
+        duplicate_of = [None] * n
+        semantic_of = [None] * n
+        block = 256
+        accepted = np.logical_and.reduce([passed[name] for name in FIXED_ORDER])
+        for i, a in enumerate(analyses):
+            for j in batch_index.candidates(a.token_set, sigs[i]):
+                sim = jaccard_similarity(a.token_set, batch_index.token_sets[j])
+                if sim > batch_sims[i]:
+                    batch_sims[i], duplicate_of[i] = sim, members[j]
+            if queries is not None:
+                # Cosine similarities with every earlier candidate, a block of rows at a time
+                if i % block == 0:
+                    gram = queries[i:i + block] @ queries[:i + block].T
+                if members:
+                    sims = gram[i % block, members]
+                    j = int(sims.argmax())
+                    batch_semantic[i], semantic_of[i] = float(sims[j]), members[j]
+            if (accepted[i] and batch_sims[i] <= self.diversity.max_jaccard
+                    and batch_semantic[i] <= self.semantic.max_similarity):
+                batch_index.add(a.token_set, sigs[i])
+                members.append(i)
+
+        verdicts = []
+        for i in range(n):
+            failed = [name for name in FIXED_ORDER if not passed[name][i]]
+            if batch_sims[i] > self.diversity.max_jaccard:
+                failed.append("batch_duplicate")
+            else:
+                duplicate_of[i] = None
+            if batch_semantic[i] > self.semantic.max_similarity:
+                failed.append("batch_semantic")
+                if duplicate_of[i] is None:
+                    duplicate_of[i] = semantic_of[i]
+            verdicts.append({
+                "passed": not failed,
+                "failed_metric": failed[0] if failed else None,
+                "failed_metrics": failed,
+                "scores": {
+                    **{name: scores[name][i] for name in FIXED_ORDER},
+                    "batch_similarity": batch_sims[i],
+                    "batch_semantic_similarity": batch_semantic[i],
+                },
+                "duplicate_of": duplicate_of[i],
+                "lower_bound_scores": ["diversity"] if lower_bounds[i] else [],
+            })
+
+        for name in FIXED_ORDER:
+            checked = n if name != "realism" else (int(cheap.sum()) if realism else 0)
+            failures = int((~passed[name]).sum())
+            metrics.METRIC_CHECKS.labels(name, "pass").inc(checked - failures)
+            metrics.METRIC_CHECKS.labels(name, "fail").inc(failures)
+        return verdicts
@@ -0,0 +1,157 @@
+"""Named server-side review corpora with prebuilt similarity indexes"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from .analysis import AnalysisCache
+from .diversity import DiversityMetric, SemanticMetric
+
+# Approximate index memory per review: MinHash token set and band keys plus
+# the TF-IDF row (tracemalloc: ~16 KB for a typical 450-character review)
+_BYTES_PER_CHAR = 30
+_BYTES_PER_REVIEW = 2000
+
+
+def footprint(reviews):
+    """Approximate bytes the indexes need for these reviews"""
+    return sum(_BYTES_PER_REVIEW + _BYTES_PER_CHAR * len(r["review_text"]) for r in reviews)
+
+
+class CorpusNotFound(KeyError):
+    pass
+
+
+class CorpusBudgetExceeded(ValueError):
+    """Reviews a corpus can't take: malformed, or over corpora.max_memory_mb"""
+
+
+class Corpus:
+    """Reviews plus diversity/semantic indexes that grow as reviews are added"""
+
+    def __init__(self, corpus_id, config):
+        self.id = corpus_id
+        self.reviews = []
+        # Own cache: the records its indexes pin are dropped with the corpus
+        self.analyses = AnalysisCache()
+        self.diversity = DiversityMetric(config, self.analyses)
+        self.semantic = SemanticMetric(config, self.analyses)
+        self.approx_bytes = 0
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.lock = threading.Lock()
+
+    def add(self, reviews, max_bytes=None):
+        """Append reviews and index them right away, so checks stay cheap.
+        Raises CorpusBudgetExceeded if they would take it past max_bytes."""
+        with self.lock:
+            if max_bytes is not None and self.approx_bytes + footprint(reviews) > max_bytes:
+                raise CorpusBudgetExceeded("Corpus would exceed corpora.max_memory_mb")
+            self.reviews.extend(reviews)
+            self.approx_bytes += footprint(reviews)
+            self.diversity.extend(self.reviews)
+            self.semantic.extend(self.reviews)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "reviews": len(self.reviews),
+            "approx_mb": round(self.approx_bytes / 1e6, 3),
+            "created_at": self.created_at,
+            "idle_sec": round(time.time() - self.last_used, 1),
+        }
+
+
+class CorpusStore:
+    """Corpora kept in LRU order and evicted when idle too long, or when
+    the count or the approximate memory budget is exceeded"""
+
+    def __init__(self, config):
+        settings = config.get("corpora", {})
+        self.config = config
+        self.max_corpora = settings.get("max_corpora", 32)
+        self.max_bytes = settings.get("max_memory_mb", 512) * 1e6
+        self.idle_ttl = settings.get("idle_ttl_sec", 3600)
+        self.corpora = OrderedDict()
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def _validate(self, reviews):
+        for review in reviews:
+            if not isinstance(review, dict) or not isinstance(review.get("review_text"), str):
+                raise CorpusBudgetExceeded("Each review needs a review_text string")
+
+    def create(self, reviews=None, corpus_id=None):
+        corpus_id = corpus_id or uuid.uuid4().hex[:12]
+        reviews = reviews or []
+        self._validate(reviews)
+
+        # Indexes are built outside the lock; the id is claimed atomically
+        corpus = Corpus(corpus_id, self.config)
+        corpus.add(reviews, self.max_bytes)
+        corpus.last_used = time.time()
+        with self.lock:
+            if corpus_id in self.corpora:
+                raise ValueError(f"Corpus already exists: {corpus_id}")
+            self.corpora[corpus_id] = corpus
+            self._evict(keep=corpus_id)
+        return corpus
+
+    def get(self, corpus_id):
+        """Corpus by id; marks it most recently used"""
+        with self.lock:
+            self._evict()
+            corpus = self.corpora.get(corpus_id)
+            if corpus is None:
+                raise CorpusNotFound(corpus_id)
+            self.corpora.move_to_end(corpus_id)
+            corpus.last_used = time.time()
+            return corpus
+
+    def add(self, corpus_id, reviews):
+        corpus = self.get(corpus_id)
+        self._validate(reviews)
+        # Budget check and insert share the corpus lock, so concurrent adds
+        # can't both pass the check
+        corpus.add(reviews, self.max_bytes)
+        with self.lock:
+            self._evict(keep=corpus_id)
+        return corpus
+
+    def delete(self, corpus_id):
+        with self.lock:
+            if self.corpora.pop(corpus_id, None) is None:
+                raise CorpusNotFound(corpus_id)
+
+    def list(self):
+        with self.lock:
+            self._evict()
+            return list(self.corpora.values())
+
+    def _evict(self, keep=None):
+        """Drop idle corpora, then least recently used ones over budget"""
+        now = time.time()
+        for corpus_id, corpus in list(self.corpora.items()):
+            if corpus_id != keep and now - corpus.last_used > self.idle_ttl:
+                del self.corpora[corpus_id]
+                self.evicted += 1
+
+        total = sum(c.approx_bytes for c in self.corpora.values())
+        for corpus_id in list(self.corpora):
+            if len(self.corpora) <= self.max_corpora and total <= self.max_bytes:
+                break
+            if corpus_id == keep:
+                continue
+            total -= self.corpora.pop(corpus_id).approx_bytes
+            self.evicted += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "corpora": len(self.corpora),
+                "reviews": sum(len(c.reviews) for c in self.corpora.values()),
+                "approx_mb": round(sum(c.approx_bytes for c in self.corpora.values()) / 1e6, 3),
+                "max_memory_mb": self.max_bytes / 1e6,
+                "evicted": self.evicted,
+            }
@@ -1,45 +1,147 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from .utils import tokenize, jaccard_similarity
+import operator
+import pickle
+import random
+import threading
 
+from .analysis import AnalysisCache
+from .minhash import MinHashLSHIndex
+from .semantic_index import IncrementalTfidfIndex, refit_similarity
 
-class DiversityMetric:
-    def __init__(self, config):
+
+def _extends(reviews, indexed):
+    """True if `reviews` starts with exactly the review objects in `indexed`"""
+    return len(reviews) >= len(indexed) and all(map(operator.is_, reviews, indexed))
+
+
+class _ReviewIndex:
+    """Follows a list of existing reviews and indexes the ones appended to it.
+
+    A different list object is followed incrementally when it starts with the
+    reviews already indexed; any other list rebuilds the index from scratch.
+    Indexed reviews keep their analysis pinned in the shared AnalysisCache.
+    """
+
+    def __init__(self, analyses=None):
+        self.analyses = analyses or AnalysisCache()
+        self.index = None
+        self._indexed = []
+        self._source = None
+        self._lock = threading.Lock()
+
+    def _sync(self, existing_reviews):
+        if existing_reviews is not self._source or len(existing_reviews) < len(self._indexed):
+            if self.index is None or not _extends(existing_reviews, self._indexed):
+                self.analyses.unpin(self._indexed)
+                self.index = self._new_index()
+                self._indexed = []
+            self._source = existing_reviews
+
+        for r in existing_reviews[len(self._indexed):]:
+            self._add(self.analyses.pin(r))
+            self._indexed.append(r)
+
+    def extend(self, reviews):
+        """Index what was appended to `reviews` (the list checks compare
+        against) now, instead of on the next check"""
+        with self._lock:
+            self._sync(reviews)
+
+    def snapshot(self, reviews):
+        """(indexed count, pickled index) if the index follows `reviews`,
+        else None. Callers keep `reviews` from growing meanwhile."""
+        with self._lock:
+            if self._source is not reviews or self.index is None:
+                return None
+            return len(self._indexed), pickle.dumps(self.index)
+
+    def restore(self, snapshot, reviews):
+        """Load a snapshot() taken while following `reviews`"""
+        count, blob = snapshot
+        with self._lock:
+            self.analyses.unpin(self._indexed)
+            self.index = pickle.loads(blob)
+            self._indexed = list(reviews[:count])
+            for r in self._indexed:
+                self.analyses.pin(r)
+            self._source = reviews
+
+
+class DiversityMetric(_ReviewIndex):
+    """Max Jaccard similarity to the existing reviews, via a MinHash/LSH index.
+
+    Up to `exact_below` indexed reviews every one is scored, so the score is
+    the exact maximum. Past that only reviews sharing an LSH band with the
+    candidate are scored (exactly), so the score is the true maximum whenever
+    it matters: pairs at the threshold are found with probability >= 0.999.
+    Below the threshold it is then a lower bound (0.0 when no indexed review
+    came close), and results carry score_is_lower_bound=True.
+    """
+
+    def __init__(self, config, analyses=None):
+        super().__init__(analyses)
         self.max_jaccard = config["quality_thresholds"]["max_jaccard_similarity"]
+        settings = config.get("diversity_index", {})
+        self.num_perm = settings.get("num_perm", 256)
+        self.exact_below = settings.get("exact_below", 500)
 
-    def check(self, text, existing_reviews):
+    def _new_index(self):
+        return MinHashLSHIndex(self.max_jaccard, self.num_perm)
+
+    def _add(self, analysis):
+        self.index.add(analysis.token_set)
+
+    def max_similarity(self, tokens, sig=False):
+        """(score, score_is_lower_bound) against the synced index; call
+        with the lock held"""
+        if len(self.index) <= self.exact_below:
+            return self.index.exact_max_similarity(tokens), False
+        max_sim = self.index.max_similarity(tokens, sig)
+        return max_sim, max_sim <= self.max_jaccard
+
+    def check(self, analysis, existing_reviews):
         if not existing_reviews:
             return {"passed": True, "score": 0.0}
 
-        current = set(tokenize(text))
-        max_sim = 0.0
-
-        for r in existing_reviews:
-            words = set(tokenize(r["review_text"]))
-            sim = jaccard_similarity(current, words)
-            max_sim = max(max_sim, sim)
+        with self._lock:
+            self._sync(existing_reviews)
+            max_sim, lower_bound = self.max_similarity(analysis.token_set)
 
         return {
             "passed": max_sim <= self.max_jaccard,
             "score": max_sim,
+            "score_is_lower_bound": lower_bound,
         }
 
 
-class SemanticMetric:
-    def __init__(self, config):
+class SemanticMetric(_ReviewIndex):
+    def __init__(self, config, analyses=None):
+        super().__init__(analyses)
         self.max_similarity = config["quality_thresholds"]["max_semantic_similarity"]
-        self.vectorizer = TfidfVectorizer(max_features=500)
+        settings = config.get("semantic_index", {})
+        self.drift_sample_rate = settings.get("drift_sample_rate", 0.0)
+        self.drift_max_samples = settings.get("drift_max_samples", 200)
+        # Own RNG, so sampling never shifts a seeded generation run
+        self._rng = random.Random(0)
+        self._drift = []
 
-    def check(self, text, existing_reviews):
+    def _new_index(self):
+        return IncrementalTfidfIndex()
+
+    def _add(self, analysis):
+        self.index.add(analysis.terms)
+
+    def check(self, analysis, existing_reviews):
         if not existing_reviews:
             return {"passed": True, "score": 0.0}
 
-        texts = [text] + [r["review_text"] for r in existing_reviews]
-
         try:
-            vectors = self.vectorizer.fit_transform(texts)
-            sims = cosine_similarity(vectors[0:1], vectors[1:])[0]
-            max_sim = float(max(sims)) if len(sims) else 0.0
+            with self._lock:
+                self._sync(existing_reviews)
+                max_sim = self.index.max_similarity(analysis.terms)
+
+            if (self.drift_sample_rate and len(self._drift) < self.drift_max_samples
+                    and self._rng.random() < self.drift_sample_rate):
+                self._record_drift(analysis.text, existing_reviews, max_sim)
 
             return {
                 "passed": max_sim <= self.max_similarity,
@@ -48,3 +150,24 @@ class SemanticMetric:
 
         except Exception:
             return {"passed": True, "score": 0.0}
+
+    def _record_drift(self, text, existing_reviews, score):
+        reference = refit_similarity(text, [r["review_text"] for r in existing_reviews])
+        self._drift.append((score, reference))
+
+    def drift_report(self):
+        """Score drift of the incremental index vs refitting on every check"""
+        if not self._drift:
+            return {"samples": 0}
+
+        diffs = [abs(s - ref) for s, ref in self._drift]
+        flips = sum(
+            (s <= self.max_similarity) != (ref <= self.max_similarity)
+            for s, ref in self._drift
+        )
+        return {
+            "samples": len(diffs),
+            "mean_abs_diff": sum(diffs) / len(diffs),
+            "max_abs_diff": max(diffs),
+            "threshold_flips": flips,
+        }
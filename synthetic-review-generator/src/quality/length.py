@@ -4,8 +4,8 @@ class LengthMetric:
         self.min_words = cfg["min_words"]
         self.max_words = cfg["max_words"]
 
-    def check(self, text):
-        count = len(text.split())
+    def check(self, analysis):
+        count = analysis.word_count
         return {
             "passed": self.min_words <= count <= self.max_words,
             "score": count,
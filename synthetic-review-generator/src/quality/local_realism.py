@@ -0,0 +1,159 @@
+"""Offline realism scorer: TF-IDF + stylometric features, no network"""
+
+import csv
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import FeatureUnion, Pipeline, make_pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+from file_manager import iter_reviews
+
+_SENTENCE_END = re.compile(r"[.!?]+")
+
+GENERIC_PHRASES = [
+    "It is good.", "Very nice product.", "I like it.", "Works fine.",
+    "Good tool.", "Nothing to say.", "It is okay.", "Great.", "Not bad.",
+    "Useful software.", "Recommended.", "Some things could be better.",
+]
+
+
+def stylometric_features(texts):
+    """Length, vocabulary and punctuation statistics per text"""
+    rows = []
+    for text in texts:
+        words = text.split()
+        n_words = max(len(words), 1)
+        n_chars = max(len(text), 1)
+        sentences = [s for s in _SENTENCE_END.split(text) if s.strip()]
+        rows.append([
+            np.log1p(len(words)),
+            sum(len(w) for w in words) / n_words,
+            len({w.lower() for w in words}) / n_words,
+            len(sentences),
+            n_words / max(len(sentences), 1),
+            sum(not c.isalnum() and not c.isspace() for c in text) / n_chars,
+            sum(c.isupper() for c in text) / n_chars,
+            sum(c.isdigit() for c in text) / n_chars,
+            float("Pros:" in text),
+            float("Cons:" in text),
+        ])
+    return np.array(rows, dtype=np.float64)
+
+
+def load_positive_texts(raw_dir="data/raw", synthetic_dir="data/synthetic"):
+    """Real reviews plus previously accepted synthetic reviews"""
+    texts = []
+
+    real_json = os.path.join(raw_dir, "real_reviews.json")
+    if os.path.exists(real_json):
+        with open(real_json) as f:
+            texts += [r["review_text"] for r in json.load(f)]
+
+    real_csv = os.path.join(raw_dir, "gitlab_reviews.csv")
+    if os.path.exists(real_csv):
+        with open(real_csv, newline="") as f:
+            texts += [
+                f"{row['Title']}. Pros: {row['Pros']} Cons: {row['Cons']}"
+                for row in csv.DictReader(f)
+            ]
+
+    for path in glob.glob(os.path.join(synthetic_dir, "reviews", "reviews_clean_*.json*")):
+        texts += [r["review_text"] for r in iter_reviews(path)]
+
+    return list(dict.fromkeys(texts))
+
+
+def make_negative_texts(positives, per_text=3, seed=0):
+    """Known-bad reviews derived from good ones (same failure modes as
+    PromptBuilder.build_bad_prompt plus word salad and repetition)"""
+    rng = random.Random(seed)
+    negatives = []
+
+    for text in positives:
+        words = text.split()
+        for _ in range(per_text):
+            kind = rng.choice(["too_short", "generic", "shuffled", "repetitive", "flat"])
+
+            if kind == "too_short":
+                negatives.append(" ".join(words[:rng.randint(3, 9)]))
+            elif kind == "generic":
+                picks = rng.sample(GENERIC_PHRASES, rng.randint(2, 5))
+                negatives.append(f"{picks[0]} Pros: {' '.join(picks[1:])} Cons: {rng.choice(GENERIC_PHRASES)}")
+            elif kind == "shuffled":
+                shuffled = words[:]
+                rng.shuffle(shuffled)
+                negatives.append(" ".join(shuffled))
+            elif kind == "repetitive":
+                sentence = (_SENTENCE_END.split(text)[0] or text).strip()
+                negatives.append(". ".join([sentence] * rng.randint(3, 8)) + ".")
+            else:
+                negatives.append(re.sub(r"[^\w\s]", "", text).lower())
+
+    return negatives
+
+
+def build_pipeline():
+    features = FeatureUnion([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=2)),
+        ("style", make_pipeline(
+            FunctionTransformer(stylometric_features, validate=False),
+            StandardScaler(),
+        )),
+    ])
+    return Pipeline([
+        ("features", features),
+        ("clf", LogisticRegression(max_iter=1000, class_weight="balanced")),
+    ])
+
+
+class LocalRealismModel:
+    """Scores texts 1-10 from the probability of looking like a real review"""
+
+    def __init__(self, pipeline=None):
+        self.pipeline = pipeline or build_pipeline()
+
+    def train(self, positives, negatives):
+        texts = list(positives) + list(negatives)
+        labels = [1] * len(positives) + [0] * len(negatives)
+        self.pipeline.fit(texts, labels)
+        return self
+
+    def score_batch(self, texts):
+        proba = self.pipeline.predict_proba(list(texts))[:, 1]
+        return [round(1 + 9 * float(p), 2) for p in proba]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(self.pipeline, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(joblib.load(path))
+
+
+def artifact_id(path):
+    """Short content hash of a saved model, used in score cache keys"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def train_local_realism(output_path, raw_dir="data/raw", synthetic_dir="data/synthetic", seed=0):
+    """Train on data/raw + data/synthetic and save the artifact"""
+    positives = load_positive_texts(raw_dir, synthetic_dir)
+    negatives = make_negative_texts(positives, seed=seed)
+    model = LocalRealismModel().train(positives, negatives)
+    model.save(output_path)
+    return {
+        "model_path": output_path,
+        "positives": len(positives),
+        "negatives": len(negatives),
+    }
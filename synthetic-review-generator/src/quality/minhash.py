@@ -0,0 +1,131 @@
+"""MinHash + LSH index for near-duplicate Jaccard lookups"""
+
+import zlib
+
+import numpy as np
+
+from .utils import jaccard_similarity
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _band_params(threshold, num_perm, min_recall=0.999):
+    """Pick (bands, rows) with the fewest false positives that still
+    catch pairs at `threshold` with probability >= min_recall"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands == 0:
+            break
+        recall = 1 - (1 - threshold ** rows) ** bands
+        if recall >= min_recall:
+            best = (bands, rows)
+    return best
+
+
+class MinHashLSHIndex:
+    """Persistent MinHash signatures bucketed by LSH bands.
+
+    Candidates found through the bands are verified with exact Jaccard on
+    the stored token sets, so reported similarities are exact. Pairs that
+    never share a band are far below the threshold and are not scored.
+    """
+
+    def __init__(self, threshold, num_perm=256, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = _band_params(threshold, num_perm)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.token_sets = []
+        self.buckets = [{} for _ in range(self.bands)]
+
+    def __len__(self):
+        return len(self.token_sets)
+
+    def signature(self, tokens):
+        """MinHash signature of a token set"""
+        if not tokens:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) for t in tokens),
+            dtype=np.uint64,
+            count=len(tokens),
+        )
+        phv = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return phv.min(axis=0)
+
+    def signatures(self, token_sets, chunk=64):
+        """MinHash signatures of many token sets (None for empty ones),
+        hashing `chunk` sets per numpy pass"""
+        sigs = [None] * len(token_sets)
+        for start in range(0, len(token_sets), chunk):
+            sets = token_sets[start:start + chunk]
+            sizes = np.array([len(s) for s in sets])
+            if not sizes.sum():
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(t.encode("utf-8")) for s in sets for t in s),
+                dtype=np.uint64,
+                count=int(sizes.sum()),
+            )
+            phv = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            nonempty = np.flatnonzero(sizes)
+            mins = np.minimum.reduceat(phv, offsets[nonempty], axis=0)
+            for i, sig in zip(nonempty, mins):
+                sigs[start + i] = sig
+        return sigs
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, tokens, sig=False):
+        """Index one accepted token set (sig: its precomputed signature)"""
+        tokens = set(tokens)
+        idx = len(self.token_sets)
+        self.token_sets.append(tokens)
+
+        if sig is False:
+            sig = self.signature(tokens)
+        if sig is not None:
+            for band, key in zip(self.buckets, self._band_keys(sig)):
+                band.setdefault(key, []).append(idx)
+        return idx
+
+    def candidates(self, tokens, sig=False):
+        """Indices sharing at least one LSH band with `tokens`"""
+        if sig is False:
+            sig = self.signature(tokens)
+        if sig is None:
+            return set()
+        found = set()
+        for band, key in zip(self.buckets, self._band_keys(sig)):
+            found.update(band.get(key, ()))
+        return found
+
+    def exact_max_similarity(self, tokens):
+        """Max exact Jaccard over every indexed set (brute force)"""
+        tokens = set(tokens)
+        size = len(tokens)
+        max_sim = 0.0
+        for other in self.token_sets:
+            # Same value as jaccard_similarity, without building the union
+            shared = len(tokens.intersection(other))
+            union = size + len(other) - shared
+            if union and shared / union > max_sim:
+                max_sim = shared / union
+        return max_sim
+
+    def max_similarity(self, tokens, sig=False):
+        """Max exact Jaccard over LSH candidates (0.0 if none)"""
+        tokens = set(tokens)
+        max_sim = 0.0
+        for idx in self.candidates(tokens, sig):
+            max_sim = max(max_sim, jaccard_similarity(tokens, self.token_sets[idx]))
+        return max_sim
@@ -1,34 +1,265 @@
+import json
 import os
-from openai import OpenAI
+import queue
+import threading
+from concurrent.futures import Future
+
+from providers import RateLimited, get_registry
+from replay import ReplayMiss, get_replay
+
+from .local_realism import LocalRealismModel, artifact_id
+
+# Bump when the scoring prompt changes so cached scores are not reused
+REALISM_VERSION = 1
+
+
+_STOP = object()
+
+
+class RealismBatcher:
+    """Collect realism requests from concurrent callers and score them in batches.
+
+    A background thread, started on the first request, drains up to
+    `max_batch` pending texts (waiting at most `max_wait` seconds for a batch
+    to fill), scores them with one request and resolves each caller's future.
+    If the batch call fails or its response can't be parsed, the texts are
+    scored one by one instead. close() stops the thread.
+    """
+
+    def __init__(self, score_batch, score_one, max_batch=10, max_wait=0.05):
+        self.score_batch = score_batch
+        self.score_one = score_one
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.fallbacks = 0
+        self.closed = False
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def score(self, text):
+        """Block until this text's score is available"""
+        with self._lock:
+            if self.closed:
+                return self.score_one(text)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="realism-batcher")
+                self._thread.start()
+            future = Future()
+            self._queue.put((text, future))
+        return future.result()
+
+    def close(self):
+        """Score what is pending, then stop the thread"""
+        with self._lock:
+            self.closed = True
+            thread = self._thread
+            if thread:
+                self._queue.put((_STOP, None))
+        if thread:
+            thread.join()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch and batch[-1][0] is not _STOP:
+            try:
+                batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            stop = batch[-1][0] is _STOP
+            if stop:
+                batch.pop()
+            if batch:
+                self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch):
+        texts = [text for text, _ in batch]
+
+        try:
+            scores = self.score_batch(texts) if len(texts) > 1 else [self.score_one(texts[0])]
+            self.batches += 1
+        except Exception:
+            self.fallbacks += 1
+            scores = None
+
+        for i, (text, future) in enumerate(batch):
+            if scores is not None:
+                future.set_result(scores[i])
+                continue
+            try:
+                future.set_result(self.score_one(text))
+            except Exception as e:
+                future.set_exception(e)
 
 
 class RealismMetric:
-    def __init__(self, config):
+    def __init__(self, config, client=None, score_cache=None):
         self.min_score = config["quality_thresholds"]["min_realism_score"]
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.score_cache = score_cache
+
+        cfg = config.get("realism", {})
+        self.backend = cfg.get("backend", "llm")
+        self.local_model = None
+        self.client = None
+        self.batcher = None
+
+        if self.backend == "local":
+            model_path = cfg.get("local_model_path", "models/realism_local.joblib")
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(
+                    f"Local realism model not found at {model_path}. "
+                    "Train it with: python src/cli.py train-realism"
+                )
+            self.local_model = LocalRealismModel.load(model_path)
+            self.model = f"local:{artifact_id(model_path)}"
+            return
+
+        self.registry = get_registry()
+        self.replay = get_replay(config)
+        self.client = client
+        self.provider = cfg.get("provider", "openai")
+        self.model = cfg.get("model", "gpt-4o-mini")
+        batch_size = cfg.get("batch_size", 1)
+        if batch_size > 1:
+            self.batcher = RealismBatcher(
+                self._score_batch,
+                self._score_one,
+                max_batch=batch_size,
+                max_wait=cfg.get("max_wait_ms", 50) / 1000,
+            )
+
+    def _client(self):
+        # Built lazily so replayed runs need no API key
+        if self.client is None:
+            self.client = self.registry.client(self.provider)
+        return self.client
+
+    def _score_one(self, text):
+        if self.local_model:
+            return self.local_model.score_batch([text])[0]
 
-    def check(self, text):
         prompt = (
             "Rate how realistic this GitLab review is on a scale from 1 to 10.\n\n"
             f'Review: "{text}"\n\n'
             "Reply with only a number."
         )
 
-        try:
-            res = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=5,
-            )
+        def request():
+            with self.registry.limit(self.provider, self.model):
+                res = self._client().chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=5,
+                )
+            return res.choices[0].message.content
+
+        content = self.replay.call(self.provider, self.model, prompt, 0.3, None, request)
+        return float(content.strip())
+
+    def _score_batch(self, texts):
+        if self.local_model:
+            return self.local_model.score_batch(texts)
+
+        reviews = "\n\n".join(f'{i + 1}. "{text}"' for i, text in enumerate(texts))
+        prompt = (
+            f"Rate how realistic each of these {len(texts)} GitLab reviews is "
+            "on a scale from 1 to 10.\n\n"
+            f"{reviews}\n\n"
+            'Reply with only JSON: {"scores": [one number per review, in order]}'
+        )
+
+        def request():
+            with self.registry.limit(self.provider, self.model):
+                res = self._client().chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=10 * len(texts) + 20,
+                    response_format={"type": "json_object"},
+                )
+            return res.choices[0].message.content
 
-            score = float(res.choices[0].message.content.strip())
+        content = self.replay.call(self.provider, self.model, prompt, 0.3, None, request)
+        scores = [float(s) for s in json.loads(content)["scores"]]
+        if len(scores) != len(texts):
+            raise ValueError(f"Expected {len(texts)} scores, got {len(scores)}")
+        return scores
+
+    def _score(self, text):
+        return self.batcher.score(text) if self.batcher else self._score_one(text)
+
+    def check(self, text):
+        try:
+            if self.score_cache:
+                score = self.score_cache.get_or_compute(
+                    "realism", REALISM_VERSION, self.model, text,
+                    lambda: self._score(text),
+                )
+            else:
+                score = self._score(text)
 
             return {
                 "passed": score >= self.min_score,
                 "score": score,
             }
 
+        except (RateLimited, ReplayMiss):
+            # Let the caller back off and retry (or stop a replay) instead
+            # of passing unscored
+            raise
+
         except Exception:
             # Fail open to avoid blocking generation
             return {"passed": True, "score": 7.0}
+
+    def check_batch(self, texts, batch_size=20, score_missing=True):
+        """Check many reviews, scoring cache misses batch_size at a time
+        (one request each); a failed batch falls back to per-review checks.
+
+        score_missing=False only uses cached scores: misses pass unscored.
+        """
+        scores = [None] * len(texts)
+        if self.score_cache:
+            scores = [
+                self.score_cache.get("realism", REALISM_VERSION, self.model, text)
+                for text in texts
+            ]
+
+        missing = [i for i, s in enumerate(scores) if s is None]
+        results = {}
+        if not score_missing:
+            results = {i: {"passed": True, "score": None} for i in missing}
+            missing = []
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            try:
+                batch = self._score_batch([texts[i] for i in chunk])
+            except (RateLimited, ReplayMiss):
+                raise
+            except Exception:
+                for i in chunk:
+                    results[i] = self.check(texts[i])
+                continue
+            for i, score in zip(chunk, batch):
+                scores[i] = score
+                if self.score_cache:
+                    self.score_cache.put("realism", REALISM_VERSION, self.model, texts[i], score)
+
+        return [
+            results[i] if i in results else {"passed": scores[i] >= self.min_score, "score": scores[i]}
+            for i in range(len(texts))
+        ]
+
+    def close(self):
+        """Stop the batcher thread (if batching is on)"""
+        if self.batcher:
+            self.batcher.close()
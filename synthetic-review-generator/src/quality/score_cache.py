@@ -0,0 +1,166 @@
+"""Content-addressed cache for expensive metric scores"""
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys (NFC, collapsed whitespace)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(metric, version, model, text):
+    payload = f"{metric}\x00{version}\x00{model}\x00{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """Bounded in-memory LRU in front of a SQLite score store.
+
+    Keys hash the normalised text together with the metric name, metric
+    version and model, so changing any of them naturally misses. New scores
+    are written in one transaction per `commit_every` scores (or after
+    `commit_interval` seconds), and on flush()/close() or interpreter exit.
+
+    A read_only cache (for worker processes) never writes the store: new
+    scores stay in memory until take_new() hands them to the writer.
+    Once closed, lookups that need the store miss and puts are dropped.
+    """
+
+    def __init__(self, path="data/cache/scores.sqlite", memory_items=10000,
+                 commit_every=100, commit_interval=1.0, read_only=False):
+        self.path = path
+        self.memory_items = memory_items
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.read_only = read_only
+        self._memory = OrderedDict()
+        self._pending = {}
+        self._new = []
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if read_only:
+            # A store that does not exist yet just has no rows
+            exists = os.path.exists(path)
+            self._db = sqlite3.connect(
+                f"file:{path}?mode=ro" if exists else ":memory:", uri=exists, check_same_thread=False
+            )
+        else:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " key TEXT PRIMARY KEY, metric TEXT, version TEXT, model TEXT, score REAL)"
+        )
+        self._db.commit()
+        atexit.register(self.close)
+
+    def _remember(self, key, score):
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, metric, version, model, text):
+        """Cached score or None"""
+        key = cache_key(metric, version, model, text)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if key in self._pending:
+                self.memory_hits += 1
+                return self._pending[key][4]
+            if self._db is None:
+                # Closed: the store is gone, so this is a miss
+                self.misses += 1
+                return None
+
+            row = self._db.execute("SELECT score FROM scores WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, metric, version, model, text, score):
+        key = cache_key(metric, version, model, text)
+
+        with self._lock:
+            if self._db is None:
+                # Closed: nothing more is written
+                return
+            self._remember(key, score)
+            if self.read_only:
+                self._new.append((metric, version, model, text, score))
+                return
+            self._pending[key] = (key, metric, str(version), model, score)
+            if (len(self._pending) >= self.commit_every
+                    or time.monotonic() - self._last_commit >= self.commit_interval):
+                self._commit()
+
+    def _commit(self):
+        if self._pending:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)", self._pending.values()
+            )
+            self._db.commit()
+            self._pending = {}
+        self._last_commit = time.monotonic()
+
+    def take_new(self):
+        """Scores put since the last call, as put() arguments (read_only)"""
+        with self._lock:
+            new, self._new = self._new, []
+        return new
+
+    def flush(self):
+        """Write pending scores"""
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+            self._commit()
+            self._db.close()
+            self._db = None
+        atexit.unregister(self.close)
+
+    def get_or_compute(self, metric, version, model, text, compute):
+        score = self.get(metric, version, model, text)
+        if score is None:
+            score = compute()
+            self.put(metric, version, model, text, score)
+        return score
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+            }
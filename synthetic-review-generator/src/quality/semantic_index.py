@@ -0,0 +1,197 @@
+"""Incremental TF-IDF index for the semantic similarity check"""
+
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+
+def refit_similarity(text, texts, max_features=500):
+    """Max cosine similarity with a TfidfVectorizer refit on text + texts.
+
+    This is the original per-check behaviour, kept as the drift reference.
+    """
+    vectors = TfidfVectorizer(max_features=max_features).fit_transform([text] + texts)
+    sims = cosine_similarity(vectors[0:1], vectors[1:])[0]
+    return float(max(sims)) if len(sims) else 0.0
+
+
+def _grow(array, size):
+    """Return `array` with capacity for at least `size` entries"""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class IncrementalTfidfIndex:
+    """TF-IDF rows of accepted reviews over a fixed feature space.
+
+    Term counts and document frequencies are maintained on every add. The
+    feature space (the `max_features` most frequent corpus terms) and its
+    smoothed IDF are snapshotted, and every stored row is kept weighted and
+    L2-normalised over those features, so a check is one sparse mat-vec.
+    The snapshot is refreshed (all rows re-weighted) once the corpus has
+    grown by `refresh_growth` since the last refresh, which keeps the
+    amortised cost per add constant. Scores drift slightly from a refit on
+    (candidate + corpus); SemanticMetric samples that drift.
+    """
+
+    def __init__(self, max_features=500, refresh_growth=0.05):
+        self.max_features = max_features
+        self.refresh_growth = refresh_growth
+        self.vocabulary = {}
+
+        self.df = np.zeros(1024, dtype=np.int64)
+        self.counts = np.zeros(1024, dtype=np.float64)
+        self.n_docs = 0
+        self.refreshed_at = 0
+
+        # Snapshot: vocabulary id -> feature column (-1 outside), and IDF per column
+        self.columns = np.zeros(0, dtype=np.int64)
+        self.idf = np.zeros(0)
+
+        # Growable CSR buffers (amortised O(1) append) of raw term counts...
+        self._indptr = np.zeros(1024, dtype=np.int64)
+        self._indices = np.zeros(1024 * 64, dtype=np.int32)
+        self._data = np.zeros(1024 * 64, dtype=np.float64)
+        # ...and of the weighted rows over the feature columns
+        self._w_indptr = np.zeros(1024, dtype=np.int64)
+        self._w_indices = np.zeros(1024 * 64, dtype=np.int32)
+        self._w_data = np.zeros(1024 * 64, dtype=np.float64)
+
+    def __len__(self):
+        return self.n_docs
+
+    def add(self, terms):
+        """Index one accepted review from its TF-IDF terms"""
+        tf = Counter(terms)
+        for term in tf:
+            if term not in self.vocabulary:
+                self.vocabulary[term] = len(self.vocabulary)
+
+        indices = np.fromiter((self.vocabulary[t] for t in tf), dtype=np.int32, count=len(tf))
+        data = np.fromiter(tf.values(), dtype=np.float64, count=len(tf))
+
+        self.df = _grow(self.df, len(self.vocabulary))
+        self.counts = _grow(self.counts, len(self.vocabulary))
+        self.df[indices] += 1
+        self.counts[indices] += data
+
+        start = self._indptr[self.n_docs]
+        end = start + len(indices)
+        self._indices = _grow(self._indices, end)
+        self._data = _grow(self._data, end)
+        self._indices[start:end] = indices
+        self._data[start:end] = data
+
+        self._indptr = _grow(self._indptr, self.n_docs + 2)
+        self._w_indptr = _grow(self._w_indptr, self.n_docs + 2)
+        self.n_docs += 1
+        self._indptr[self.n_docs] = end
+
+        if self.n_docs >= self.refreshed_at * (1 + self.refresh_growth):
+            self.refresh()
+        else:
+            cols, weights = self._weigh(indices, data)
+            w_start = self._w_indptr[self.n_docs - 1]
+            w_end = w_start + len(cols)
+            self._w_indices = _grow(self._w_indices, w_end)
+            self._w_data = _grow(self._w_data, w_end)
+            self._w_indices[w_start:w_end] = cols
+            self._w_data[w_start:w_end] = weights
+            self._w_indptr[self.n_docs] = w_end
+
+    def _weigh(self, indices, data, unseen_sq=0.0):
+        """Feature columns and L2-normalised TF-IDF weights of one row.
+
+        unseen_sq adds squared weights of terms outside the vocabulary to the
+        norm, as a refit would count them while it has features to spare.
+        """
+        cols = np.full(len(indices), -1, dtype=np.int64)
+        known = indices < len(self.columns)
+        cols[known] = self.columns[indices[known]]
+        inside = cols >= 0
+        cols, weights = cols[inside], data[inside] * self.idf[cols[inside]]
+
+        norm = np.sqrt(np.dot(weights, weights) + unseen_sq)
+        return cols.astype(np.int32), (weights / norm if norm > 0 else weights)
+
+    def refresh(self):
+        """Re-select the feature space, recompute IDF and re-weight every row"""
+        n_terms = len(self.vocabulary)
+        if n_terms > self.max_features:
+            keep = np.argpartition(-self.counts[:n_terms], self.max_features - 1)[:self.max_features]
+        else:
+            keep = np.arange(n_terms)
+
+        self.columns = np.full(n_terms, -1, dtype=np.int64)
+        self.columns[keep] = np.arange(len(keep))
+        self.idf = np.log((1 + self.n_docs) / (1 + self.df[keep])) + 1
+        self.refreshed_at = self.n_docs
+
+        nnz = self._indptr[self.n_docs]
+        rows = np.repeat(np.arange(self.n_docs), np.diff(self._indptr[:self.n_docs + 1]))
+        cols = self.columns[self._indices[:nnz]]
+        inside = cols >= 0
+        rows, cols = rows[inside], cols[inside]
+        weights = self._data[:nnz][inside] * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=self.n_docs))
+
+        self._w_indices = _grow(self._w_indices, len(cols))
+        self._w_data = _grow(self._w_data, len(cols))
+        self._w_indices[:len(cols)] = cols
+        self._w_data[:len(cols)] = weights / norms[rows]
+        self._w_indptr[:self.n_docs + 1] = np.concatenate(
+            [[0], np.cumsum(np.bincount(rows, minlength=self.n_docs))]
+        )
+
+    def _matrix(self):
+        """CSR view of the weighted rows (n_docs x features)"""
+        nnz = self._w_indptr[self.n_docs]
+        return csr_matrix(
+            (self._w_data[:nnz], self._w_indices[:nnz], self._w_indptr[:self.n_docs + 1]),
+            shape=(self.n_docs, len(self.idf)),
+        )
+
+    def transform(self, terms_list):
+        """Normalised query vectors (dense, one row per candidate)"""
+        queries = np.zeros((len(terms_list), len(self.idf)))
+        room = len(self.idf) < self.max_features
+        unseen_idf = np.log(1 + self.n_docs) + 1
+        for row, terms in enumerate(terms_list):
+            tf = Counter(terms)
+            known = [t for t in tf if t in self.vocabulary]
+            indices = np.fromiter((self.vocabulary[t] for t in known), dtype=np.int64, count=len(known))
+            data = np.fromiter((tf[t] for t in known), dtype=np.float64, count=len(known))
+            unseen_sq = 0.0
+            if room:
+                unseen_sq = sum(c * c for t, c in tf.items() if t not in self.vocabulary) * unseen_idf ** 2
+            cols, weights = self._weigh(indices, data, unseen_sq)
+            queries[row, cols] = weights
+        return queries
+
+    def similarities(self, terms):
+        """Cosine similarity of a candidate's terms against every indexed review"""
+        if not self.n_docs:
+            return np.zeros(0)
+        return self._matrix() @ self.transform([terms])[0]
+
+    def max_similarities(self, terms_list, block=1024):
+        """max_similarity for many candidates, one sparse product per block"""
+        result = np.zeros(len(terms_list))
+        if not self.n_docs:
+            return result
+
+        matrix = self._matrix()
+        for start in range(0, len(terms_list), block):
+            queries = self.transform(terms_list[start:start + block])
+            result[start:start + len(queries)] = (matrix @ queries.T).max(axis=0)
+        return result
+
+    def max_similarity(self, terms):
+        sims = self.similarities(terms)
+        return float(sims.max()) if len(sims) else 0.0
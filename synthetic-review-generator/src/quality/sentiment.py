@@ -0,0 +1,158 @@
+"""Vectorized batch polarity scoring with TextBlob's pattern lexicon"""
+
+import re
+
+import numpy as np
+from textblob.en import sentiment as pattern_sentiment
+
+# Same contraction/quote splitting as pattern's find_tokens
+_REPLACEMENTS = [
+    ("'d", " 'd"), ("'m", " 'm"), ("'s", " 's"), ("'ll", " 'll"),
+    ("'re", " 're"), ("'ve", " 've"), ("n't", " n't"),
+    ("“", " “ "), ("”", " ” "), ("‘", " ‘ "), ("’", " ’ "),
+    ("'", " ' "), ('"', ' " '),
+]
+_PUNCT = re.escape(".,;:!?()[]{}`'\"@#$^&*+-|=~_")
+_TOKEN = re.compile(rf"\.\.\.|[^\s{_PUNCT}](?:\S*[^\s{_PUNCT}])?|[{_PUNCT}]")
+_LINEBREAK = re.compile(r"\n{2,}")
+
+NEGATIONS = ("no", "not", "never")
+
+
+def tokenize(text):
+    """Lowercased tokens, close to pattern's find_tokens"""
+    for a, b in _REPLACEMENTS:
+        text = text.replace(a, b)
+    text = _LINEBREAK.sub(" END-OF-SENTENCE ", text)
+    return [t.lower() for t in _TOKEN.findall(text)]
+
+
+class SentimentEngine:
+    """TextBlob (pattern) polarity for many texts at once.
+
+    The lexicon is compiled into per-word polarity / intensity / adverb
+    arrays. A batch is flattened into one token-id stream and the pattern
+    rules are applied with array scans:
+
+    - an adverb ("very", "really") modifies the next known word unless an
+      unknown word longer than two characters sits in between;
+    - "no" / "not" / "never" negate the next known word (carried across
+      one-character tokens), giving p * -0.5 for that chunk;
+    - each "!" after a chunk multiplies its polarity by 1.25.
+
+    Emoticons and the "really not good" adverb-negation case are not
+    modelled. On the reviews in data/raw and data/synthetic, polarity is
+    within TOLERANCE of TextBlob for every text; only those two cases
+    differ, by up to ~0.3.
+    """
+
+    TOLERANCE = 0.05
+
+    def __init__(self):
+        len(pattern_sentiment)  # force the lazy lexicon to load
+        words = list(dict.keys(pattern_sentiment))
+        self.vocabulary = {w: i for i, w in enumerate(words)}
+
+        entries = [dict.__getitem__(pattern_sentiment, w) for w in words]
+        self.polarity = np.array([e[None][0] for e in entries], dtype=np.float64)
+        self.intensity = np.array([e[None][2] for e in entries], dtype=np.float64)
+        self.is_modifier = np.array(["RB" in e for e in entries], dtype=bool)
+
+    def _encode(self, texts):
+        """Flatten texts into token arrays"""
+        per_doc = [tokenize(text) for text in texts]
+        tokens = [tok for toks in per_doc for tok in toks]
+        lookup = self.vocabulary.get
+
+        ids = np.fromiter((lookup(t, -1) for t in tokens), dtype=np.int64, count=len(tokens))
+        doc = np.repeat(np.arange(len(texts)), [len(toks) for toks in per_doc])
+        length = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        stripped = np.fromiter((len(t.strip("'")) for t in tokens), dtype=np.int64, count=len(tokens))
+        neg = np.fromiter((t in NEGATIONS for t in tokens), dtype=bool, count=len(tokens))
+        bang = np.fromiter((t == "!" for t in tokens), dtype=bool, count=len(tokens))
+        return ids, doc, length, stripped, neg, bang
+
+    @staticmethod
+    def _last(mask, doc_start):
+        """Index of the last True at or before each position (-1 if none in doc)"""
+        pos = np.where(mask, np.arange(len(mask)), -1)
+        last = np.maximum.accumulate(pos) if len(pos) else pos
+        return np.where(last >= doc_start, last, -1)
+
+    def polarity_batch(self, texts):
+        """Polarity in [-1, 1] for each text"""
+        n_docs = len(texts)
+        ids, doc, length, stripped, neg, bang = self._encode(texts)
+        if not len(ids):
+            return np.zeros(n_docs)
+
+        n = len(ids)
+        idx = np.arange(n)
+        known = ids >= 0
+        unknown = ~known
+        safe_ids = np.where(known, ids, 0)
+
+        first = np.r_[True, doc[1:] != doc[:-1]]
+        doc_start = np.maximum.accumulate(np.where(first, idx, 0))
+
+        # Previous known token strictly before each position
+        last_known = self._last(known, doc_start)
+        prev_known = np.r_[-1, last_known[:-1]]
+        prev_known = np.where(prev_known >= doc_start, prev_known, -1)
+
+        # Modifier: previous known word is an adverb with no long unknown word between
+        m_break = np.cumsum(unknown & (length > 2))
+        has_prev = prev_known >= 0
+        pk = np.where(has_prev, prev_known, 0)
+        modified = (
+            known & has_prev
+            & self.is_modifier[safe_ids[pk]]
+            & (np.r_[0, m_break[:-1]] - m_break[pk] == 0)
+        )
+
+        # Negation: a negation after the previous known word, not yet broken
+        last_neg = np.r_[-1, self._last(unknown & neg, doc_start)[:-1]]
+        last_nbreak = np.r_[-1, self._last(unknown & ~neg & (stripped > 1), doc_start)[:-1]]
+        negated = (
+            known
+            & (last_neg >= doc_start)
+            & (last_neg > prev_known)
+            & (last_nbreak < last_neg)
+        )
+
+        # Chunks: a known word starts one unless it is modified
+        k_pos = idx[known]
+        starts = ~modified[k_pos]
+        group = np.cumsum(starts) - 1
+        n_groups = group[-1] + 1 if len(group) else 0
+        if not n_groups:
+            return np.zeros(n_docs)
+
+        group_of = np.full(n, -1)
+        group_of[k_pos] = group
+        last_in_group = np.zeros(n_groups, dtype=np.int64)
+        last_in_group[group] = k_pos  # later positions overwrite earlier ones
+
+        # Chunk polarity comes from its last word, scaled by the word before it
+        intensity = self.intensity[safe_ids]
+        eff_intensity = np.where(negated, 1.0 / intensity, intensity)
+        L = last_in_group
+        p = self.polarity[safe_ids[L]]
+        scaled = np.clip(p * eff_intensity[np.where(modified[L], prev_known[L], L)], -1.0, 1.0)
+        p = np.where(modified[L], scaled, p)
+
+        # "!" boosts the chunk whose last word precedes it
+        bang_pos = idx[bang & unknown & (last_known >= 0)]
+        if len(bang_pos):
+            owner = group_of[last_known[bang_pos]]
+            owner = owner[last_in_group[owner] == last_known[bang_pos]]
+            boosts = np.bincount(owner, minlength=n_groups)
+            p = np.clip(p * 1.25 ** boosts, -1.0, 1.0)
+
+        group_negated = np.bincount(group, weights=negated[k_pos], minlength=n_groups) > 0
+        p = np.where(group_negated, p * -0.5, p)
+
+        group_doc = doc[L]
+        totals = np.bincount(group_doc, weights=p, minlength=n_docs)
+        counts = np.bincount(group_doc, minlength=n_docs)
+        return np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
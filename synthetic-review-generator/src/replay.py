@@ -0,0 +1,172 @@
+"""Record/replay layer for provider calls"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+def fingerprint(provider, model, prompt, temperature=None, seed=None):
+    """Stable key for a provider request"""
+    payload = json.dumps([provider, model, prompt, temperature, seed], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ReplayMiss(Exception):
+    """No recorded response for a request in replay mode"""
+
+
+class ReplayStore:
+    """Append-only JSONL of recorded responses, indexed in memory.
+
+    Each line is {"k": fingerprint, "p": provider, "m": model,
+    "t": latency_sec, "r": response}. A truncated last line (crash while
+    recording) is skipped on load. The same request sampled several times
+    (e.g. one persona/rating prompt) keeps every response, in order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.records = {}
+        self.by_model = defaultdict(list)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._index(record)
+
+    def _index(self, record):
+        self.records.setdefault(record["k"], []).append(record)
+        self.by_model[(record["p"], record["m"])].append(record)
+
+    def get(self, key, n=0):
+        """The n-th recorded response for a request (cycling)"""
+        with self.lock:
+            records = self.records.get(key)
+            return records[n % len(records)] if records else None
+
+    def any_for(self, provider, model, n):
+        """The n-th recorded response for a provider/model (cycling)"""
+        with self.lock:
+            records = self.by_model.get((provider, model))
+            return records[n % len(records)] if records else None
+
+    def append(self, key, provider, model, latency, response):
+        record = {"k": key, "p": provider, "m": model, "t": round(latency, 3), "r": response}
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._index(record)
+
+    def __len__(self):
+        return sum(len(records) for records in self.records.values())
+
+
+class ReplayLayer:
+    """Wraps provider calls according to `replay.mode`:
+
+    - "off": call the provider
+    - "record": call the provider and append the response to the store
+    - "replay": serve the stored response, sleeping for the recorded latency
+      (times `latency_scale`) when `simulate_latency` is on. On a miss,
+      `on_miss` decides: "error" (the default) raises ReplayMiss, "live"
+      calls and records, "any" serves another recorded response of the
+      same model (opt-in: keeps offline runs going when prompts differ,
+      e.g. concurrent runs, but the run is no longer a faithful replay).
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.settings = settings
+        self.mode = settings.get("mode", "off")
+        self.simulate_latency = settings.get("simulate_latency", False)
+        self.latency_scale = settings.get("latency_scale", 1.0)
+        self.on_miss = settings.get("on_miss", "error")
+        self.store = None
+        if self.mode != "off":
+            self.store = ReplayStore(settings.get("path", "data/cache/replay.jsonl"))
+
+        self.lock = threading.Lock()
+        self.counts = {"live": 0, "recorded": 0, "hits": 0, "misses": 0}
+        self.occurrences = defaultdict(int)
+
+    @property
+    def offline(self):
+        return self.mode == "replay" and self.on_miss != "live"
+
+    def _count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+            return self.counts[name]
+
+    def _record(self, key, provider, model, request):
+        start = time.monotonic()
+        response = request()
+        self.store.append(key, provider, model, time.monotonic() - start, response)
+        self._count("recorded")
+        return response
+
+    def call(self, provider, model, prompt, temperature, seed, request):
+        """`request()` makes the live call and returns the response text"""
+        if self.mode == "off":
+            self._count("live")
+            return request()
+
+        key = fingerprint(provider, model, prompt, temperature, seed)
+        if self.mode == "record":
+            return self._record(key, provider, model, request)
+
+        with self.lock:
+            n = self.occurrences[key]
+            self.occurrences[key] += 1
+
+        record = self.store.get(key, n)
+        if record is not None:
+            self._count("hits")
+        else:
+            misses = self._count("misses")
+            if self.on_miss == "live":
+                return self._record(key, provider, model, request)
+            if self.on_miss == "any":
+                record = self.store.any_for(provider, model, misses)
+            if record is None:
+                raise ReplayMiss(f"No recorded response for {provider}/{model} ({key})")
+
+        if self.simulate_latency:
+            time.sleep(record["t"] * self.latency_scale)
+        return record["r"]
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+        return {
+            "mode": self.mode,
+            "stored": len(self.store) if self.store else 0,
+            **counts,
+        }
+
+
+_replay = None
+_replay_lock = threading.Lock()
+
+
+def get_replay(config=None):
+    """Process-wide replay layer; `config` applies its `replay:` section"""
+    global _replay
+    with _replay_lock:
+        settings = config.get("replay", {}) if config is not None else None
+        if _replay is None or (settings is not None and settings != _replay.settings):
+            _replay = ReplayLayer(settings)
+        return _replay
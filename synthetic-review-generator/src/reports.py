@@ -1,11 +1,13 @@
 """Report generation utilities"""
 
-import csv
 import json
 import os
 from collections import Counter
 from datetime import datetime
 
+from attempt_log import iter_attempt_rows
+from file_manager import load_reviews
+from timing import stage_summary
 from visualizations import (
     generate_all_charts,
     rating_distribution,
@@ -43,32 +45,31 @@ def _analyze_model_performance(csv_path):
     """Analyze performance metrics per model"""
     model_stats = {}
     
-    with open(csv_path, newline="") as f:
-        for row in csv.DictReader(f):
-            model = row.get("model", "unknown")
-            if model == "error":
-                continue
-                
-            if model not in model_stats:
-                model_stats[model] = {
-                    "total_attempts": 0,
-                    "passed": 0,
-                    "failed": 0,
-                    "generation_times": [],
-                    "ratings": [],
-                    "word_counts": []
-                }
+    for row in iter_attempt_rows(csv_path):
+        model = row.get("model", "unknown")
+        if model == "error":
+            continue
             
-            stats = model_stats[model]
-            stats["total_attempts"] += 1
-            
-            if row["passed"].lower() == "true":
-                stats["passed"] += 1
-                stats["generation_times"].append(float(row["generation_time_sec"]))
-                stats["ratings"].append(float(row["rating"]))
-                stats["word_counts"].append(int(row["word_count"]))
-            else:
-                stats["failed"] += 1
+        if model not in model_stats:
+            model_stats[model] = {
+                "total_attempts": 0,
+                "passed": 0,
+                "failed": 0,
+                "generation_times": [],
+                "ratings": [],
+                "word_counts": []
+            }
+        
+        stats = model_stats[model]
+        stats["total_attempts"] += 1
+        
+        if row["passed"].lower() == "true":
+            stats["passed"] += 1
+            stats["generation_times"].append(float(row["generation_time_sec"]))
+            stats["ratings"].append(float(row["rating"]))
+            stats["word_counts"].append(int(row["word_count"]))
+        else:
+            stats["failed"] += 1
     
     # Calculate summary metrics
     for model, stats in model_stats.items():
@@ -94,18 +95,17 @@ def generate_quality_report(
     failed_metrics = {}
     review_ids = set()
 
-    with open(csv_path, newline="") as f:
-        for row in csv.DictReader(f):
-            attempts += 1
-            review_ids.add(int(row["review_index"]))
+    for row in iter_attempt_rows(csv_path):
+        attempts += 1
+        review_ids.add(int(row["review_index"]))
 
-            if row["passed"].lower() == "true":
-                passed += 1
-                ratings.append(float(row["rating"]))
-                word_counts.append(int(row["word_count"]))
-            else:
-                metric = row.get("failed_metric", "unknown")
-                failed_metrics[metric] = failed_metrics.get(metric, 0) + 1
+        if row["passed"].lower() == "true":
+            passed += 1
+            ratings.append(float(row["rating"]))
+            word_counts.append(int(row["word_count"]))
+        else:
+            metric = row.get("failed_metric", "unknown")
+            failed_metrics[metric] = failed_metrics.get(metric, 0) + 1
 
     total_reviews = len(review_ids)
     skipped = total_reviews - passed
@@ -168,6 +168,34 @@ def generate_quality_report(
                 "",
             ]
 
+    # Where the wall time goes, per pipeline stage
+    stages = stage_summary(iter_attempt_rows(csv_path))
+    if stages:
+        lines += [
+            "## Stage Timings",
+            "",
+            "| Stage | Spans | Total (s) | Share | Mean (ms) | p50 (ms) | p95 (ms) | Max (ms) |",
+            "|---|---|---|---|---|---|---|---|",
+        ]
+        lines += [
+            f"| {stage} | {s['count']} | {s['total_sec']} | {s['share'] * 100:.1f}% | "
+            f"{s['mean_ms']} | {s['p50_ms']} | {s['p95_ms']} | {s['max_ms']} |"
+            for stage, s in stages.items()
+        ]
+        buckets = list(next(iter(stages.values()))["histogram"])
+        lines += [
+            "",
+            "### Duration Histograms",
+            "",
+            "| Stage | " + " | ".join(buckets) + " |",
+            "|---|" + "---|" * len(buckets),
+        ]
+        lines += [
+            f"| {stage} | " + " | ".join(str(c) for c in s["histogram"].values()) + " |"
+            for stage, s in stages.items()
+        ]
+        lines.append("")
+
     # Charts
     if include_charts and synthetic_path and real_path:
         charts_dir = "reports/charts"
@@ -191,6 +219,8 @@ def generate_quality_report(
             "",
             f"![Failed Metrics]({_md_image(charts['failed_metrics'])})",
             "",
+            f"![Stage Timings]({_md_image(charts['stage_timings'])})",
+            "",
         ]
 
 
@@ -216,10 +246,8 @@ def generate_comparison_report(
 ):
     """Compare real vs synthetic reviews"""
 
-    with open(real_path) as f:
-        real = json.load(f)
-    with open(synthetic_path) as f:
-        synthetic = json.load(f)
+    real = load_reviews(real_path)
+    synthetic = load_reviews(synthetic_path)
 
     def analyze(reviews):
         ratings = [r["rating"] for r in reviews]
@@ -0,0 +1,390 @@
+"""Re-run the quality checks over a stored dataset without regenerating it"""
+
+import copy
+import csv
+import os
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from attempt_log import iter_attempt_rows
+from file_manager import LOG_TITLE_CHARS, ReviewStream, iter_reviews, jsonl_to_json
+from quality.analysis import AnalysisCache
+from quality.checker import FIXED_ORDER, QualityChecker
+from quality.diversity import DiversityMetric, SemanticMetric
+from quality.score_cache import ScoreCache
+
+VERDICT_COLUMNS = [
+    "index", "title", "model", "persona", "original", "rescored",
+    "failed_metric", "failed_metrics", "lower_bound_scores",
+] + [f"{name}_score" for name in FIXED_ORDER]
+
+# Newly rejected reviews listed in the markdown report
+MAX_LISTED = 50
+
+_checker = None
+
+
+def _worker_config(config):
+    """Config for worker checkers: the score cache is read-only (the parent
+    writes new scores) and realism needs no batcher thread"""
+    config = copy.deepcopy(config)
+    config.setdefault("score_cache", {})["read_only"] = True
+    config.setdefault("realism", {})["batch_size"] = 1
+    return config
+
+
+def _init_worker(config):
+    global _checker
+    _checker = QualityChecker(config)
+
+
+def _check_chunk(reviews, realism):
+    results = _checker.check_standalone(reviews, realism)
+    new_scores = _checker.score_cache.take_new() if _checker.score_cache else []
+    return results, new_scores
+
+
+def _chunks(reviews, size):
+    chunk = []
+    for review in reviews:
+        chunk.append(review)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def standalone_results(config, reviews, workers=1, chunk_size=200, realism="cached"):
+    """Yield (chunk, results) in input order, checking chunks in worker
+    processes; at most two chunks per worker are in flight. Workers only read
+    the score cache; the scores they compute are written here."""
+    if workers <= 1:
+        checker = QualityChecker(config)
+        try:
+            for chunk in _chunks(reviews, chunk_size):
+                yield chunk, checker.check_standalone(chunk, realism)
+        finally:
+            checker.close()
+        return
+
+    cache_cfg = config.get("score_cache", {})
+    cache = None
+    if cache_cfg.get("enabled", False):
+        cache = ScoreCache(
+            cache_cfg.get("path", "data/cache/scores.sqlite"),
+            cache_cfg.get("memory_items", 10000),
+            cache_cfg.get("commit_every", 100),
+        )
+
+    def collect(future):
+        results, new_scores = future.result()
+        if cache:
+            for score in new_scores:
+                cache.put(*score)
+        return results
+
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(_worker_config(config),)) as pool:
+            pending = deque()
+            for chunk in _chunks(reviews, chunk_size):
+                pending.append((chunk, pool.submit(_check_chunk, chunk, realism)))
+                if len(pending) >= 2 * workers:
+                    chunk, future = pending.popleft()
+                    yield chunk, collect(future)
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, collect(future)
+    finally:
+        if cache:
+            cache.close()
+
+
+def find_attempt_log(input_path):
+    """The generation log written by the run that produced a stored
+    dataset (logs/ next to reviews_models/, same timestamp), or None"""
+    match = re.search(r"\d{8}_\d{6}", os.path.basename(input_path))
+    if not match:
+        return None
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(input_path))), "logs")
+    for ext in (".csv", ".npy"):
+        path = os.path.join(logs_dir, f"generation_log_{match.group()}{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _verdict_key(title, rating, model):
+    try:
+        rating = float(rating)
+    except (TypeError, ValueError):
+        pass
+    return title[:LOG_TITLE_CHARS], rating, model
+
+
+class OriginalVerdicts:
+    """Verdicts of the original run, read from its attempt log (CSV or .npy
+    sidecar) and matched to reviews by title, rating and model"""
+
+    def __init__(self, path):
+        self.path = path
+        self.attempts = 0
+        self.accepted = Counter()
+        self.rejected = Counter()
+        # First failed metric of every rejected attempt in the original run
+        self.rejections = Counter()
+
+        for row in iter_attempt_rows(path):
+            self.attempts += 1
+            key = _verdict_key(row["title"], row["rating"], row["model"])
+            if row["passed"] == "True":
+                self.accepted[key] += 1
+            else:
+                self.rejected[key] += 1
+                self.rejections[row["failed_metric"] or "unknown"] += 1
+
+    def verdict(self, review):
+        """'accepted', 'rejected' or 'unknown' (not in the log); each logged
+        attempt matches one review"""
+        key = _verdict_key(review.get("title", ""), review.get("rating"), review.get("model", ""))
+        for verdict, counts in (("accepted", self.accepted), ("rejected", self.rejected)):
+            if counts[key] > 0:
+                counts[key] -= 1
+                return verdict
+        return "unknown"
+
+
+def _distribution(values):
+    d = np.asarray([v for v in values if v is not None], dtype=float)
+    if not len(d):
+        return None
+    return {
+        "count": len(d),
+        "mean": round(float(d.mean()), 3),
+        "p5": round(float(np.percentile(d, 5)), 3),
+        "p50": round(float(np.percentile(d, 50)), 3),
+        "p95": round(float(np.percentile(d, 95)), 3),
+        "min": round(float(d.min()), 3),
+        "max": round(float(d.max()), 3),
+    }
+
+
+def rescore(input_path, config, workers=None, chunk_size=200, realism="cached",
+            attempts_path=None, output_dir="data/synthetic", report_dir="reports", log=print):
+    """Re-check every stored review with the current config.
+
+    Reviews are read and written as a stream. The metrics that look at one
+    review at a time run in worker processes; diversity and semantic run
+    here, in file order, against the reviews accepted so far, which is the
+    order the original run accepted them in.
+
+    Original verdicts come from the run's attempt log (`attempts_path`, by
+    default the generation log found next to the input); without one,
+    every input review is taken as accepted originally. The diff lists the
+    reviews whose verdict changed.
+    """
+    workers = workers or os.cpu_count() or 1
+    attempts_path = attempts_path or find_attempt_log(input_path)
+    originals = OriginalVerdicts(attempts_path) if attempts_path else None
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for directory in ("reviews", "reviews_models"):
+        os.makedirs(os.path.join(output_dir, directory), exist_ok=True)
+    os.makedirs(report_dir, exist_ok=True)
+
+    stream = ReviewStream(
+        f"{output_dir}/reviews_models/reviews_with_models_rescored_{timestamp}.jsonl",
+        f"{output_dir}/reviews/reviews_clean_rescored_{timestamp}.jsonl",
+        flush_every=200, fsync=False,
+    )
+    verdicts_path = f"{report_dir}/rescore_{timestamp}_verdicts.csv"
+    report_path = f"{report_dir}/rescore_{timestamp}.md"
+
+    analyses = AnalysisCache()
+    diversity = DiversityMetric(config, analyses)
+    semantic = SemanticMetric(config, analyses)
+    accepted = []
+    scores = {name: [] for name in FIXED_ORDER}
+    first_failed = Counter()
+    all_failed = Counter()
+    rejected = []
+    changes = Counter()
+    total = 0
+    start = time.perf_counter()
+
+    with open(verdicts_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(VERDICT_COLUMNS)
+
+        results = standalone_results(config, iter_reviews(input_path), workers, chunk_size, realism)
+        for chunk, checks in results:
+            for review, check in zip(chunk, checks):
+                analysis = analyses.get(review)
+                similarity = {
+                    "diversity": diversity.check(analysis, accepted),
+                    "semantic": semantic.check(analysis, accepted),
+                }
+                review_scores = {**check["scores"], **{k: r["score"] for k, r in similarity.items()}}
+                passed = {**check["passed"], **{k: r["passed"] for k, r in similarity.items()}}
+                failed = [name for name in FIXED_ORDER if not passed[name]]
+                lower_bounds = [k for k, r in similarity.items() if r.get("score_is_lower_bound")]
+                original = originals.verdict(review) if originals else "accepted"
+                verdict = "rejected" if failed else "accepted"
+                changes[original, verdict] += 1
+
+                if failed:
+                    first_failed[failed[0]] += 1
+                    all_failed.update(failed)
+                    if original != "rejected" and len(rejected) < MAX_LISTED:
+                        rejected.append((total, review, failed, review_scores[failed[0]]))
+                else:
+                    accepted.append(review)
+                    stream.append(review)
+
+                for name in FIXED_ORDER:
+                    scores[name].append(review_scores[name])
+                writer.writerow([
+                    total, review.get("title", ""), review.get("model", ""), review.get("persona", ""),
+                    original, verdict,
+                    failed[0] if failed else "", ";".join(failed), ";".join(lower_bounds),
+                ] + ["" if review_scores[name] is None else review_scores[name] for name in FIXED_ORDER])
+                total += 1
+
+            log(f"Rescored {total} reviews: {len(accepted)} accepted, {total - len(accepted)} rejected")
+
+    stream.close()
+    with_models_path = jsonl_to_json(stream.with_models_path, stream.with_models_path[:-1])
+    clean_path = jsonl_to_json(stream.clean_path, stream.clean_path[:-1])
+    os.remove(stream.with_models_path)
+    os.remove(stream.clean_path)
+
+    summary = {
+        "input": input_path,
+        "reviews": total,
+        "accepted": len(accepted),
+        "rejected": total - len(accepted),
+        "newly_rejected": changes["accepted", "rejected"] + changes["unknown", "rejected"],
+        "newly_accepted": changes["rejected", "accepted"],
+        "original": {
+            verdict: changes[verdict, "accepted"] + changes[verdict, "rejected"]
+            for verdict in ("accepted", "rejected", "unknown")
+        },
+        "attempts_path": attempts_path,
+        "original_rejections": dict(originals.rejections.most_common()) if originals else None,
+        "elapsed_sec": round(time.perf_counter() - start, 2),
+        "rejections": dict(first_failed.most_common()),
+        "failed_metrics": dict(all_failed.most_common()),
+        "scores": {name: _distribution(values) for name, values in scores.items()},
+        "with_models_path": with_models_path,
+        "clean_path": clean_path,
+        "verdicts_path": verdicts_path,
+        "report_path": report_path,
+    }
+    with open(report_path, "w") as f:
+        f.write(_report(summary, config, realism, rejected))
+    return summary
+
+
+def _report(summary, config, realism, rejected):
+    total = summary["reviews"]
+    rate = summary["accepted"] / total * 100 if total else 0
+    thresholds = {**config["quality_thresholds"], **{
+        f"review_length.{k}": v for k, v in config["review_length"].items()
+    }}
+
+    original = summary["original"]
+    if summary["attempts_path"]:
+        source = f"original verdicts from `{summary['attempts_path']}`"
+    else:
+        source = "no attempt log found; every review taken as accepted originally"
+
+    lines = [
+        "# Rescore Report",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"Input: `{summary['input']}` ({source})",
+        "",
+        "## Summary",
+        "",
+        f"- Reviews rescored: {total}",
+        f"- Originally accepted: {original['accepted']} "
+        f"(rejected: {original['rejected']}, not in log: {original['unknown']})",
+        f"- Accepted now: {summary['accepted']}",
+        f"- Newly rejected: {summary['newly_rejected']}",
+        f"- Newly accepted: {summary['newly_accepted']}",
+        f"- Acceptance rate: {rate:.1f}%",
+        f"- Realism: {realism}",
+        f"- Time: {summary['elapsed_sec']}s",
+        "",
+        "## Thresholds",
+        "",
+    ]
+    lines += [f"- {name}: {value}" for name, value in thresholds.items()]
+    lines.append("")
+
+    if summary["rejections"]:
+        lines += [
+            "## Rejections by Metric",
+            "",
+            "| Metric | First failure | Any failure |",
+            "|---|---|---|",
+        ]
+        lines += [
+            f"| {name} | {summary['rejections'].get(name, 0)} | {count} |"
+            for name, count in summary["failed_metrics"].items()
+        ]
+        lines.append("")
+
+    if summary["original_rejections"]:
+        lines += [
+            "## Original Run Rejections",
+            "",
+            "Attempts the original run rejected, by first failed metric "
+            "(their text is not stored, so they are not rescored).",
+            "",
+            "| Metric | Rejected attempts |",
+            "|---|---|",
+        ]
+        lines += [f"| {name} | {count} |" for name, count in summary["original_rejections"].items()]
+        lines.append("")
+
+    lines += [
+        "## Score Distributions",
+        "",
+        "| Metric | Scored | Mean | p5 | p50 | p95 | Min | Max |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    lines += [
+        f"| {name} | {d['count']} | {d['mean']} | {d['p5']} | {d['p50']} | {d['p95']} | {d['min']} | {d['max']} |"
+        for name, d in summary["scores"].items() if d
+    ]
+    lines.append("")
+
+    if rejected:
+        lines += [
+            f"## Newly Rejected Reviews (first {len(rejected)})",
+            "",
+            "| # | Title | Model | Failed metrics | Score |",
+            "|---|---|---|---|---|",
+        ]
+        lines += [
+            f"| {index} | {review.get('title', '').replace('|', '/')} | {review.get('model', '')} | "
+            f"{', '.join(failed)} | {score if not isinstance(score, float) else round(score, 3)} |"
+            for index, review, failed, score in rejected
+        ]
+        lines.append("")
+
+    lines += [
+        "## Outputs",
+        "",
+        f"- Filtered dataset: `{summary['with_models_path']}`",
+        f"- Clean reviews: `{summary['clean_path']}`",
+        f"- Per-review verdicts: `{summary['verdicts_path']}`",
+        "",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,76 @@
+"""Per-stage timing spans for generation attempts"""
+
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Same order as quality.checker.FIXED_ORDER
+METRIC_STAGES = ["length", "diversity", "semantic", "bias", "realism", "persona"]
+STAGES = ["prompt_build", "provider_call", "parse"] + [f"metric_{m}" for m in METRIC_STAGES]
+STAGE_COLUMNS = [f"{stage}_sec" for stage in STAGES]
+
+# Histogram bucket upper bounds in seconds (last bucket is open-ended)
+BUCKETS = [0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+
+class Spans:
+    """Durations of the stages of one attempt; repeated spans accumulate"""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage, elapsed):
+        self.durations[stage] = self.durations.get(stage, 0.0) + elapsed
+
+    def row(self):
+        """Values for STAGE_COLUMNS ("" for stages the attempt never reached)"""
+        return [
+            round(self.durations[stage], 6) if stage in self.durations else ""
+            for stage in STAGES
+        ]
+
+
+def _bucket_label(i):
+    fmt = lambda s: f"{s * 1000:g}ms" if s < 1 else f"{s:g}s"
+    if i == len(BUCKETS):
+        return f">= {fmt(BUCKETS[-1])}"
+    return f"< {fmt(BUCKETS[i])}"
+
+
+def stage_summary(rows):
+    """Per-stage count, total, share of time, percentiles and histogram
+    from attempt-log rows (string dicts)"""
+    samples = {stage: [] for stage in STAGES}
+    for row in rows:
+        for stage in STAGES:
+            value = row.get(f"{stage}_sec", "")
+            if value not in ("", "nan", None):
+                samples[stage].append(float(value))
+
+    total = sum(sum(values) for values in samples.values())
+    summary = {}
+    for stage, values in samples.items():
+        if not values:
+            continue
+        d = np.asarray(values)
+        counts = np.bincount(np.searchsorted(BUCKETS, d, side="right"), minlength=len(BUCKETS) + 1)
+        summary[stage] = {
+            "count": len(d),
+            "total_sec": round(float(d.sum()), 3),
+            "share": round(float(d.sum()) / total, 4) if total else 0.0,
+            "mean_ms": round(float(d.mean()) * 1000, 3),
+            "p50_ms": round(float(np.percentile(d, 50)) * 1000, 3),
+            "p95_ms": round(float(np.percentile(d, 95)) * 1000, 3),
+            "max_ms": round(float(d.max()) * 1000, 3),
+            "histogram": {_bucket_label(i): int(c) for i, c in enumerate(counts)},
+        }
+    return summary
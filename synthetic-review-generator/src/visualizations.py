@@ -2,13 +2,16 @@
 
 import os
 import json
-import csv
 from datetime import datetime
 
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from attempt_log import iter_attempt_rows
+from file_manager import load_reviews
+from timing import STAGES
+
 sns.set_style("whitegrid")
 plt.rcParams["figure.figsize"] = (10, 6)
 
@@ -27,8 +30,7 @@ def _save(fig, path):
 
 
 def _load_csv(csv_path):
-    with open(csv_path) as f:
-        rows = list(csv.DictReader(f))
+    rows = list(iter_attempt_rows(csv_path))
 
     for r in rows:
         r["review_index"] = int(r["review_index"])
@@ -37,7 +39,13 @@ def _load_csv(csv_path):
         r["word_count"] = int(r["word_count"])
         r["passed"] = r["passed"].lower() == "true"
         r["generation_time_sec"] = float(r["generation_time_sec"])
-    return pd.DataFrame(rows)
+    df = pd.DataFrame(rows)
+
+    for stage in STAGES:
+        column = f"{stage}_sec"
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df
 
 
 # ---------- charts ----------
@@ -112,16 +120,37 @@ def failed_metrics(df, out_dir, ts):
     return _save(fig, path)
 
 
+def stage_timings(df, out_dir, ts):
+    path = os.path.join(out_dir, f"stage_timings_{ts}.png")
+
+    columns = [f"{stage}_sec" for stage in STAGES if f"{stage}_sec" in df and df[f"{stage}_sec"].notna().any()]
+    if not columns:
+        fig, ax = plt.subplots()
+        ax.text(0.5, 0.5, "No Stage Timings", ha="center", va="center")
+        ax.axis("off")
+        return _save(fig, path)
+
+    stages = df[columns].rename(columns=lambda c: c[: -len("_sec")])
+    fig, axes = plt.subplots(1, 2, figsize=(15, 5))
+
+    stages.sum().sort_values().plot.barh(ax=axes[0], title="Total Time per Stage (s)")
+
+    melted = stages.melt(var_name="stage", value_name="seconds").dropna()
+    melted = melted[melted.seconds > 0]
+    sns.boxplot(data=melted, x="seconds", y="stage", ax=axes[1])
+    axes[1].set(title="Stage Durations", xscale="log", xlabel="Seconds (log)", ylabel="")
+
+    return _save(fig, path)
+
+
 # ---------- public API ----------
 
 def generate_all_charts(csv_path, synthetic_path, real_path, output_dir):
     os.makedirs(output_dir, exist_ok=True)
     ts = _ts()
 
-    with open(real_path) as f:
-        real = json.load(f)
-    with open(synthetic_path) as f:
-        synth = json.load(f)
+    real = load_reviews(real_path)
+    synth = load_reviews(synthetic_path)
 
     df = _load_csv(csv_path)
 
@@ -130,4 +159,5 @@ def generate_all_charts(csv_path, synthetic_path, real_path, output_dir):
         "generation_attempts": generation_attempts(df, output_dir, ts),
         "model_performance": model_performance(df, output_dir, ts),
         "failed_metrics": failed_metrics(df, output_dir, ts),
+        "stage_timings": stage_timings(df, output_dir, ts),
     }
@@ -0,0 +1,51 @@
+import copy
+import json
+import os
+import sys
+
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+DATASET = os.path.join(ROOT, "data/synthetic/reviews_models/reviews_with_models_20260113_230413.json")
+
+with open(os.path.join(ROOT, "config/config.yaml")) as f:
+    _CONFIG = yaml.safe_load(f)
+
+with open(DATASET) as f:
+    _REVIEWS = json.load(f)
+
+
+@pytest.fixture
+def config():
+    """Repo config with the persistent score cache turned off"""
+    config = copy.deepcopy(_CONFIG)
+    config["score_cache"]["enabled"] = False
+    return config
+
+
+@pytest.fixture
+def reviews():
+    """The stored 500-review dataset (fresh copies per test)"""
+    return copy.deepcopy(_REVIEWS)
+
+
+@pytest.fixture
+def local_config(tmp_path, monkeypatch, config):
+    """Config generating with the local fake provider inside tmp_path"""
+    config["models"] = [{"provider": "local", "model": "local-reviewer", "weight": 1.0, "temperature": 0.8}]
+    config["realism"]["provider"] = "local"
+    config["providers"]["local"].update({
+        "latency": {"distribution": "fixed", "median_ms": 1},
+        "real_reviews_path": os.path.join(ROOT, "data/raw/real_reviews.json"),
+        "seed": 3,
+    })
+    config["output"].update({"format": "jsonl", "flush_every": 3})
+    config["checkpointing"] = {"enabled": True, "interval": 5}
+    config["output"]["checkpoint_dir"] = str(tmp_path / "checkpoints")
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    monkeypatch.chdir(tmp_path)
+    return str(path)
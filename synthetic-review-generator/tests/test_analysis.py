@@ -0,0 +1,79 @@
+from quality.analysis import AnalysisCache
+from quality.checker import QualityChecker
+from quality.diversity import DiversityMetric, SemanticMetric
+
+
+def test_candidates_are_bounded_by_the_lru(reviews):
+    cache = AnalysisCache(max_size=10)
+    for r in reviews[:50]:
+        cache.get(r)
+    assert cache.stats() == {"cached": 10, "pinned": 0}
+
+
+def test_indexed_reviews_stay_pinned_past_the_lru_bound(config, reviews):
+    cache = AnalysisCache(max_size=10)
+    diversity = DiversityMetric(config, cache)
+    semantic = SemanticMetric(config, cache)
+    probe = cache.get(reviews[-1])
+    checked = [cache.get(r) for r in reviews[:300]]  # only the last 10 still cached
+
+    diversity.check(probe, reviews[:300])
+    semantic.check(probe, reviews[:300])
+    assert cache.stats()["pinned"] == 300
+
+    # Accepted reviews keep their record: no re-analysis, even after eviction
+    for r in reviews[300:400]:
+        cache.get(r)
+    assert all(cache.get(r) is a for r, a in zip(reviews[290:300], checked[290:]))
+    first = cache.get(reviews[0])
+    assert cache.get(reviews[0]) is first
+
+
+def test_pins_are_released_when_an_index_moves_on(config, reviews):
+    cache = AnalysisCache(max_size=10)
+    diversity = DiversityMetric(config, cache)
+    semantic = SemanticMetric(config, cache)
+    probe = cache.get(reviews[-1])
+    for metric in (diversity, semantic):
+        metric.check(probe, reviews[:100])
+
+    diversity.check(probe, reviews[200:220])
+    assert cache.stats()["pinned"] == 120  # semantic still holds the first 100
+    semantic.check(probe, reviews[200:220])
+    assert cache.stats()["pinned"] == 20
+
+
+def test_checker_reuses_the_accepted_record(config, reviews):
+    checker = QualityChecker(config)
+    existing = []
+    for r in reviews[:20]:
+        analysis = checker.analyze(r)
+        checker.diversity.check(analysis, existing)
+        existing.append(r)
+    checker.diversity.check(checker.analyze(reviews[20]), existing)
+    assert all(checker.analyze(r) is checker.analyses.pin(r) for r in existing)
+
+
+def test_warm_fills_the_lazy_fields(reviews):
+    analysis = AnalysisCache().get(reviews[0]).warm()
+    assert {"sentiment", "terms"} <= set(vars(analysis))
+
+
+def test_snapshot_restores_an_index_without_reindexing(config, reviews):
+    cache = AnalysisCache(max_size=10)
+    diversity = DiversityMetric(config, cache)
+    corpus = list(reviews[:50])
+    diversity.extend(corpus)
+    corpus.extend(reviews[50:60])  # not indexed yet when the snapshot is taken
+    snapshot = diversity.snapshot(corpus)
+    assert diversity.snapshot(list(corpus)) is None
+
+    restored = DiversityMetric(config, AnalysisCache(max_size=10))
+    restored.restore(snapshot, corpus)
+    assert len(restored.index) == 50
+    assert restored.analyses.stats()["pinned"] == 50
+
+    restored.extend(corpus)
+    assert len(restored.index) == 60
+    probe = cache.get(reviews[-1])
+    assert restored.check(probe, corpus) == diversity.check(probe, corpus)
@@ -0,0 +1,70 @@
+import csv
+
+import pytest
+
+from attempt_log import AttemptLogWriter, iter_attempt_rows
+
+COLUMNS = ["timestamp", "review_index", "attempt", "passed"]
+
+
+def _rows(n, start=0):
+    return [["2026-01-01T00:00:00", i, 1, i % 2 == 0] for i in range(start, start + n)]
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_rows_reach_csv_and_sidecar(tmp_path, background):
+    csv_path, npy_path = str(tmp_path / "log.csv"), str(tmp_path / "log.npy")
+    writer = AttemptLogWriter(csv_path, COLUMNS, npy_path, batch_size=7, background=background)
+    for row in _rows(20):
+        writer.write(row)
+    writer.flush()
+    assert writer.rows_written == 20
+    writer.close()
+
+    with open(csv_path, newline="") as f:
+        assert [r[1] for r in csv.reader(f)] == [str(i) for i in range(20)]
+    sidecar = list(iter_attempt_rows(npy_path))
+    assert [r["review_index"] for r in sidecar] == [str(i) for i in range(20)]
+    assert [r["passed"] for r in sidecar[:2]] == ["True", "False"]
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_write_error_is_reported_once_and_raised_on_close(tmp_path, capsys, background):
+    writer = AttemptLogWriter(str(tmp_path / "log.csv"), COLUMNS, batch_size=5, background=background)
+    for row in _rows(5):
+        writer.write(row)
+    writer.flush()
+
+    def disk_full(rows):
+        raise OSError(28, "No space left on device")
+
+    writer._write_batch = disk_full
+    for row in _rows(12, start=5):
+        writer.write(row)  # never raises
+    writer.flush()
+
+    assert writer.rows_written == 5
+    assert writer.dropped == 12
+    assert capsys.readouterr().err.count("dropping further rows") == 1
+    with pytest.raises(OSError):
+        writer.close()
+    writer.close()  # the exit hook does not raise it again
+
+
+def test_close_unregisters_and_later_rows_are_written(tmp_path, monkeypatch):
+    import atexit
+
+    unregistered = []
+    unregister = atexit.unregister
+    monkeypatch.setattr(atexit, "unregister", lambda f: (unregistered.append(f), unregister(f)))
+    csv_path = str(tmp_path / "log.csv")
+    writer = AttemptLogWriter(csv_path, COLUMNS, batch_size=100)
+    for row in _rows(3):
+        writer.write(row)
+    writer.close()
+    assert unregistered == [writer.close]
+
+    writer.write(_rows(1, start=3)[0])
+    assert writer.rows_written == 4
+    with open(csv_path, newline="") as f:
+        assert [r[1] for r in csv.reader(f)] == ["0", "1", "2", "3"]
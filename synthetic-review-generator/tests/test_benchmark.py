@@ -0,0 +1,37 @@
+import copy
+import os
+
+from benchmark import compare, run_benchmark
+from conftest import ROOT
+from quality.checker import FIXED_ORDER
+
+
+def test_small_run_reports_every_stage(config):
+    results = run_benchmark(
+        config, sizes=[60, 30], candidates=10,
+        raw_dir=os.path.join(ROOT, "data/raw"),
+        synthetic_dir=os.path.join(ROOT, "data/synthetic"),
+        log=lambda line: None,
+    )
+    assert results["meta"]["sizes"] == [30, 60]
+    for size in ("30", "60"):
+        result = results["results"][size]
+        assert result["corpus_size"] == int(size)
+        assert set(result["metrics"]) == {"analysis", *FIXED_ORDER}
+        assert result["check_all"]["p50_ms"] > 0
+
+
+def _result(p50, p99):
+    stats = {"p50_ms": p50, "p99_ms": p99}
+    return {"results": {"1000": {"metrics": {"length": dict(stats)}, "check_all": dict(stats)}}}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = _result(1.0, 2.0)
+    assert compare(copy.deepcopy(baseline), baseline) == []
+    assert compare(_result(1.1, 2.2), baseline) == []            # within tolerance
+    assert compare(_result(0.001, 0.002), _result(0.0005, 0.001)) == []  # timer jitter
+
+    regressions = compare(_result(1.5, 2.0), baseline)
+    assert {(r["stage"], r["field"]) for r in regressions} == {("length", "p50_ms"), ("check_all", "p50_ms")}
+    assert all(r["change"] == 0.5 for r in regressions)
@@ -0,0 +1,88 @@
+import copy
+import random
+
+import pytest
+
+from quality.checker import QualityChecker
+
+FILLER = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike "
+    "november oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee "
+    "zulu amber cobalt ember onyx"
+).split()
+
+
+@pytest.fixture
+def checker(config):
+    config["realism"]["batch_size"] = 1
+    checker = QualityChecker(config)
+    checker.realism._score_one = lambda text: 3.0 if len(text) % 7 == 0 else 8.0
+    checker.realism._score_batch = lambda texts: [checker.realism._score_one(t) for t in texts]
+    yield checker
+    checker.close()
+
+
+def candidates(reviews, count, seed=0):
+    """Stored reviews with a few words swapped, so many are near-duplicates"""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        review = copy.deepcopy(rng.choice(reviews))
+        words = review["review_text"].split()
+        for _ in range(rng.randint(0, 6)):
+            words[rng.randrange(len(words))] = rng.choice(["great", "slow", "nice", "tool"])
+        review["review_text"] = " ".join(words)
+        result.append(review)
+    return result
+
+
+def sequential(checker, batch, corpus):
+    """Verdicts from checking the batch one review at a time"""
+    existing = list(corpus)
+    verdicts = []
+    for review in batch:
+        verdicts.append(checker.check_all(review, existing))
+        if verdicts[-1]["passed"]:
+            existing.append(review)
+    return verdicts
+
+
+@pytest.mark.parametrize("corpus_size", [0, 300])
+def test_batch_matches_one_at_a_time(checker, reviews, corpus_size):
+    corpus = reviews[:corpus_size]
+    batch = candidates(reviews[300:], 400)
+    verdicts = checker.check_batch(batch, corpus)
+    expected = sequential(checker, batch, corpus)
+
+    assert [v["passed"] for v in verdicts] == [v["passed"] for v in expected]
+    assert sum(v["passed"] for v in verdicts) > 0
+    assert any("batch_duplicate" in v["failed_metrics"] for v in verdicts)
+
+
+def test_scores_match_single_metric_checks(checker, reviews):
+    corpus = reviews[:300]
+    batch = reviews[300:400]
+    verdicts = checker.check_batch(batch, corpus, realism=False)
+    for review, verdict in zip(batch, verdicts):
+        analysis = checker.analyze(review)
+        for name in ("length", "diversity", "semantic", "bias", "persona"):
+            single = checker._run_metric(name, review, analysis, corpus)
+            assert verdict["scores"][name] == pytest.approx(float(single["score"]))
+            assert (name in verdict["failed_metrics"]) == (not single["passed"])
+
+
+def test_semantic_duplicates_within_the_batch(checker, reviews):
+    original = reviews[400]
+    # Same terms twice plus filler: Jaccard stays under the threshold, TF-IDF does not
+    copied = copy.deepcopy(original)
+    copied["review_text"] = " ".join([original["review_text"]] * 2 + FILLER)
+    corpus = reviews[:300]
+
+    first, second = checker.check_batch([original, copied], corpus, realism=False)
+    assert first["passed"]
+    assert second["failed_metrics"] == ["batch_semantic"]
+    assert second["scores"]["batch_similarity"] <= checker.diversity.max_jaccard
+    assert second["duplicate_of"] == 0
+
+    assert checker.check_all(copied, corpus + [original])["failed_metric"] == "semantic"
+    assert checker.check_batch([copied], corpus, realism=False)[0]["passed"]
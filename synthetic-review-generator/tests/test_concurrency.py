@@ -0,0 +1,183 @@
+import random
+import threading
+import types
+
+import pytest
+
+import generator as generator_module
+from concurrency import AIMDController
+from generator import ReviewGenerator
+from providers import ClientRegistry, RateLimited
+
+CONTROL = {
+    "enabled": True,
+    "initial_window": 4,
+    "min_window": 1,
+    "max_window": 8,
+    "additive_increase": 1,
+    "multiplicative_decrease": 0.5,
+    "latency_target_sec": 1,
+}
+
+
+def _complete(controller, n, latency=0.1):
+    for _ in range(n):
+        controller.acquire("openai")
+        controller.on_success("openai", latency)
+
+
+def test_window_grows_additively_and_halves_on_rate_limit():
+    controller = AIMDController(CONTROL)
+    _complete(controller, 4)
+    window = controller.stats()["openai"]["window"]
+    assert 4.9 < window < 5.0
+
+    controller.acquire("openai")
+    controller.on_rate_limit("openai", retry_after=None)
+    assert controller.stats()["openai"]["window"] == round(window / 2, 2)
+
+    for _ in range(5):
+        controller.acquire("openai")
+        controller.on_rate_limit("openai")
+    assert controller.stats()["openai"]["window"] == 1
+
+
+def test_slow_responses_do_not_grow_the_window():
+    controller = AIMDController(CONTROL)
+    _complete(controller, 10, latency=5)
+    assert controller.stats()["openai"]["window"] == 4
+
+
+def test_window_is_capped():
+    controller = AIMDController(CONTROL)
+    _complete(controller, 500)
+    assert controller.stats()["openai"]["window"] == 8
+
+
+def test_retry_after_blocks_new_requests():
+    controller = AIMDController(CONTROL)
+    controller.acquire("openai")
+    controller.on_rate_limit("openai", retry_after=0.3)
+    assert controller.stats()["openai"]["blocked_for_sec"] > 0.2
+
+    acquired = threading.Event()
+    threading.Thread(target=lambda: (controller.acquire("openai"), acquired.set())).start()
+    assert not acquired.wait(0.1)
+    assert acquired.wait(1)
+
+
+def test_reconfiguring_keeps_the_controller_and_its_windows():
+    registry = ClientRegistry()
+    registry.configure({}, CONTROL)
+    controller = registry.controller
+    _complete(controller, 4)
+    controller.acquire("openai")  # still in flight
+
+    registry.configure({}, {**CONTROL, "max_window": 2})
+    assert registry.controller is controller
+    assert controller.stats()["openai"]["window"] == 2
+    assert controller.stats()["openai"]["in_flight"] == 1
+
+    registry.configure({}, {"enabled": False})
+    assert registry.controller is None
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays, recorded instead of slept"""
+    delays = []
+    monkeypatch.setattr(generator_module.time, "sleep", delays.append)
+    return delays
+
+
+class _LimitedQuality:
+    """check_all that is rate limited `limited` times before passing"""
+
+    def __init__(self, limited, retry_after=None):
+        self.limited = limited
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def check_all(self, review, existing_reviews, spans=None):
+        self.calls += 1
+        if self.calls <= self.limited:
+            raise RateLimited("openai", self.retry_after)
+        return {"passed": True, "scores": {}}
+
+    def analyze(self, review):
+        return types.SimpleNamespace(word_count=len(review["review_text"].split()))
+
+
+def _generator(config, limited, retry_after=None):
+    generator = ReviewGenerator.__new__(ReviewGenerator)
+    generator.config = config
+    generator.random = random.Random(0)
+    generator.jitter = random.Random(0)
+    generator.quality = _LimitedQuality(limited, retry_after)
+    generator._accept_lock = threading.Lock()
+    generator.generated = 0
+
+    def generate_one_raw(force_bad=False, spans=None):
+        generator.generated += 1
+        return {"review_text": "a fine review", "rating": 4.0, "model": "openai/m", "title": "t"}
+
+    generator.generate_one_raw = generate_one_raw
+    return generator
+
+
+def test_rate_limited_check_keeps_the_generated_review(config, sleeps):
+    generator = _generator(config, limited=3)
+    rows = []
+    accepted = []
+    review = generator.generate_one_with_quality(accepted, 0, lambda *row: rows.append(row), True)
+
+    assert review is not None and accepted == [review]
+    assert generator.generated == 1
+    assert generator.quality.calls == 4
+    assert len(rows) == 1 and rows[0][3] is True
+
+
+def test_check_that_stays_rate_limited_uses_up_one_attempt(config, sleeps):
+    limit = config["concurrency_control"]["max_rate_limit_retries"]
+    generator = _generator(config, limited=limit + 1)
+    rows = []
+    review = generator.generate_one_with_quality([], 0, lambda *row: rows.append(row))
+
+    assert review is not None
+    assert generator.generated == 2
+    assert [(row[1], row[3], row[4]) for row in rows] == [(1, False, "rate_limited"), (2, True, "")]
+
+
+def test_rate_limits_back_off_exponentially_with_jitter(config, sleeps):
+    control = config["concurrency_control"]
+    generator = _generator(config, limited=6)
+    generator.generate_one_with_quality([], 0, lambda *row: None)
+
+    assert len(sleeps) == 6
+    for retries, delay in enumerate(sleeps):
+        ceiling = min(control["backoff_max_sec"], control["backoff_base_sec"] * 2 ** retries)
+        assert ceiling / 2 <= delay <= ceiling
+    assert sleeps[-1] > sleeps[0]
+
+
+def test_retry_after_takes_precedence(config, sleeps):
+    generator = _generator(config, limited=2, retry_after=3.0)
+    generator.generate_one_with_quality([], 0, lambda *row: None)
+    assert sleeps == [3.0, 3.0]
+
+
+def test_rate_limited_generation_backs_off(config, sleeps):
+    generator = _generator(config, limited=0)
+    calls = []
+
+    def generate_one_raw(force_bad=False, spans=None):
+        calls.append(1)
+        if len(calls) <= 2:
+            raise RateLimited("openai")
+        return {"review_text": "a fine review", "rating": 4.0, "model": "openai/m", "title": "t"}
+
+    generator.generate_one_raw = generate_one_raw
+    rows = []
+    assert generator.generate_one_with_quality([], 0, lambda *row: rows.append(row)) is not None
+    assert 0.25 <= sleeps[0] <= 0.5 and 0.5 <= sleeps[1] <= 1.0
+    assert [row[1] for row in rows] == [1]
@@ -0,0 +1,141 @@
+import threading
+import types
+
+import pytest
+
+from quality.checker import QualityChecker
+from quality.corpus import CorpusBudgetExceeded, CorpusNotFound, CorpusStore, footprint
+
+
+@pytest.fixture
+def checker(config):
+    config["realism"]["batch_size"] = 1
+    checker = QualityChecker(config)
+    checker.realism._score_one = lambda text: 8.0
+    yield checker
+    checker.close()
+
+
+def test_corpus_checks_match_list_checks(config, checker, reviews):
+    corpus = CorpusStore(config).create(reviews[:300])
+    for review in reviews[300:340]:
+        assert checker.check_corpus(review, corpus) == checker.check_all(review, reviews[:300])
+
+
+def test_added_reviews_extend_the_indexes(config, reviews):
+    store = CorpusStore(config)
+    corpus = store.create(reviews[:100], "c1")
+    diversity, semantic = corpus.diversity.index, corpus.semantic.index
+
+    store.add("c1", reviews[100:150])
+    assert corpus.diversity.index is diversity and corpus.semantic.index is semantic
+    assert len(diversity) == len(semantic) == 150
+    assert corpus.to_dict()["reviews"] == 150
+
+
+def test_ids_are_claimed_once_even_when_racing(config, reviews):
+    store = CorpusStore(config)
+    barrier = threading.Barrier(4)
+    outcomes = []
+
+    def create():
+        barrier.wait()
+        try:
+            store.create(reviews[:50], "same")
+            outcomes.append("created")
+        except ValueError:
+            outcomes.append("exists")
+
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(outcomes) == ["created", "exists", "exists", "exists"]
+    assert store.stats()["corpora"] == 1
+
+
+def test_budget_and_validation(config, reviews):
+    config["corpora"] = {"max_memory_mb": footprint(reviews[:10]) / 1e6}
+    store = CorpusStore(config)
+    store.create(reviews[:10], "full")
+    with pytest.raises(CorpusBudgetExceeded):
+        store.add("full", reviews[10:11])
+    with pytest.raises(CorpusBudgetExceeded):
+        store.create([{"title": "no text"}])
+    with pytest.raises(CorpusNotFound):
+        store.add("missing", reviews[:1])
+
+
+def test_racing_adds_stay_within_the_budget(config, reviews):
+    config["corpora"] = {"max_memory_mb": footprint(reviews[:12]) / 1e6}
+    store = CorpusStore(config)
+    corpus = store.create(reviews[:10], "c1")
+    barrier = threading.Barrier(4)
+    outcomes = []
+
+    def add(review):
+        barrier.wait()
+        try:
+            store.add("c1", [review])
+            outcomes.append("added")
+        except CorpusBudgetExceeded:
+            outcomes.append("full")
+
+    threads = [threading.Thread(target=add, args=(r,)) for r in reviews[10:12] * 2]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(outcomes) == ["added", "added", "full", "full"]
+    assert corpus.approx_bytes <= store.max_bytes
+
+
+def test_least_recently_used_corpora_are_evicted(config, reviews):
+    config["corpora"] = {"max_corpora": 2}
+    store = CorpusStore(config)
+    for name in ("a", "b"):
+        store.create(reviews[:5], name)
+    store.get("a")
+    store.create(reviews[:5], "c")
+    assert sorted(c.id for c in store.list()) == ["a", "c"]
+    assert store.stats()["evicted"] == 1
+
+
+def test_add_if_passed_over_budget_is_a_bad_request(monkeypatch, config, checker, reviews):
+    import app
+
+    config["corpora"] = {"max_memory_mb": footprint(reviews[:20]) / 1e6}
+    store = CorpusStore(config)
+    store.create(reviews[:20], "full")
+    monkeypatch.setattr(app, "generator", types.SimpleNamespace(config=config, quality=checker))
+    monkeypatch.setattr(app, "corpus_store", store)
+    http = app.app.test_client()
+
+    review = next(r for r in reviews[20:] if checker.check_corpus(r, store.get("full"))["passed"])
+    response = http.post("/api/quality-check", json={
+        "review": review, "corpus_id": "full", "add_if_passed": True,
+    })
+    assert response.status_code == 400
+    assert "max_memory_mb" in response.get_json()["error"]
+
+    response = http.post("/api/quality-check", json={"review": review, "corpus_id": "gone"})
+    assert response.status_code == 404
+
+
+def test_other_value_errors_are_not_bad_requests(monkeypatch, config, reviews):
+    import app
+
+    store = CorpusStore(config)
+    store.create(reviews[:20], "c1")
+
+    def check_corpus(review, corpus):
+        raise ValueError("bug in a metric")
+
+    quality = types.SimpleNamespace(check_corpus=check_corpus)
+    monkeypatch.setattr(app, "generator", types.SimpleNamespace(config=config, quality=quality))
+    monkeypatch.setattr(app, "corpus_store", store)
+    response = app.app.test_client().post("/api/quality-check", json={
+        "review": reviews[20], "corpus_id": "c1",
+    })
+    assert response.status_code == 500
@@ -0,0 +1,40 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+
+RUN = "20260101_000000"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, reviews):
+    """API client in a tmp dir holding one JSONL run"""
+    import app
+
+    for directory in ("logs", "reviews", "reviews_models"):
+        (tmp_path / "data/synthetic" / directory).mkdir(parents=True)
+    shutil.copy(
+        os.path.join(ROOT, "data/synthetic/logs/generation_log_20260113_230413.csv"),
+        tmp_path / f"data/synthetic/logs/generation_log_{RUN}.csv",
+    )
+    lines = "".join(json.dumps(r) + "\n" for r in reviews[:50])
+    (tmp_path / f"data/synthetic/reviews/reviews_clean_{RUN}.jsonl").write_text(lines)
+    (tmp_path / f"data/synthetic/reviews_models/reviews_with_models_{RUN}.jsonl").write_text(lines)
+    (tmp_path / "data/synthetic/reviews/reviews_clean_old.json.bak").write_text("[]")
+    monkeypatch.chdir(tmp_path)
+    return app.app.test_client()
+
+
+def test_jsonl_runs_are_listed(client):
+    files = client.get("/api/files/list").get_json()["files"]
+    assert [f["name"] for f in files["synthetic_reviews"]] == [f"reviews_clean_{RUN}.jsonl"]
+    assert [f["name"] for f in files["synthetic_with_models"]] == [f"reviews_with_models_{RUN}.jsonl"]
+
+
+def test_quality_report_uses_the_runs_jsonl_reviews(client):
+    result = client.post("/api/reports/quality").get_json()
+    assert result["success"], result
+    assert result["synthetic_used"] == f"data/synthetic/reviews/reviews_clean_{RUN}.jsonl"
@@ -0,0 +1,114 @@
+import random
+import time
+import types
+from contextlib import contextmanager
+
+import pytest
+
+from api_client import APIClient
+from hedging import Hedger
+
+MODELS = [
+    {"provider": "openai", "model": "gpt-4o-mini", "weight": 0.5},
+    {"provider": "openai", "model": "gpt-3.5-turbo", "weight": 0.2},
+    {"provider": "anthropic", "model": "claude-sonnet-4-20250514", "weight": 0.3},
+]
+SETTINGS = {"percentile": 95, "window": 50, "min_samples": 5, "max_workers": 4}
+
+
+def _hedger(delays, failing=()):
+    """Hedger over a fake call that sleeps per model"""
+    calls = []
+
+    def call(provider, model, prompt, temperature):
+        calls.append(model)
+        time.sleep(delays[model])
+        if model in failing:
+            raise RuntimeError(f"{model} failed")
+        return f"{model}: {prompt}"
+
+    return Hedger(SETTINGS, MODELS, call), calls
+
+
+def _warm(hedger, model, latency=0.01):
+    for _ in range(SETTINGS["min_samples"]):
+        hedger._window(f"{model['provider']}/{model['model']}").add(latency)
+
+
+def test_no_hedging_until_the_model_has_samples():
+    hedger, calls = _hedger({"gpt-4o-mini": 0.05, "claude-sonnet-4-20250514": 0.0})
+    text, model = hedger.generate(MODELS[0], "p")
+    assert model is MODELS[0] and calls == ["gpt-4o-mini"]
+    assert hedger.threshold(MODELS[0]) is None
+
+
+def test_fast_primary_is_not_hedged():
+    hedger, calls = _hedger({"gpt-4o-mini": 0.0, "claude-sonnet-4-20250514": 0.0})
+    _warm(hedger, MODELS[0], latency=0.5)
+    text, model = hedger.generate(MODELS[0], "p")
+    assert model is MODELS[0] and calls == ["gpt-4o-mini"]
+    assert hedger.stats()["openai/gpt-4o-mini"]["hedged"] == 0
+
+
+def test_slow_primary_is_backed_up_by_another_provider():
+    hedger, calls = _hedger({"gpt-4o-mini": 0.5, "claude-sonnet-4-20250514": 0.0})
+    _warm(hedger, MODELS[0])
+    text, model = hedger.generate(MODELS[0], "p")
+
+    assert model is MODELS[2]
+    assert text == "claude-sonnet-4-20250514: p"
+    stats = hedger.stats()["openai/gpt-4o-mini"]
+    assert (stats["calls"], stats["hedged"], stats["backup_wins"]) == (1, 1, 1)
+
+    hedger.pool.shutdown(wait=True)
+    assert hedger.stats()["openai/gpt-4o-mini"]["latency_saved_sec"] > 0.3
+
+
+def test_failed_primary_falls_back_to_the_backup():
+    hedger, _ = _hedger({"gpt-4o-mini": 0.1, "claude-sonnet-4-20250514": 0.2}, failing={"gpt-4o-mini"})
+    _warm(hedger, MODELS[0])
+    assert hedger.generate(MODELS[0], "p")[1] is MODELS[2]
+
+
+def test_error_when_both_fail():
+    hedger, _ = _hedger(
+        {"gpt-4o-mini": 0.1, "claude-sonnet-4-20250514": 0.0},
+        failing={"gpt-4o-mini", "claude-sonnet-4-20250514"},
+    )
+    _warm(hedger, MODELS[0])
+    with pytest.raises(RuntimeError):
+        hedger.generate(MODELS[0], "p")
+
+
+def test_hosted_providers_keep_their_request_model():
+    sent = []
+
+    class Completions:
+        def create(self, **kwargs):
+            sent.append((kwargs["model"], kwargs["temperature"]))
+            message = types.SimpleNamespace(content="{}")
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    class Registry:
+        @contextmanager
+        def limit(self, provider, model):
+            yield
+
+        def client(self, provider):
+            return types.SimpleNamespace(chat=types.SimpleNamespace(completions=Completions()))
+
+    client = APIClient.__new__(APIClient)
+    client.registry = Registry()
+    client.seed = None
+    client._call("openai", "gpt-3.5-turbo", "p", 0.2)
+    client._call("local", "local-small", "p", 0.2)
+    assert sent == [("gpt-4o-mini", 0.8), ("local-small", 0.2)]
+
+
+def test_backup_choice_leaves_the_global_rng_alone():
+    hedger, _ = _hedger({})
+    state = random.getstate()
+    for _ in range(20):
+        assert hedger._backup_for(MODELS[0]) is MODELS[2]
+        hedger._backup_for(MODELS[2])
+    assert random.getstate() == state
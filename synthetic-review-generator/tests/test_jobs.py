@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+
+import yaml
+
+from generator import ReviewGenerator
+from jobs import RESULT_FIELDS, JobManager
+
+
+class FakeGenerator:
+    def __init__(self, fail=False, gate=None):
+        self.fail = fail
+        self.gate = gate
+        self.closed = False
+
+    def generate_all(self, count, concurrency, on_result, cancel, on_attempt):
+        if self.gate:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("provider down")
+        for i in range(count):
+            on_result(i, {"review_text": "ok"} if i % 2 == 0 else None)
+        return {**{field: None for field in RESULT_FIELDS}, "success_count": (count + 1) // 2, "cancelled": False}
+
+    def close(self):
+        self.closed = True
+
+
+def _run(manager, job):
+    manager.pool.shutdown(wait=True)
+    return manager.get(job.id)
+
+
+def test_job_reports_progress_and_closes_its_generator():
+    made = []
+    manager = JobManager(lambda run_id: made.append(FakeGenerator()) or made[-1], max_workers=1)
+    job = _run(manager, manager.submit(5))
+
+    state = job.to_dict()
+    assert (state["status"], state["accepted"], state["rejected"], state["progress"]) == ("completed", 3, 2, 1.0)
+    assert state["result"]["success_count"] == 3
+    assert made[0].closed and job.generator is None
+
+
+def test_failed_job_still_closes_its_generator():
+    made = []
+    manager = JobManager(lambda run_id: made.append(FakeGenerator(fail=True)) or made[-1], max_workers=1)
+    job = _run(manager, manager.submit(5))
+    assert job.status == "failed" and job.error == "provider down"
+    assert made[0].closed
+
+
+def test_queued_job_can_be_cancelled():
+    gate = threading.Event()
+    manager = JobManager(lambda run_id: FakeGenerator(gate=gate), max_workers=1)
+    first, second = manager.submit(2), manager.submit(2)
+    assert manager.cancel(second.id).status == "cancelled"
+    gate.set()
+    manager.pool.shutdown(wait=True)
+    assert first.status == "completed" and second.status == "cancelled"
+    assert second.started_at is None
+
+
+def test_only_recent_finished_jobs_are_kept():
+    manager = JobManager(lambda run_id: FakeGenerator(), max_workers=1, max_finished=2)
+    jobs = []
+    for _ in range(4):
+        jobs.append(manager.submit(1))
+        manager.pool.submit(lambda: None).result()  # wait for the job ahead
+    assert [j.id for j in manager.list()] == [j.id for j in jobs[-3:]]
+
+
+def test_job_generators_share_the_cache_and_realism_but_not_indexes(local_config, tmp_path):
+    with open(local_config) as f:
+        config = yaml.safe_load(f)
+    config["score_cache"] = {"enabled": True, "path": str(tmp_path / "scores.sqlite")}
+    with open(local_config, "w") as f:
+        yaml.safe_dump(config, f)
+
+    base = ReviewGenerator(local_config, verbose=False)
+    jobs = [
+        ReviewGenerator(local_config, verbose=False, run_id=f"job{i}", shared_quality=base.quality)
+        for i in range(2)
+    ]
+    for job in jobs:
+        assert job.quality.score_cache is base.quality.score_cache
+        assert job.quality.realism is base.quality.realism
+        assert job.quality.diversity is not base.quality.diversity
+
+    jobs[0].generate_all(count=4)
+    jobs[0].close()
+    # The shared cache and batcher outlive a finished job
+    base.quality.score_cache.put("realism", 1, "m", "text", 8.0)
+    assert jobs[1].generate_all(count=4)["success_count"] > 0
+    jobs[1].close()
+    base.close()
+
+
+def test_seeded_generators_do_not_touch_the_global_rng(local_config):
+    before = random.getstate()
+    first = ReviewGenerator(local_config, verbose=False, run_id="a")
+    second = ReviewGenerator(local_config, verbose=False, run_id="b")
+    for generator in (first, second):
+        generator.random.seed(7)
+
+    picks = []
+    for _ in range(20):
+        picks.append((first._select_random_config(), second._select_random_config()))
+    assert all(a == b for a, b in picks)
+    assert random.getstate() == before
+    first.close()
+    second.close()
+
+
+def test_cancelled_api_job_leaves_no_checkpoint(local_config, tmp_path, monkeypatch):
+    import app
+
+    # The API builds generators from config/config.yaml in the working dir
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "config.yaml").write_text(open(local_config).read())
+    monkeypatch.setattr(app, "generator", ReviewGenerator(local_config, verbose=False, run_id="api"))
+    manager = JobManager(app.make_job_generator, max_workers=1)
+
+    job = manager.submit(200)
+    deadline = time.time() + 10
+    while job.accepted < 12 and time.time() < deadline:
+        time.sleep(0.01)
+    manager.cancel(job.id)
+    manager.pool.shutdown(wait=True)
+
+    assert job.status == "cancelled" and 12 <= job.accepted < 200
+    assert not (tmp_path / "checkpoints").exists()
+    app.generator.close()
@@ -0,0 +1,94 @@
+import threading
+import types
+
+import pytest
+
+import metrics
+from jobs import RESULT_FIELDS, JobManager
+from providers import ClientRegistry
+from quality.score_cache import ScoreCache
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    import app
+    monkeypatch.setattr(app, "generator", None)
+    monkeypatch.setattr(app, "job_manager", None)
+    return app
+
+
+def test_counters_and_histograms_render_in_text_format():
+    registry = metrics.Registry()
+    counter = registry.counter("things_total", "Things", ["kind"])
+    histogram = registry.histogram("wait_seconds", "Wait", buckets=(0.1, 1.0))
+    counter.labels("a").inc()
+    counter.labels("a").inc(2)
+    histogram.observe(0.5)
+    histogram.observe(3)
+
+    text = registry.render()
+    assert '# TYPE things_total counter\nthings_total{kind="a"} 3' in text
+    assert 'wait_seconds_bucket{le="0.1"} 0\n' in text
+    assert 'wait_seconds_bucket{le="1.0"} 1\n' in text
+    assert 'wait_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "wait_seconds_count 2\n" in text
+
+
+def _generator(cache, registry):
+    return types.SimpleNamespace(
+        quality=types.SimpleNamespace(score_cache=cache),
+        api=types.SimpleNamespace(registry=registry),
+    )
+
+
+def _gauges(app):
+    return {name: values for name, _, values, _ in app.generator_gauges()}
+
+
+def test_gauges_cover_running_jobs(app_module, tmp_path):
+    registry = ClientRegistry()
+    registry.configure({}, {"enabled": True})
+    registry.controller.acquire("openai")
+
+    shared = ScoreCache(str(tmp_path / "a.sqlite"))
+    own = ScoreCache(str(tmp_path / "b.sqlite"))
+    shared.put("realism", 1, "m", "text", 7.0)
+    shared.get("realism", 1, "m", "text")
+    own.get("realism", 1, "m", "text")
+
+    app_module.generator = _generator(shared, registry)
+    app_module.job_manager = types.SimpleNamespace(
+        generators=lambda: [_generator(shared, registry), _generator(own, registry)]
+    )
+    gauges = _gauges(app_module)
+    assert gauges["score_cache_lookups"] == {("memory_hit",): 1, ("disk_hit",): 0, ("miss",): 1}
+    assert gauges["score_cache_hit_ratio"] == {(): 0.5}
+    assert gauges["provider_requests_in_flight"] == {("openai",): 1}
+    assert "provider_requests_in_flight{provider=\"openai\"} 1" in metrics.REGISTRY.render()
+    shared.close()
+    own.close()
+
+
+def test_no_gauges_before_any_generator(app_module):
+    assert app_module.generator_gauges() == []
+
+
+def test_job_manager_lists_running_generators():
+    started, release = threading.Event(), threading.Event()
+
+    class Generator:
+        def generate_all(self, count, concurrency, on_result, cancel, on_attempt):
+            started.set()
+            release.wait(5)
+            return {"cancelled": False, **{field: None for field in RESULT_FIELDS}}
+
+        def close(self):
+            pass
+
+    manager = JobManager(lambda run_id: Generator(), max_workers=1)
+    job = manager.submit(3)
+    assert started.wait(5)
+    assert manager.generators() == [job.generator]
+    release.set()
+    manager.pool.shutdown(wait=True)
+    assert job.status == "completed" and manager.generators() == []
@@ -0,0 +1,92 @@
+from quality.analysis import ReviewAnalysis
+from quality.diversity import DiversityMetric
+from quality.minhash import MinHashLSHIndex
+from quality.utils import jaccard_similarity
+
+
+def brute_force(tokens, token_sets):
+    return max((jaccard_similarity(tokens, other) for other in token_sets), default=0.0)
+
+
+def test_max_similarity_matches_brute_force_above_threshold(reviews):
+    sets = [ReviewAnalysis(r["review_text"]).token_set for r in reviews]
+    index = MinHashLSHIndex(0.35)
+    for tokens in sets[:300]:
+        index.add(tokens)
+
+    for tokens in sets[300:]:
+        exact = brute_force(tokens, sets[:300])
+        score = index.max_similarity(tokens)
+        assert score <= exact
+        if exact > 0.35:
+            assert score == exact
+        assert (score > 0.35) == (exact > 0.35)
+
+
+def test_near_duplicate_is_found():
+    base = [f"word{i}" for i in range(100)]
+    index = MinHashLSHIndex(0.75)
+    index.add(set(base))
+    assert index.max_similarity(set(base[:90] + ["new1", "new2"])) == jaccard_similarity(
+        set(base[:90] + ["new1", "new2"]), set(base)
+    )
+
+
+def test_signatures_match_signature(reviews):
+    sets = [ReviewAnalysis(r["review_text"]).token_set for r in reviews[:50]] + [set()]
+    index = MinHashLSHIndex(0.75)
+    for tokens, sig in zip(sets, index.signatures(sets)):
+        expected = index.signature(tokens)
+        assert (sig is None) == (expected is None)
+        if sig is not None:
+            assert (sig == expected).all()
+
+
+def test_diversity_verdicts_match_baseline_jaccard(config, reviews):
+    """Same verdicts as the original check (max Jaccard over every review)"""
+    metric = DiversityMetric(config)
+    corpus = reviews[:200]
+    threshold = metric.max_jaccard
+    for review in reviews[200:300]:
+        analysis = ReviewAnalysis(review["review_text"])
+        exact = brute_force(analysis.token_set, [ReviewAnalysis(r["review_text"]).token_set for r in corpus])
+        assert metric.check(analysis, corpus)["passed"] == (exact <= threshold)
+
+
+def test_sync_follows_a_list_that_extends_the_indexed_one(config, reviews):
+    metric = DiversityMetric(config)
+    probe = ReviewAnalysis(reviews[-1]["review_text"])
+    metric.check(probe, reviews[:100])
+    index = metric.index
+
+    metric.check(probe, reviews[:150])  # new list object, same first 100 reviews
+    assert metric.index is index
+    assert len(index) == 150
+
+    metric.check(probe, reviews[200:250])  # unrelated list
+    assert metric.index is not index
+    assert len(metric.index) == 50
+
+
+def test_scores_are_exact_up_to_exact_below(config, reviews):
+    metric = DiversityMetric(config)
+    corpus = reviews[:200]
+    sets = [ReviewAnalysis(r["review_text"]).token_set for r in corpus]
+    for review in reviews[200:250]:
+        analysis = ReviewAnalysis(review["review_text"])
+        result = metric.check(analysis, corpus)
+        assert result["score"] == brute_force(analysis.token_set, sets)
+        assert not result["score_is_lower_bound"]
+
+
+def test_lsh_scores_below_the_threshold_are_flagged(config, reviews):
+    config["diversity_index"]["exact_below"] = 0
+    metric = DiversityMetric(config)
+    corpus = reviews[:200]
+    sets = [ReviewAnalysis(r["review_text"]).token_set for r in corpus]
+    for review in reviews[200:250] + reviews[:5]:
+        analysis = ReviewAnalysis(review["review_text"])
+        result = metric.check(analysis, corpus)
+        assert result["score"] <= brute_force(analysis.token_set, sets)
+        assert result["score_is_lower_bound"] == (result["score"] <= metric.max_jaccard)
+    assert metric.check(ReviewAnalysis(reviews[0]["review_text"]), corpus)["score"] == 1.0
@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+
+from quality.realism import RealismBatcher, RealismMetric
+
+
+def test_no_thread_without_batching(config):
+    config["realism"]["batch_size"] = 1
+    metric = RealismMetric(config)
+    assert metric.batcher is None
+    metric.close()
+
+
+def test_thread_starts_on_first_request_and_stops_on_close():
+    calls = []
+    batcher = RealismBatcher(
+        lambda texts: calls.append(list(texts)) or [len(t) for t in texts],
+        lambda text: calls.append([text]) or len(text),
+        max_batch=4,
+        max_wait=0.2,
+    )
+    assert batcher._thread is None
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda t=t: results.__setitem__(t, batcher.score(t)))
+        for t in ["a", "bb", "ccc", "dddd"]
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {"a": 1, "bb": 2, "ccc": 3, "dddd": 4}
+    assert sum(len(c) for c in calls) == 4 and len(calls) < 4  # batched
+
+    thread = batcher._thread
+    batcher.close()
+    assert not thread.is_alive()
+    assert batcher.score("eeeee") == 5  # scored directly once closed
+
+
+def test_failed_batch_falls_back_to_single_scores():
+    def fail(texts):
+        raise ValueError("bad response")
+
+    batcher = RealismBatcher(fail, lambda text: float(len(text)), max_batch=2)
+    futures = [Future(), Future()]
+    batcher._score([("ab", futures[0]), ("abc", futures[1])])
+    assert [f.result() for f in futures] == [2.0, 3.0]
+    assert batcher.fallbacks == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from quality.realism import RealismMetric
+from replay import ReplayLayer, ReplayMiss, ReplayStore
+
+
+def _layer(tmp_path, mode, **settings):
+    return ReplayLayer({"mode": mode, "path": str(tmp_path / "replay.jsonl"), **settings})
+
+
+def _record(tmp_path, responses):
+    recorder = _layer(tmp_path, "record")
+    for prompt, response in responses:
+        recorder.call("openai", "gpt-4o-mini", prompt, 0.8, 7, lambda r=response: r)
+
+
+def test_replay_serves_recorded_responses_in_order(tmp_path):
+    _record(tmp_path, [("a", "first a"), ("b", "only b"), ("a", "second a")])
+    replay = _layer(tmp_path, "replay")
+
+    def live():
+        raise AssertionError("replay must not call the provider")
+
+    calls = [("a", 7), ("b", 7), ("a", 7), ("a", 7)]
+    served = [replay.call("openai", "gpt-4o-mini", p, 0.8, seed, live) for p, seed in calls]
+    assert served == ["first a", "only b", "second a", "first a"]
+    assert replay.stats()["hits"] == 4
+
+
+def test_miss_is_an_error_by_default(tmp_path):
+    _record(tmp_path, [("a", "first a")])
+    replay = _layer(tmp_path, "replay")
+    assert replay.offline
+    with pytest.raises(ReplayMiss):
+        replay.call("openai", "gpt-4o-mini", "a", 0.8, 8, lambda: "live")
+    assert replay.stats()["misses"] == 1
+
+
+def test_any_and_live_are_opt_in(tmp_path):
+    _record(tmp_path, [("a", "first a")])
+
+    anything = _layer(tmp_path, "replay", on_miss="any")
+    assert anything.call("openai", "gpt-4o-mini", "z", 0.8, 7, lambda: "live") == "first a"
+    with pytest.raises(ReplayMiss):
+        anything.call("openai", "gpt-3.5-turbo", "z", 0.8, 7, lambda: "live")
+
+    live = _layer(tmp_path, "replay", on_miss="live")
+    assert not live.offline
+    assert live.call("openai", "gpt-4o-mini", "z", 0.8, 7, lambda: "new z") == "new z"
+    assert _layer(tmp_path, "replay").call("openai", "gpt-4o-mini", "z", 0.8, 7, None) == "new z"
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    _record(tmp_path, [("a", "first a"), ("b", "only b")])
+    path = tmp_path / "replay.jsonl"
+    path.write_text(path.read_text(encoding="utf-8")[:-10], encoding="utf-8")
+    assert len(ReplayStore(str(path))) == 1
+
+
+def test_realism_does_not_pass_replay_misses_unscored(tmp_path, config):
+    config["realism"]["batch_size"] = 1
+    config["replay"] = {"mode": "replay", "path": str(tmp_path / "replay.jsonl")}
+    metric = RealismMetric(config)
+    with pytest.raises(ReplayMiss):
+        metric.check("A review nobody recorded.")
+    with pytest.raises(ReplayMiss):
+        metric.check_batch(["A review nobody recorded.", "Nor this one."])
@@ -0,0 +1,87 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from quality.realism import REALISM_VERSION
+from quality.score_cache import ScoreCache
+from rescore import find_attempt_log, rescore
+
+TIMESTAMP = "20260101_000000"
+
+
+def _verdicts(summary):
+    with open(summary["verdicts_path"], newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def dataset(tmp_path, reviews):
+    """A stored run: 60 accepted reviews plus the attempt log next to them"""
+    reviews = reviews[:60]
+    (tmp_path / "reviews_models").mkdir()
+    (tmp_path / "logs").mkdir()
+    path = tmp_path / "reviews_models" / f"reviews_with_models_{TIMESTAMP}.json"
+    path.write_text(json.dumps(reviews))
+
+    with open(tmp_path / "logs" / f"generation_log_{TIMESTAMP}.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "rating", "model", "passed", "failed_metric"])
+        writer.writerow(["Never stored", 3.0, "openai/gpt-4o-mini", False, "length"])
+        for i, review in enumerate(reviews):
+            # The log cuts titles short; review 5's only attempt was rejected
+            writer.writerow([review["title"][:50], review["rating"], review["model"], i != 5,
+                             "bias" if i == 5 else ""])
+    return str(path)
+
+
+def run(dataset, config, tmp_path, **kwargs):
+    return rescore(dataset, config, output_dir=str(tmp_path / "out"),
+                   report_dir=str(tmp_path / "reports"), log=lambda message: None, **kwargs)
+
+
+def test_stored_dataset_still_passes(config, reviews, tmp_path):
+    path = tmp_path / "reviews.json"
+    path.write_text(json.dumps(reviews))
+    summary = run(str(path), config, tmp_path, workers=1)
+
+    assert summary["attempts_path"] is None
+    assert summary["accepted"] == summary["reviews"] == len(reviews)
+    assert summary["newly_rejected"] == 0
+    assert {row["original"] for row in _verdicts(summary)} == {"accepted"}
+
+
+def test_original_verdicts_come_from_the_attempt_log(config, dataset, tmp_path):
+    assert find_attempt_log(dataset).endswith(f"generation_log_{TIMESTAMP}.csv")
+    summary = run(dataset, config, tmp_path, workers=1)
+
+    rows = _verdicts(summary)
+    assert [row["original"] for row in rows] == ["rejected" if i == 5 else "accepted" for i in range(60)]
+    assert summary["original"] == {"accepted": 59, "rejected": 1, "unknown": 0}
+    assert summary["newly_accepted"] == 1
+    assert summary["original_rejections"] == {"length": 1, "bias": 1}
+    report = open(summary["report_path"]).read()
+    assert "Newly accepted: 1" in report
+    assert "## Original Run Rejections" in report
+
+
+def test_workers_read_the_cache_and_the_parent_writes_it(config, dataset, tmp_path, reviews):
+    path = str(tmp_path / "scores.sqlite")
+    config["score_cache"].update({"enabled": True, "path": path})
+    cache = ScoreCache(path)
+    cache.put("realism", REALISM_VERSION, config["realism"]["model"], reviews[7]["review_text"], 2.0)
+    cache.close()
+
+    parallel = run(dataset, config, tmp_path, workers=2, chunk_size=7)
+    assert _verdicts(parallel)[7]["failed_metric"] == "realism"
+    assert parallel["newly_rejected"] == 1
+
+    # Sentiment scores computed in the workers were written by the parent
+    db = sqlite3.connect(path)
+    counts = dict(db.execute("SELECT metric, COUNT(*) FROM scores GROUP BY metric").fetchall())
+    db.close()
+    assert counts == {"realism": 1, "sentiment": 60}
+
+    serial = run(dataset, config, tmp_path, workers=1)
+    assert _verdicts(parallel) == _verdicts(serial)
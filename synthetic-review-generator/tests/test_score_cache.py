@@ -0,0 +1,92 @@
+import sqlite3
+
+from quality.score_cache import ScoreCache
+
+
+def _rows(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_round_trip_before_commit(tmp_path):
+    cache = ScoreCache(str(tmp_path / "s.sqlite"), memory_items=1, commit_every=100, commit_interval=60)
+    cache.put("realism", 1, "m", "first  review", 0.7)
+    cache.put("realism", 1, "m", "second review", 0.4)
+    # evicted from the LRU but not yet written: still served
+    assert cache.get("realism", 1, "m", "first review") == 0.7
+    assert cache.get("realism", 1, "m", "second review") == 0.4
+    assert cache.get("realism", 2, "m", "first review") is None
+    cache.close()
+
+
+def test_commits_in_batches(tmp_path):
+    path = str(tmp_path / "s.sqlite")
+    cache = ScoreCache(path, commit_every=10, commit_interval=60)
+    for i in range(25):
+        cache.put("sentiment", 1, "textblob", f"review {i}", i / 25)
+    assert _rows(path) == 20
+    cache.flush()
+    assert _rows(path) == 25
+    cache.close()
+
+
+def test_close_persists_pending_scores(tmp_path):
+    path = str(tmp_path / "s.sqlite")
+    cache = ScoreCache(path, commit_every=100, commit_interval=60)
+    cache.put("realism", 1, "m", "kept", 0.9)
+    cache.close()
+    cache.close()
+
+    reopened = ScoreCache(path)
+    assert reopened.get("realism", 1, "m", "kept") == 0.9
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+
+def test_read_only_cache_hands_new_scores_to_the_writer(tmp_path):
+    path = str(tmp_path / "s.sqlite")
+    writer = ScoreCache(path)
+    writer.put("realism", 1, "m", "stored", 8.0)
+    writer.flush()
+
+    reader = ScoreCache(path, read_only=True)
+    assert reader.get("realism", 1, "m", "stored") == 8.0
+    reader.put("realism", 1, "m", "new", 3.0)
+    assert reader.get("realism", 1, "m", "new") == 3.0
+    assert _rows(path) == 1
+
+    for score in reader.take_new():
+        writer.put(*score)
+    assert reader.take_new() == []
+    reader.close()
+    writer.close()
+    assert _rows(path) == 2
+
+
+def test_read_only_cache_without_a_store(tmp_path):
+    path = tmp_path / "missing.sqlite"
+    reader = ScoreCache(str(path), read_only=True)
+    assert reader.get("realism", 1, "m", "anything") is None
+    reader.close()
+    assert not path.exists()
+
+
+def test_closed_cache_misses_and_drops_puts(tmp_path, config, reviews):
+    from quality.analysis import ReviewAnalysis
+    from quality.bias import BiasMetric
+
+    cache = ScoreCache(str(tmp_path / "s.sqlite"), memory_items=0)
+    cache.put("realism", 1, "m", "stored", 8.0)
+    cache.close()
+    assert cache.get("realism", 1, "m", "stored") is None
+    cache.put("realism", 1, "m", "late", 5.0)
+    assert cache.get("realism", 1, "m", "late") is None
+
+    # A metric sharing a closed cache still scores (uncached)
+    review = reviews[0]
+    expected = BiasMetric(config).check(review["rating"], ReviewAnalysis(review["review_text"]))
+    closed = BiasMetric(config, score_cache=cache)
+    assert closed.check(review["rating"], ReviewAnalysis(review["review_text"])) == expected
@@ -0,0 +1,60 @@
+import numpy as np
+
+from quality.analysis import ReviewAnalysis
+from quality.diversity import SemanticMetric
+from quality.semantic_index import IncrementalTfidfIndex, refit_similarity
+
+
+def test_scores_track_a_full_refit(reviews):
+    analyses = [ReviewAnalysis(r["review_text"]) for r in reviews]
+    index = IncrementalTfidfIndex()
+    small, large = [], []
+    for i, analysis in enumerate(analyses):
+        if i >= 5 and i % 5 == 0:
+            score = index.max_similarity(analysis.terms)
+            reference = refit_similarity(analysis.text, [r["review_text"] for r in reviews[:i]])
+            (small if i < 150 else large).append(abs(score - reference))
+            assert (score <= 0.85) == (reference <= 0.85)
+        index.add(analysis.terms)
+
+    assert max(small) < 0.1
+    assert max(large) < 0.04
+    assert np.mean(large) < 0.01
+
+
+def test_batch_scores_match_single_checks(reviews):
+    index = IncrementalTfidfIndex()
+    for r in reviews[:300]:
+        index.add(ReviewAnalysis(r["review_text"]).terms)
+    terms = [ReviewAnalysis(r["review_text"]).terms for r in reviews[300:]]
+    expected = [index.max_similarity(t) for t in terms]
+    assert np.allclose(index.max_similarities(terms, block=64), expected)
+
+
+def test_rows_stay_normalised_between_refreshes(reviews):
+    index = IncrementalTfidfIndex(refresh_growth=0.5)
+    for r in reviews[:200]:
+        index.add(ReviewAnalysis(r["review_text"]).terms)
+    assert index.refreshed_at < 200  # last rows were weighted under an older snapshot
+
+    own = index.similarities(ReviewAnalysis(reviews[150]["review_text"]).terms)
+    assert own[150] > 0.99
+    assert own.max() <= 1.0 + 1e-9
+
+
+def test_unknown_terms_score_zero():
+    index = IncrementalTfidfIndex()
+    index.add(["gitlab", "pipelines", "fast"])
+    assert index.max_similarity(["unrelated", "words"]) == 0.0
+    assert index.max_similarity([]) == 0.0
+
+
+def test_drift_sampling_is_bounded(config, reviews):
+    config["semantic_index"] = {"drift_sample_rate": 1.0, "drift_max_samples": 3}
+    metric = SemanticMetric(config)
+    corpus = reviews[:50]
+    for r in reviews[50:60]:
+        metric.check(ReviewAnalysis(r["review_text"]), corpus)
+    report = metric.drift_report()
+    assert report["samples"] == 3
+    assert report["threshold_flips"] == 0
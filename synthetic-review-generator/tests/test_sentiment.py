@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from textblob import TextBlob
+
+from quality.analysis import ReviewAnalysis
+from quality.bias import BiasMetric
+from quality.sentiment import SentimentEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return SentimentEngine()
+
+
+def _textblob(texts):
+    return np.array([TextBlob(t).sentiment.polarity for t in texts])
+
+
+def test_polarity_matches_textblob_on_stored_reviews(engine, reviews):
+    texts = [r["review_text"] for r in reviews]
+    diff = np.abs(engine.polarity_batch(texts) - _textblob(texts))
+    assert diff.max() <= SentimentEngine.TOLERANCE
+
+
+@pytest.mark.parametrize("text", [
+    "The product is good.",
+    "The product is very good!",
+    "It is not good at all.",
+    "Never a bad day with this tool!!",
+    "Really great support, but the docs are terrible.",
+    "Not really sure. The UI is slow and ugly.",
+    "I don't like it",
+    "",
+])
+def test_pattern_rules_match_textblob(engine, text):
+    assert engine.polarity_batch([text])[0] == pytest.approx(TextBlob(text).sentiment.polarity)
+
+
+def test_batch_is_independent_of_neighbours(engine, reviews):
+    texts = [r["review_text"] for r in reviews[:50]]
+    batch = engine.polarity_batch(texts)
+    single = [engine.polarity_batch([t])[0] for t in texts]
+    assert np.allclose(batch, single)
+
+
+def test_bias_verdicts_match_the_textblob_engine(config, reviews):
+    textblob = BiasMetric({**config, "bias": {"engine": "textblob"}})
+    vectorized = BiasMetric({**config, "bias": {"engine": "vectorized"}})
+    ratings = [r["rating"] for r in reviews]
+    texts = [r["review_text"] for r in reviews]
+
+    baseline = [textblob.check(rating, ReviewAnalysis(text)) for rating, text in zip(ratings, texts)]
+    batch = vectorized.check_batch(ratings, texts)
+    assert [b["passed"] for b in batch] == [b["passed"] for b in baseline]
+    for b, v in zip(baseline, batch):
+        assert v["score"] == pytest.approx(b["score"], abs=SentimentEngine.TOLERANCE)
@@ -0,0 +1,154 @@
+import json
+import time
+import types
+
+import pytest
+
+from jobs import RESULT_FIELDS, JobManager
+
+
+class StreamingGenerator:
+    """Generator stand-in that reports one attempt per review"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def generate_all(self, count, concurrency, on_result, cancel, on_attempt):
+        done = 0
+        for i in range(count):
+            if cancel.is_set():
+                break
+            time.sleep(self.delay)
+            review = {"title": f"t{i}", "rating": 4.0, "model": "local/m", "review_text": "ok"}
+            passed = i % 3 != 2
+            if on_attempt:
+                on_attempt(i, 1, review, passed, "" if passed else "bias", 0.1, 1, [])
+            on_result(i, review if passed else None)
+            done += 1
+        return {**{field: None for field in RESULT_FIELDS}, "cancelled": done < count}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import app
+    managers = []
+
+    def start(delay=0.0, keepalive=2, reconnect=0):
+        config = {"jobs": {
+            "stream_buffer": 10,
+            "stream_keepalive_sec": keepalive,
+            "stream_reconnect_sec": reconnect,
+        }}
+        manager = JobManager(lambda run_id: StreamingGenerator(delay), max_workers=1)
+        managers.append(manager)
+        monkeypatch.setattr(app, "generator", types.SimpleNamespace(config=config))
+        monkeypatch.setattr(app, "job_manager", manager)
+        return app.app.test_client(), manager
+
+    yield start
+    for manager in managers:
+        for job in manager.list():
+            manager.cancel(job.id)
+        manager.pool.shutdown(wait=True)
+
+
+def _events(body, with_ids=False):
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.strip().splitlines() if ": " in line)
+        if "event" in fields:
+            event = (fields["event"], json.loads(fields["data"]))
+            events.append((fields["id"], *event) if with_ids else event)
+    return events
+
+
+def test_stream_delivers_every_attempt_then_done(client):
+    http, _ = client()
+    response = http.get("/api/generate/stream?count=6")
+    assert response.mimetype == "text/event-stream"
+
+    events = _events(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == "job" and names[-1] == "done"
+    assert names[1:-1].count("accepted") == 4 and names[1:-1].count("rejected") == 2
+    assert [data["review_index"] for _, data in events[1:-1]] == list(range(6))
+    assert events[-1][1]["status"] == "completed"
+
+
+def test_bad_parameters_are_rejected(client):
+    http, _ = client()
+    assert http.get("/api/generate/stream?count=0").status_code == 400
+    assert http.get("/api/generate/stream?count=3&concurrency=0").status_code == 400
+
+
+def test_idle_stream_sends_keepalives(client):
+    http, _ = client(delay=0.3, keepalive=0.1)
+    body = http.get("/api/generate/stream?count=2").get_data(as_text=True)
+    assert ": keepalive" in body
+    assert _events(body)[-1][0] == "done"
+
+
+def test_disconnect_cancels_the_job(client):
+    http, manager = client(delay=0.05, keepalive=0.1)
+    response = http.get("/api/generate/stream?count=1000", buffered=False)
+    chunks = iter(response.response)
+    job_id = _events(next(chunks).decode())[0][1]["id"]
+    next(chunks)
+    response.close()  # the client goes away
+
+    job = manager.get(job_id)
+    _wait_finished(job)
+    assert job.status == "cancelled"
+    assert job.to_dict()["completed"] < 1000
+
+
+def _wait_finished(job):
+    deadline = time.time() + 5
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_reconnect_resumes_the_same_job(client):
+    http, manager = client(delay=0.02, keepalive=0.1, reconnect=5)
+    response = http.get("/api/generate/stream?count=20", buffered=False)
+    chunks = iter(response.response)
+    seen = _events(next(chunks).decode() + next(chunks).decode() + next(chunks).decode(), with_ids=True)
+    response.close()
+    assert seen[-1][1] != "job"
+
+    # What a reconnecting EventSource sends: the same URL plus Last-Event-ID
+    body = http.get(
+        "/api/generate/stream?count=20", headers={"Last-Event-ID": seen[-1][0]}
+    ).get_data(as_text=True)
+    resumed = _events(body, with_ids=True)
+
+    assert len(manager.list()) == 1
+    assert resumed[0][0] == seen[-1][0]
+    attempts = [data["review_index"] for _, name, data in seen + resumed if name not in ("job", "done")]
+    assert attempts == list(range(20))
+    assert resumed[-1][1] == "done" and resumed[-1][2]["status"] == "completed"
+
+
+def test_unknown_job_cannot_be_resumed(client):
+    http, manager = client()
+    assert http.get("/api/generate/stream?job_id=nope").status_code == 404
+    assert http.get("/api/generate/stream", headers={"Last-Event-ID": "nope:3"}).status_code == 404
+    assert manager.list() == []
+
+
+def test_job_waits_for_a_reconnect_before_cancelling(client):
+    http, manager = client(delay=0.05, keepalive=0.1, reconnect=0.5)
+    response = http.get("/api/generate/stream?count=1000", buffered=False)
+    chunks = iter(response.response)
+    job_id = _events(next(chunks).decode())[0][1]["id"]
+    next(chunks)
+    response.close()
+
+    job = manager.get(job_id)
+    time.sleep(0.2)
+    assert job.status == "running"
+    _wait_finished(job)
+    assert job.status == "cancelled"
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import random
+import time
+
+from conftest import DATASET
+from file_manager import ReviewStream, _iter_json_array, clean_review, iter_reviews, jsonl_to_json
+from generator import OrderedAccepts, OrderedAttemptLog, ReviewGenerator
+
+
+def _stream(tmp_path, **kwargs):
+    return ReviewStream(str(tmp_path / "models.jsonl"), str(tmp_path / "clean.jsonl"), **kwargs)
+
+
+def test_stream_round_trips_reviews(tmp_path, reviews):
+    stream = _stream(tmp_path, flush_every=50, fsync=False)
+    for review in reviews:
+        stream.append(review)
+    stream.close()
+
+    assert list(iter_reviews(stream.with_models_path)) == reviews
+    assert list(iter_reviews(stream.clean_path)) == [clean_review(r) for r in reviews]
+
+
+def test_stream_writes_in_batches(tmp_path, reviews):
+    stream = _stream(tmp_path, flush_every=10, flush_interval=60, fsync=False)
+    for review in reviews[:25]:
+        stream.append(review)
+    assert len(list(iter_reviews(stream.with_models_path))) == 20
+    assert stream.offsets()[0] == (tmp_path / "models.jsonl").stat().st_size
+    assert len(list(iter_reviews(stream.with_models_path))) == 25
+    stream.close()
+
+
+def test_reader_skips_a_line_cut_short(tmp_path, reviews):
+    path = tmp_path / "models.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in reviews[:3])[:-20])
+    assert list(iter_reviews(str(path))) == reviews[:2]
+
+
+def test_json_array_reader_matches_json_load(reviews):
+    with open(DATASET) as f:
+        assert list(_iter_json_array(f, chunk_size=97)) == reviews
+    assert list(iter_reviews(DATASET)) == reviews
+
+
+def test_jsonl_to_json_matches_the_stream(tmp_path, reviews):
+    stream = _stream(tmp_path, fsync=False)
+    for review in reviews[:40]:
+        stream.append(review)
+    stream.close()
+    path = jsonl_to_json(stream.with_models_path, str(tmp_path / "models.json"))
+    with open(path) as f:
+        assert json.load(f) == reviews[:40]
+
+
+def test_accepts_are_released_in_index_order():
+    results, released = {}, []
+    accepts = OrderedAccepts(released.append, results)
+    for i, review in [(2, "c"), (0, "a"), (3, None), (1, "b"), (5, "f")]:
+        results[i] = review
+        accepts.release()
+    assert released == ["a", "b", "c"]
+
+    snapshot = accepts.snapshot()
+    accepts.drain()  # slot 4 was dropped
+    assert released == ["a", "b", "c", "f"]
+
+    # A resumed run regenerates slot 4 and does not release 5 twice
+    resumed = []
+    accepts = OrderedAccepts(resumed.append, dict(results))
+    accepts.restore(snapshot)
+    accepts.results[4] = "e"
+    accepts.release()
+    assert resumed == ["e", "f"]
+
+
+def test_async_run_streams_in_index_order(reviews):
+    generator = ReviewGenerator.__new__(ReviewGenerator)
+    generator.verbose = False
+    rng = random.Random(0)
+    delays = [rng.uniform(0, 0.01) for _ in range(40)]
+
+    def generate_one_with_quality(accepted, review_index, log_attempt, commit):
+        time.sleep(delays[review_index])
+        if review_index % 7 == 3:
+            return None
+        review = reviews[review_index]
+        accepted.append(review)
+        return review
+
+    generator.generate_one_with_quality = generate_one_with_quality
+    streamed = []
+    finished = []
+    result = asyncio.run(generator.generate_all_async(
+        40, 8, streamed.append, log=OrderedAttemptLog(lambda *row: None),
+        on_result=lambda i, review: finished.append(i),
+    ))
+
+    expected = [reviews[i] for i in range(40) if i % 7 != 3]
+    assert streamed == expected and result == expected
+    assert finished != sorted(finished)  # slots did finish out of order
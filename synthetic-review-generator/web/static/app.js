@@ -74,6 +74,46 @@ async function generateSingle(forceBad = false) {
     }
 }
 
+// Stream a generation job, showing reviews as they are accepted;
+// resolves with the final job once the "done" event arrives
+function streamReviews(count) {
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`${API_BASE}/generate/stream?count=${count}`);
+        const latest = [];
+        let accepted = 0;
+        let rejected = 0;
+        
+        const render = () => {
+            showResult('generate-result', `
+                <p><span class="loader"></span> ${accepted} accepted, ${rejected} rejected attempts (of ${count} reviews)</p>
+                <ul>${latest.map(r => `<li>${r.rating}/5 ⭐ ${r.title} <small>(${r.model})</small></li>`).join('')}</ul>
+            `, 'info');
+        };
+        
+        source.addEventListener('accepted', e => {
+            accepted += 1;
+            latest.unshift(JSON.parse(e.data).review);
+            latest.splice(5);
+            render();
+        });
+        source.addEventListener('rejected', () => {
+            rejected += 1;
+            render();
+        });
+        source.addEventListener('done', e => {
+            source.close();
+            resolve({ success: true, job: JSON.parse(e.data) });
+        });
+        source.onerror = () => {
+            // While CONNECTING the browser retries by itself, sending Last-Event-ID so the
+            // server reattaches it to the same job; only a closed stream is final
+            if (source.readyState === EventSource.CLOSED) {
+                reject(new Error('Stream interrupted'));
+            }
+        };
+    });
+}
+
 // Generate batch reviews
 async function generateReviews() {
     const button = event.target;
@@ -82,25 +122,22 @@ async function generateReviews() {
     
     const count = parseInt(document.getElementById('review-count').value);
     
-    if (count < 1 || count > 100) {
-        showResult('generate-result', '<p>❌ Please enter a number between 1 and 100</p>', 'error');
+    if (!(count >= 1)) {
+        showResult('generate-result', '<p>❌ Please enter a positive number</p>', 'error');
         setButtonLoading(button, false);
         return;
     }
     
     try {
-        const response = await fetch(`${API_BASE}/generate/batch`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ count })
-        });
+        // Reviews arrive as server-sent events while the job runs
+        const data = await streamReviews(count);
         
-        const data = await response.json();
-        
-        if (data.success) {
-            const result = data.result;
+        if (data.success && data.job.status === 'failed') {
+            showResult('generate-result', `<p>❌ Error: ${data.job.error}</p>`, 'error');
+        } else if (data.success) {
+            const result = data.job.result;
             const html = `
-                <h3>✅ Generation Complete!</h3>
+                <h3>${result.cancelled ? '⏹️ Generation Cancelled' : '✅ Generation Complete!'}</h3>
                 <div class="quality-scores">
                     <div class="score-card passed">
                         <div class="label">Success</div>